@@ -19,7 +19,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.edge.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (TimeoutException, NoSuchElementException, StaleElementReferenceException,
+                                        UnexpectedAlertPresentException)
 from datetime import datetime, timedelta
 import time
 import os
@@ -27,6 +28,57 @@ import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import json
+import math
+import unicodedata
+from contextlib import contextmanager
+
+# lxml es opcional: sin él no hay evaluación offline de localizadores
+try:
+    from lxml import html as lxml_html
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_html = None
+    lxml_etree = None
+
+
+# ============================================
+# PLAZO COMPARTIDO DE BÚSQUEDA
+# ============================================
+class PlazoBusqueda:
+    """
+    ⏳ Presupuesto de tiempo de UNA búsqueda de campo
+
+    Todas las estrategias (esperas, reintentos, recorridos de frames) descuentan
+    del mismo plazo, de modo que un campo nunca tarda más que su presupuesto.
+    """
+
+    def __init__(self, segundos):
+        self.segundos = segundos
+        self.limite = time.monotonic() + segundos
+
+    def restante(self):
+        return max(0.0, self.limite - time.monotonic())
+
+    def agotado(self):
+        return self.restante() <= 0
+
+    def acotar(self, segundos):
+        """Recorta una espera propia de una estrategia al tiempo que queda"""
+        return min(segundos, self.restante())
+
+
+class ElementoUbicado:
+    """
+    📌 Elemento ya localizado junto con el path de frames donde vive
+
+    Permite llenar, leer y hacer clic sin volver a buscar: basta con regresar
+    a su frame. Si la referencia queda obsoleta, el bot lo vuelve a ubicar.
+    """
+
+    def __init__(self, nombre_campo, elemento, path):
+        self.nombre_campo = nombre_campo
+        self.elemento = elemento
+        self.path = path
 
 
 # ============================================
@@ -34,7 +86,7 @@ import json
 # ============================================
 class BotDenunciasSUNAT:
     
-    def __init__(self, archivo_excel, usuario, password, interfaz):
+    def __init__(self, archivo_excel, usuario, password, interfaz, estrategia_carga="normal"):
         self.archivo_excel = archivo_excel
         self.USUARIO = usuario
         self.PASSWORD = password
@@ -44,10 +96,78 @@ class BotDenunciasSUNAT:
         self.wait = None
         self.denuncias_exitosas = 0
         self.denuncias_fallidas = 0
+
+        # Sección del formulario en curso (clave del caché de localizadores)
+        self.seccion_actual = "navegacion"
+        # Caché de sesión: (sección, campo) → {"path", "estrategia", "selector"} o LOCALIZADOR_AUSENTE
+        self._cache_localizadores = {}
+        # Resolver cada campo con un único execute_script antes de la cascada Selenium
+        self.modo_resolutor_js = True
+        # Topología de frames en caché + token del observador inyectado
+        self._topologia_frames = None
+        self._token_topologia = None
+        # Aciertos/fallos/latencia por campo y estrategia (arranca con los de la corrida anterior)
+        self._estadisticas_localizadores = self._cargar_estadisticas_localizadores()
+        self._ms_ahorrados_reordenamiento = 0.0
+        self._busquedas_reordenadas = 0
+        # Plazo de la búsqueda de campo en curso (None = sin límite)
+        self._plazo = None
+        # Últimos ElementoUbicado por (sección, campo), para leer/llenar sin buscar de nuevo
+        self._campos_ubicados = {}
+        # Frame donde está el driver (None = desconocido) y comandos switch_to ahorrados
+        self._path_frame_actual = None
+        self._cambios_frame_evitados = 0
+        # Veces que se envió la librería window.__botHelpers (una por frame y carga)
+        self._instalaciones_helpers = 0
+        # Evaluar los localizadores de CAMPOS_SUNAT sobre un page_source de 'det' (requiere lxml).
+        # Es un respaldo: solo corre en la cascada completa, cuando el resolutor JS no es
+        # concluyente o está desactivado (con el resolutor activo casi nunca se llega)
+        self.modo_evaluacion_offline = lxml_html is not None
+        # Inputs, textareas y radios de una sección en un solo execute_script
+        self.modo_llenado_masivo = True
+        # (sección, select) → (firma, [(índice, value, texto), ...])
+        self._cache_opciones = {}
+        # Índice normalizado de cada lista de opciones y mapeo valor Excel → value (persistido)
+        self._indices_opciones = {}
+        self._mapeo_opciones = self._cargar_mapeo_opciones()
+        # (clave del mapeo, valor plegado, firma de la lista) → (índice, estrategia), solo en la sesión
+        self._coincidencias_opciones = {}
+        # Listas de prov/dist ya vistas por departamento(/provincia): (firma, opciones)
+        self.modo_cache_ubigeo = True
+        self._cache_ubigeo = {}
+        # Valores del padre de cada lista dependiente en la fila: "prov" → (dpto,), "dist" → (dpto, prov)
+        self._padres_opciones = {}
+        # modalidad → (name del select de Sub Modalidad, firma, opciones)
+        self._cache_submodalidad = {}
+        # Omitir escrituras cuyo valor ya está en el formulario (lectura por sección,
+        # repetida tras cada select o radio escrito: sus onchange cambian otros campos).
+        # Cada fila abre un formulario nuevo, así que solo se omiten los valores por
+        # defecto y los de una sección reintentada; entre filas se reutilizan las
+        # listas de opciones (caché de ubigeo y mapeo), no los valores escritos
+        self.modo_omitir_sin_cambios = True
+        self._valores_formulario = {}
+        self._lectura_vigente = False
+        # Textos de alert() interceptados y aún no reportados
+        self._alertas_pendientes = []
+        # Verificar los localizadores de la Sección 1 antes de procesar el Excel
+        self.modo_verificacion_previa = True
+        # Condición → (veces, segundos esperados, vencidas) para el reporte de esperas
+        self._tiempos_espera = {}
+        # Esperar a que terminen XHR/fetch/envíos tras las acciones que consultan al servidor
+        self.modo_monitor_red = True
+        # Timeouts por paso derivados de las latencias observadas (arranca con las de corridas anteriores)
+        self.modo_calibracion_esperas = True
+        self._calibracion_esperas = self._cargar_calibracion_esperas()
+        # page_load_strategy de Edge; con 'eager'/'none' la carga la deciden los predicados de preparación
+        self.estrategia_carga = estrategia_carga if estrategia_carga in self.ESTRATEGIAS_CARGA else "normal"
         
         self.URL_LOGIN = "https://intranet.sunat.peru/cl-at-iamenu/"
         
         self.log("Bot inicializado correctamente (Microsoft Edge)")
+        if not self.modo_evaluacion_offline:
+            self.log("ℹ️ lxml no instalado: evaluación offline de localizadores desactivada")
+        if self._calibracion_esperas:
+            self.log(f"📐 Timeouts calibrados con latencias de {len(self._calibracion_esperas)} pasos anteriores")
     
     def log(self, mensaje):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -56,12 +176,18 @@ class BotDenunciasSUNAT:
     # ============================================
     # INICIALIZACIÓN
     # ============================================
+
+    # 'normal': get() y las navegaciones esperan imágenes, hojas de estilo y subframes
+    # 'eager': vuelven con el DOM parseado (DOMContentLoaded)
+    # 'none': vuelven apenas llega la respuesta; todo lo deciden los predicados de preparación
+    ESTRATEGIAS_CARGA = ("normal", "eager", "none")
     
     def iniciar_navegador(self):
         try:
             self.log("Iniciando Microsoft Edge...")
             
             edge_options = Options()
+            edge_options.page_load_strategy = self.estrategia_carga
             edge_options.add_argument('--start-maximized')
             edge_options.add_argument('--disable-blink-features=AutomationControlled')
             edge_options.add_experimental_option("excludeSwitches", ["enable-automation"])
@@ -70,7 +196,7 @@ class BotDenunciasSUNAT:
             self.driver = webdriver.Edge(options=edge_options)
             self.wait = WebDriverWait(self.driver, 20)
             
-            self.log("✅ Microsoft Edge iniciado correctamente")
+            self.log(f"✅ Microsoft Edge iniciado correctamente (carga '{self.estrategia_carga}')")
             return True
         except Exception as e:
             self.log(f"❌ Error al iniciar Edge: {str(e)}")
@@ -89,75 +215,129 @@ class BotDenunciasSUNAT:
     # LOGIN Y NAVEGACIÓN
     # ============================================
 
-    def hacer_clic_robusto(self, elemento, descripcion, max_intentos=3):
+    def hacer_clic_robusto(self, elemento, descripcion, max_intentos=3, efecto=None, espera_efecto=2):
         """
         Intenta hacer clic en un elemento usando múltiples estrategias
         hasta que sea exitoso o se agoten los intentos.
 
         Estrategias:
-        1. Click normal con Selenium
+        1. Click normal con Selenium (tras un scroll instantáneo)
         2. Click con JavaScript
         3. Click con ActionChains
-        4. Click con offset
+        4. Click forzado con el helper 'clic'
+
+        Con 'efecto' (condición callable(driver), p. ej. menú expandido o ventana
+        nueva) un clic solo cuenta si el efecto aparece dentro de espera_efecto
+        segundos; si no, se pasa a la siguiente estrategia. Si el efecto ya se
+        cumple antes del clic no se hace clic (un menú desplegable se cerraría), y
+        si el elemento empezó a cambiar sin completar el efecto se sigue esperando
+        sin volver a hacer clic.
+
+        El elemento se usa en el frame donde estaba el driver al llamar; las
+        condiciones de efecto (que suelen ir a window.top) lo devuelven ahí.
         """
-        for intento in range(1, max_intentos + 1):
-            try:
-                self.log(f"    → Intento {intento}/{max_intentos} para {descripcion}...")
+        from selenium.webdriver.common.action_chains import ActionChains
 
-                # Estrategia 1: Scroll y click normal
-                try:
-                    self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", elemento)
-                    time.sleep(0.5)
-                    elemento.click()
-                    self.log(f"    ✅ Clic exitoso (método normal)")
-                    return True
-                except:
-                    pass
+        path_elemento = self._path_frame_actual
 
-                # Estrategia 2: JavaScript click
-                try:
-                    self.driver.execute_script("arguments[0].click();", elemento)
-                    self.log(f"    ✅ Clic exitoso (JavaScript)")
-                    return True
-                except:
-                    pass
+        def volver_al_elemento():
+            if path_elemento is not None:
+                self._cambiar_a_contexto(path_elemento)
 
-                # Estrategia 3: ActionChains
-                try:
-                    from selenium.webdriver.common.action_chains import ActionChains
-                    actions = ActionChains(self.driver)
-                    actions.move_to_element(elemento).click().perform()
-                    self.log(f"    ✅ Clic exitoso (ActionChains)")
-                    return True
-                except:
-                    pass
+        if efecto is not None:
+            efecto_original = efecto
 
-                # Estrategia 4: Force click con JavaScript (más agresivo)
+            def efecto(driver):
                 try:
-                    self.driver.execute_script("""
-                        arguments[0].dispatchEvent(new MouseEvent('click', {
-                            view: window,
-                            bubbles: true,
-                            cancelable: true
-                        }));
-                    """, elemento)
-                    self.log(f"    ✅ Clic exitoso (Force JavaScript)")
-                    return True
-                except:
-                    pass
+                    return efecto_original(driver)
+                finally:
+                    volver_al_elemento()
+
+            if self._efecto_cumplido(efecto):
+                self.log(f"    ✅ {descripcion}: el efecto ya está presente, no se hace clic")
+                return True
+        huella = self._huella_elemento(elemento) if efecto is not None else None
+
+        def scroll_y_clic():
+            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});",
+                                       elemento)
+            elemento.click()
+
+        estrategias = [
+            ("método normal", scroll_y_clic),
+            ("JavaScript", lambda: self.driver.execute_script("arguments[0].click();", elemento)),
+            ("ActionChains", lambda: ActionChains(self.driver).move_to_element(elemento).click().perform()),
+            ("Force JavaScript", lambda: self._llamar_helper("clic", elemento)),
+        ]
+
+        for intento in range(1, max_intentos + 1):
+            try:
+                self.log(f"    → Intento {intento}/{max_intentos} para {descripcion}...")
+
+                for nombre_estrategia, clic in estrategias:
+                    volver_al_elemento()
+                    try:
+                        clic()
+                    except:
+                        continue
+                    finally:
+                        # El clic puede recargar frames: el driver deja de estar en un path conocido
+                        self._frame_desconocido()
+                    if efecto is None:
+                        self.log(f"    ✅ Clic exitoso ({nombre_estrategia})")
+                        return True
+                    if self.esperar(f"efecto del clic: {descripcion}", efecto, espera_efecto) is not None:
+                        self.log(f"    ✅ Clic exitoso ({nombre_estrategia}, efecto verificado)")
+                        return True
+                    if huella is not None and self._huella_elemento(elemento) != huella:
+                        # El clic hizo algo (p. ej. el menú se está desplegando): otro clic lo revertiría
+                        self.log(f"    ⏳ {descripcion} cambió sin completar el efecto, se espera sin repetir el clic")
+                        if self.esperar(f"efecto del clic: {descripcion}", efecto, espera_efecto * 2) is not None:
+                            self.log(f"    ✅ Clic exitoso ({nombre_estrategia}, efecto verificado)")
+                            return True
+                        self.log(f"    ❌ {descripcion}: el efecto no se completó")
+                        return False
+                    self.log(f"    ⚠️ Clic sin efecto ({nombre_estrategia}), probando otra estrategia...")
 
                 if intento < max_intentos:
                     self.log(f"    ⚠️ Intento {intento} falló, esperando antes de reintentar...")
-                    time.sleep(2)
+                    volver_al_elemento()
+                    self.esperar("elemento clickeable", self._cond_elemento_clickeable(elemento), 2)
 
             except Exception as e:
                 self.log(f"    ❌ Error en intento {intento}: {str(e)}")
                 if intento < max_intentos:
-                    time.sleep(2)
+                    volver_al_elemento()
+                    self.esperar("elemento clickeable", self._cond_elemento_clickeable(elemento), 2)
 
         self.log(f"    ❌ FALLO: No se pudo hacer clic en {descripcion} después de {max_intentos} intentos")
         return False
 
+    # Clase, estilo y submenús visibles de un elemento: cambia en cuanto un clic
+    # empieza a desplegarlo o a navegar (None si el elemento ya no existe)
+    JS_HUELLA_ELEMENTO = """
+    var el = arguments[0];
+    var partes = [el.className, el.getAttribute('style'), el.getAttribute('aria-expanded')];
+    var listas = el.getElementsByTagName('ul');
+    for (var i = 0; i < listas.length; i++) {
+        var st = listas[i].ownerDocument.defaultView.getComputedStyle(listas[i]);
+        partes.push(st.display + '/' + st.visibility + '/' + listas[i].offsetHeight);
+    }
+    return partes.join('|');
+    """
+
+    def _huella_elemento(self, elemento):
+        try:
+            return self.driver.execute_script(self.JS_HUELLA_ELEMENTO, elemento)
+        except:
+            return None
+
+    def _efecto_cumplido(self, efecto):
+        try:
+            return bool(efecto(self.driver))
+        except:
+            return False
+
     def pausa_interactiva_y_captura(self):
         """
         🔬 FUNCIÓN DE PAUSA INTERACTIVA PARA DEBUGGING
@@ -171,6 +351,8 @@ class BotDenunciasSUNAT:
 
         Esto nos permite obtener el HTML REAL del iframe problemático.
         """
+        # Recorre los iframes con switch_to directos
+        self._frame_desconocido()
         try:
             self.log("\n" + "="*80)
             self.log("⏸️  PAUSA INTERACTIVA ACTIVADA")
@@ -323,6 +505,7 @@ class BotDenunciasSUNAT:
                 └─ Formulario con 'tipodoc'
         """
         self.log("  🔍 Accediendo al iframe anidado...")
+        self._frame_desconocido()
 
         for intento in range(1, 4):
             try:
@@ -333,51 +516,49 @@ class BotDenunciasSUNAT:
 
                 # PASO 1: Cambiar a iframe 'iframeApplication'
                 self.log("  → PASO 1: Buscando iframe 'iframeApplication'...")
-                wait = WebDriverWait(self.driver, 10)
-
-                iframe = wait.until(
-                    EC.presence_of_element_located((By.ID, "iframeApplication"))
-                )
+                iframe = self.esperar_o_fallar("iframe 'iframeApplication'",
+                                               EC.presence_of_element_located((By.ID, "iframeApplication")), 10)
                 self.log("  ✓ Iframe encontrado")
 
                 self.driver.switch_to.frame(iframe)
                 self.log("  ✓ Cambio al iframe exitoso")
-                time.sleep(1)
 
                 # PASO 2: Cambiar al frame 'det' DENTRO del iframe
                 self.log("  → PASO 2: Buscando frame 'det'...")
-                wait_frame = WebDriverWait(self.driver, 10)
-
-                frame_det = wait_frame.until(
-                    EC.presence_of_element_located((By.NAME, "det"))
-                )
+                frame_det = self.esperar_o_fallar("frame 'det'",
+                                                  EC.presence_of_element_located((By.NAME, "det")), 10)
                 self.log("  ✓ Frame 'det' encontrado")
 
                 self.driver.switch_to.frame(frame_det)
                 self.log("  ✓ Cambio al frame 'det' exitoso")
-                time.sleep(1)
 
                 # PASO 3: Verificar que el campo 'tipodoc' existe
                 self.log("  → PASO 3: Verificando campo 'tipodoc'...")
-                campo_tipodoc = wait_frame.until(
-                    EC.presence_of_element_located((By.NAME, "tipodoc"))
-                )
+                campo_tipodoc = self.esperar_o_fallar("campo 'tipodoc'",
+                                                      EC.presence_of_element_located((By.NAME, "tipodoc")), 10)
 
                 self.log("  ✅ ¡Campo 'tipodoc' encontrado!")
 
                 if campo_tipodoc.tag_name.lower() == "select":
+                    # Con carga 'eager'/'none' 'tipodoc' puede existir antes que los scripts
+                    # del final de 'det' (clickbtn_*): esperar al DOM completo del frame
+                    if not self.esperar("frame 'det' listo", self._cond_documento_listo(), 10):
+                        self.log("  ⚠️ Frame 'det' aún cargando, se continúa")
                     self.log("  ✅ Formulario completamente cargado")
+                    self._path_frame_actual = list(self.PATH_FORMULARIO)
                     return True
 
             except TimeoutException:
                 self.log(f"  ⏱️ Timeout en intento {intento}")
                 if intento < 3:
-                    time.sleep(3)
+                    self._frame_desconocido()
+                    self.esperar("documentos cargados", self._cond_documentos_cargados(), 3)
 
             except Exception as e:
                 self.log(f"  ❌ Error en intento {intento}: {str(e)[:100]}")
                 if intento < 3:
-                    time.sleep(3)
+                    self._frame_desconocido()
+                    self.esperar("documentos cargados", self._cond_documentos_cargados(), 3)
 
         self.log("  ❌ FALLO: No se pudo acceder al formulario")
         return False
@@ -385,66 +566,33 @@ class BotDenunciasSUNAT:
     def encontrar_campo_en_cualquier_iframe(self, by, valor, max_intentos=3):
         """
         MÉTODO ULTRA ROBUSTO
-        Busca un elemento en TODOS los iframes de forma recursiva
+        Busca un elemento en TODOS los iframes usando la topología de frames en caché
         """
         self.log(f"  🔍 Buscando '{valor}' en todos los iframes...")
 
         for intento in range(1, max_intentos + 1):
             try:
-                # Intentar en página principal
-                self.driver.switch_to.default_content()
-                try:
-                    elemento = self.driver.find_element(by, valor)
-                    if elemento.is_displayed():
-                        self.log(f"  ✅ Encontrado en página principal")
-                        return elemento
-                except:
-                    pass
-
-                # Buscar en iframes de nivel 1
-                iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
-                self.log(f"  → {len(iframes)} iframes detectados")
+                contextos = self._obtener_topologia_frames()
+                self.log(f"  → {len(contextos) - 1} frames en la topología")
 
-                for i, iframe in enumerate(iframes):
+                for ctx_nombre, ctx_path in contextos:
+                    if self._plazo_agotado():
+                        return None
+                    if not self._cambiar_a_contexto(ctx_path):
+                        continue
                     try:
-                        self.driver.switch_to.default_content()
-                        self.driver.switch_to.frame(i)
-
-                        # Buscar directamente
-                        try:
-                            elemento = self.driver.find_element(by, valor)
-                            if elemento.is_displayed():
-                                self.log(f"  ✅ Encontrado en iframe #{i}")
-                                return elemento
-                        except:
-                            pass
-
-                        # Buscar frames internos (nivel 2)
-                        frames_internos = self.driver.find_elements(By.TAG_NAME, "frame")
-                        frames_internos.extend(self.driver.find_elements(By.TAG_NAME, "iframe"))
-
-                        for j, frame_interno in enumerate(frames_internos):
-                            try:
-                                self.driver.switch_to.frame(j)
-
-                                elemento = self.driver.find_element(by, valor)
-                                if elemento.is_displayed():
-                                    self.log(f"  ✅ Encontrado en iframe #{i} → frame #{j}")
-                                    return elemento
-
-                                self.driver.switch_to.parent_frame()
-                            except:
-                                try:
-                                    self.driver.switch_to.parent_frame()
-                                except:
-                                    pass
-
+                        elemento = self.driver.find_element(by, valor)
+                        if elemento.is_displayed():
+                            self.log(f"  ✅ Encontrado en {ctx_nombre}")
+                            return elemento
                     except:
                         pass
 
                 if intento < max_intentos:
+                    if self._plazo_agotado(valor):
+                        return None
                     self.log(f"  → Intento {intento} falló, esperando...")
-                    time.sleep(2)
+                    self._dormir(2)
 
             except Exception as e:
                 self.log(f"  ⚠️ Error: {str(e)[:100]}")
@@ -458,61 +606,14 @@ class BotDenunciasSUNAT:
         """
         self.log(f"  🔍 Buscando campo con label '{texto_label}'...")
 
-        # XPaths que buscan por texto visible
-        xpaths = [
-            f"//td[contains(text(), '{texto_label}')]/following-sibling::td//{tipo_elemento}",
-            f"//td[contains(text(), '{texto_label}')]//following::{tipo_elemento}[1]",
-            f"//label[contains(text(), '{texto_label}')]/following::{tipo_elemento}[1]",
-        ]
-
-        # Buscar en página principal
-        self.driver.switch_to.default_content()
-        for xpath in xpaths:
-            try:
-                elemento = self.driver.find_element(By.XPATH, xpath)
-                if elemento.is_displayed():
-                    self.log(f"  ✅ Encontrado en página principal")
-                    return elemento
-            except:
-                pass
-
-        # Buscar en iframes
-        iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
-        for i, iframe in enumerate(iframes):
-            try:
-                self.driver.switch_to.default_content()
-                self.driver.switch_to.frame(i)
-
-                for xpath in xpaths:
-                    try:
-                        elemento = self.driver.find_element(By.XPATH, xpath)
-                        if elemento.is_displayed():
-                            self.log(f"  ✅ Encontrado en iframe #{i}")
-                            return elemento
-                    except:
-                        pass
-
-                # Buscar en frames internos
-                frames = self.driver.find_elements(By.TAG_NAME, "frame")
-                for j, frame in enumerate(frames):
-                    try:
-                        self.driver.switch_to.frame(j)
-
-                        for xpath in xpaths:
-                            try:
-                                elemento = self.driver.find_element(By.XPATH, xpath)
-                                if elemento.is_displayed():
-                                    self.log(f"  ✅ Encontrado en iframe #{i} → frame #{j}")
-                                    return elemento
-                            except:
-                                pass
-
-                        self.driver.switch_to.parent_frame()
-                    except:
-                        pass
+        for ctx_nombre, ctx_path in self._obtener_topologia_frames():
+            if not self._cambiar_a_contexto(ctx_path):
+                continue
 
-            except:
-                pass
+            elemento = self._buscar_por_etiqueta([texto_label], tipo_elemento)
+            if elemento:
+                self.log(f"  ✅ Encontrado en {ctx_nombre}")
+                return elemento
 
         self.log(f"  ❌ No se encontró campo con label '{texto_label}'")
         return None
@@ -530,11 +631,8 @@ class BotDenunciasSUNAT:
         # INTENTO 1: Método directo (el más rápido)
         try:
             self.log("  → Método 1: Ruta directa")
-            self.driver.switch_to.default_content()
-            self.driver.switch_to.frame("iframeApplication")
-            time.sleep(0.5)
-            self.driver.switch_to.frame("det")
-            time.sleep(0.5)
+            if not self._cambiar_a_contexto(self.PATH_FORMULARIO):
+                raise NoSuchElementException("Frame 'det' no disponible")
 
             elemento = self.driver.find_element(By.NAME, nombre_campo)
             if elemento.is_displayed():
@@ -543,12 +641,18 @@ class BotDenunciasSUNAT:
         except Exception as e:
             self.log(f"  → Método 1 falló: {str(e)[:50]}")
 
+        if self._plazo_agotado(nombre_campo):
+            return None
+
         # INTENTO 2: Búsqueda exhaustiva en iframes
         self.log("  → Método 2: Búsqueda en todos los iframes")
         elemento = self.encontrar_campo_en_cualquier_iframe(By.NAME, nombre_campo)
         if elemento:
             return elemento
 
+        if self._plazo_agotado(nombre_campo):
+            return None
+
         # INTENTO 3: Por texto visible
         mapeo_textos = {
             "tipodoc": "Tipo Documento",
@@ -720,6 +824,9 @@ class BotDenunciasSUNAT:
         5. Buscar por texto literal visible en pantalla
         6. Buscar por función onclick (para botones)
 
+        La estrategia ganadora (frame, estrategia, selector) se guarda en el
+        caché de localizadores para las filas siguientes.
+
         Returns:
             WebElement si encuentra, None si no
         """
@@ -735,9 +842,10 @@ class BotDenunciasSUNAT:
         # ═══════════════════════════════════════════════════════════════════════
         self.log(f"  📂 Buscando en contexto ACTUAL (sin cambiar iframe)...")
 
-        elemento = self._buscar_en_contexto_actual(nombre_campo, campo)
+        elemento, estrategia, selector = self._buscar_en_contexto_actual_detallado(nombre_campo, campo)
         if elemento:
             self.log(f"  ✅ ENCONTRADO en contexto actual")
+            self._registrar_localizador(nombre_campo, estrategia, selector)
             return elemento
 
         # ═══════════════════════════════════════════════════════════════════════
@@ -749,240 +857,1520 @@ class BotDenunciasSUNAT:
         contextos = self._obtener_todos_los_contextos()
 
         for ctx_nombre, ctx_path in contextos:
+            if self._plazo_agotado(nombre_campo):
+                return None
             self.log(f"  📂 Buscando en contexto: {ctx_nombre}")
 
             # Cambiar al contexto
             if not self._cambiar_a_contexto(ctx_path):
                 continue
 
-            elemento = self._buscar_en_contexto_actual(nombre_campo, campo)
+            elemento, estrategia, selector = self._buscar_en_contexto_actual_detallado(nombre_campo, campo)
             if elemento:
                 self.log(f"  ✅ ENCONTRADO en {ctx_nombre}")
+                self._registrar_localizador(nombre_campo, estrategia, selector, path=ctx_path)
                 return elemento
 
         self.log(f"  ❌ No se encontró '{nombre_campo}' en ningún contexto")
         return None
 
-    def _buscar_en_contexto_actual(self, nombre_campo, campo):
-        """
-        🔍 Busca el elemento en el contexto actual sin cambiar de iframe
+    def _buscar_en_contexto_actual_detallado(self, nombre_campo, campo):
         """
-        # ESTRATEGIA 1: Por selectores (name, id)
-        for selector in campo["selectores"]:
-            try:
-                elem = self.driver.find_element(By.NAME, selector)
-                if elem and elem.is_displayed():
-                    self.log(f"    ✓ Encontrado por NAME='{selector}'")
-                    return elem
-            except: pass
+        🔍 Busca el elemento en el contexto actual sin cambiar de iframe e indica qué estrategia ganó
 
-            try:
-                elem = self.driver.find_element(By.ID, selector)
-                if elem and elem.is_displayed():
-                    self.log(f"    ✓ Encontrado por ID='{selector}'")
-                    return elem
-            except: pass
+        Los candidatos (NAME, ID, XPATH, TEXTO, ONCLICK) se prueban en el orden
+        aprendido por las estadísticas de aciertos del campo.
 
-        # ESTRATEGIA 2: Por XPaths definidos
-        for xpath in campo["xpaths"]:
+        Returns:
+            Tupla (elemento, estrategia, selector) o (None, None, None)
+        """
+        candidatos = self._candidatos_campo(campo)
+        ordenados = self._ordenar_candidatos(nombre_campo, candidatos)
+        medidas = {}
+
+        for estrategia, selector in ordenados:
+            if self._plazo_agotado():
+                break
+            inicio = time.time()
             try:
-                elem = self.driver.find_element(By.XPATH, xpath)
-                if elem and elem.is_displayed():
-                    self.log(f"    ✓ Encontrado por XPATH")
-                    return elem
-            except: pass
+                elem = self._localizar_con_estrategia(estrategia, selector, campo["tipo"])
+            except:
+                elem = None
+            ms = (time.time() - inicio) * 1000
+            medidas[(estrategia, selector)] = ms
+            self._registrar_intento_localizador(nombre_campo, estrategia, selector, elem is not None, ms)
 
-        # ESTRATEGIA 3: Por texto visible literal
-        for texto in campo["textos_visibles"]:
-            elem = self._buscar_campo_por_texto_cercano(texto, campo["tipo"])
             if elem:
-                self.log(f"    ✓ Encontrado por TEXTO '{texto}'")
-                return elem
+                etiqueta = estrategia if estrategia in ("XPATH", "ONCLICK") else f"{estrategia} '{selector}'"
+                self.log(f"    ✓ Encontrado por {etiqueta}")
+                self._contabilizar_ahorro_orden(nombre_campo, candidatos, (estrategia, selector), medidas)
+                return elem, estrategia, selector
 
-        # ESTRATEGIA 4: Por onclick (solo botones)
-        if campo["tipo"] == "button" and "onclick" in campo:
-            for onclick in campo["onclick"]:
-                try:
-                    elem = self.driver.find_element(
-                        By.XPATH, f"//*[contains(@onclick,'{onclick.replace('()', '')}')]"
-                    )
-                    if elem:
-                        self.log(f"    ✓ Encontrado por ONCLICK='{onclick}'")
-                        return elem
-                except: pass
+        return None, None, None
 
-        return None
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 📈 ORDEN AUTOAJUSTABLE DE ESTRATEGIAS (estadísticas persistidas)
+    # ═══════════════════════════════════════════════════════════════════════════
 
-    def _obtener_todos_los_contextos(self):
+    ARCHIVO_ESTADISTICAS_LOCALIZADORES = "estadisticas_localizadores.json"
+
+    # Costo supuesto (ms) de un candidato sin mediciones previas
+    COSTO_CANDIDATO_DESCONOCIDO_MS = 50.0
+
+    def _candidatos_campo(self, campo):
         """
-        📋 Obtiene lista de todos los contextos (main + iframes) para buscar
-        Returns: Lista de tuplas (nombre, path_para_navegar)
+        📋 Lista de (estrategia, selector) de un campo en el orden escrito a mano
         """
-        contextos = [("main", [])]
+        candidatos = []
+        for selector in campo["selectores"]:
+            candidatos.append(("NAME", selector))
+            candidatos.append(("ID", selector))
+        for xpath in campo["xpaths"]:
+            candidatos.append(("XPATH", xpath))
+        for texto in campo["textos_visibles"]:
+            candidatos.append(("TEXTO", texto))
+        if campo["tipo"] == "button":
+            for onclick in campo.get("onclick", []):
+                candidatos.append(("ONCLICK", f"//*[contains(@onclick,'{onclick.replace('()', '')}')]"))
+        return candidatos
+
+    def _estadistica_candidato(self, nombre_campo, estrategia, selector):
+        return self._estadisticas_localizadores.get(nombre_campo, {}).get(f"{estrategia}:{selector}")
+
+    def _costo_medio_candidato(self, nombre_campo, estrategia, selector):
+        st = self._estadistica_candidato(nombre_campo, estrategia, selector)
+        intentos = st["aciertos"] + st["fallos"] if st else 0
+        if not intentos:
+            return self.COSTO_CANDIDATO_DESCONOCIDO_MS
+        return st["ms_total"] / intentos
+
+    def _ordenar_candidatos(self, nombre_campo, candidatos):
+        """
+        🔀 Reordena candidatos por probabilidad de acierto por milisegundo
 
-        try:
-            self.driver.switch_to.default_content()
+        Es el orden óptimo para una búsqueda secuencial que se detiene en el
+        primer acierto. Los candidatos sin datos conservan su posición relativa.
+        """
+        def prioridad(item):
+            posicion, (estrategia, selector) = item
+            st = self._estadistica_candidato(nombre_campo, estrategia, selector)
+            aciertos = st["aciertos"] if st else 0
+            fallos = st["fallos"] if st else 0
+            probabilidad = (aciertos + 1) / (aciertos + fallos + 2)
+            costo = max(self._costo_medio_candidato(nombre_campo, estrategia, selector), 0.1)
+            return (-probabilidad / costo, posicion)
+
+        return [c for _, c in sorted(enumerate(candidatos), key=prioridad)]
+
+    def _registrar_intento_localizador(self, nombre_campo, estrategia, selector, acierto, ms):
+        self._acumular_estadistica_localizador(nombre_campo, estrategia, selector,
+                                               1 if acierto else 0, 0 if acierto else 1, ms)
+
+    def _acumular_estadistica_localizador(self, nombre_campo, estrategia, selector, aciertos, fallos, ms):
+        stats_campo = self._estadisticas_localizadores.setdefault(nombre_campo, {})
+        st = stats_campo.setdefault(f"{estrategia}:{selector}", {"aciertos": 0, "fallos": 0, "ms_total": 0.0})
+        st["aciertos"] += aciertos
+        st["fallos"] += fallos
+        st["ms_total"] += ms
+
+    def _contabilizar_ahorro_orden(self, nombre_campo, candidatos, ganador, medidas):
+        """
+        ⏱️ Estima cuánto habría costado el orden fijo frente al orden aprendido
 
-            # Buscar iframes en documento principal
-            iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
-            frames = self.driver.find_elements(By.TAG_NAME, "frame")
+        Orden fijo: todos los candidatos hasta el ganador en el orden de CAMPOS_SUNAT.
+        Se usan las mediciones de esta búsqueda y, para los no probados, el promedio
+        histórico.
+        """
+        costo_real = sum(medidas.values())
+        costo_fijo = 0.0
+        for candidato in candidatos:
+            if candidato in medidas:
+                costo_fijo += medidas[candidato]
+            else:
+                costo_fijo += self._costo_medio_candidato(nombre_campo, *candidato)
+            if candidato == ganador:
+                break
 
-            self.log(f"  📊 Detectados: {len(iframes)} iframes, {len(frames)} frames en main")
+        self._ms_ahorrados_reordenamiento += costo_fijo - costo_real
+        self._busquedas_reordenadas += 1
 
-            for i, iframe in enumerate(iframes):
-                nombre = iframe.get_attribute("name") or iframe.get_attribute("id") or f"iframe_{i}"
-                contextos.append((f"iframe:{nombre}", [("iframe", nombre, i)]))
+    def _cargar_estadisticas_localizadores(self):
+        try:
+            with open(self.ARCHIVO_ESTADISTICAS_LOCALIZADORES, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
 
-                # Buscar frames anidados dentro de este iframe
-                try:
-                    self.driver.switch_to.frame(iframe)
-                    frames_internos = self.driver.find_elements(By.TAG_NAME, "frame")
-                    self.log(f"    → Dentro de '{nombre}': {len(frames_internos)} frames anidados")
-                    for j, frame in enumerate(frames_internos):
-                        nombre_frame = frame.get_attribute("name") or f"frame_{j}"
-                        self.log(f"      - Frame encontrado: '{nombre_frame}'")
-                        contextos.append((
-                            f"iframe:{nombre}→frame:{nombre_frame}",
-                            [("iframe", nombre, i), ("frame", nombre_frame, j)]
-                        ))
-                    self.driver.switch_to.default_content()
-                except Exception as e:
-                    self.log(f"    ⚠️ Error explorando iframe '{nombre}': {str(e)[:50]}")
-                    self.driver.switch_to.default_content()
+    def guardar_estadisticas_localizadores(self):
+        try:
+            with open(self.ARCHIVO_ESTADISTICAS_LOCALIZADORES, "w", encoding="utf-8") as f:
+                json.dump(self._estadisticas_localizadores, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            self.log(f"⚠️ No se pudieron guardar las estadísticas de localizadores: {e}")
 
-            for i, frame in enumerate(frames):
-                nombre = frame.get_attribute("name") or f"frame_{i}"
-                contextos.append((f"frame:{nombre}", [("frame", nombre, i)]))
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🗂️ CACHÉ DE LOCALIZADORES RESUELTOS (por sesión)
+    # ═══════════════════════════════════════════════════════════════════════════
 
-        except Exception as e:
-            self.log(f"  ⚠️ Error obteniendo contextos: {e}")
+    # Marca de "campo buscado con la cascada completa y no encontrado" dentro del
+    # caché; vale solo para la fila en curso (olvidar_ausencias() al empezar otra)
+    LOCALIZADOR_AUSENTE = "__ausente__"
 
-        self.log(f"  📋 Total contextos detectados: {len(contextos)}")
-        for ctx_nombre, _ in contextos:
-            self.log(f"     - {ctx_nombre}")
+    def _clave_localizador(self, nombre_campo):
+        """La misma 'tipodoc' es otro campo en Sección 1 y en Sección 3"""
+        return (self.seccion_actual, nombre_campo)
 
-        return contextos
+    def _obtener_path_contexto_actual(self):
+        """
+        📍 Calcula el path del frame actual (mismo formato que _obtener_todos_los_contextos)
 
-    def _cambiar_a_contexto(self, path):
+        Returns:
+            Lista [(tipo, nombre, indice), ...] o None si no se puede determinar
         """
-        🔄 Cambia al contexto especificado por el path
+        script = """
+        var path = [];
+        var w = window;
+        try {
+            while (w !== w.parent && w.frameElement) {
+                var f = w.frameElement;
+                var tipo = f.tagName.toLowerCase();
+                var hermanos = f.ownerDocument.getElementsByTagName(tipo);
+                var indice = Array.prototype.indexOf.call(hermanos, f);
+                var nombre = f.getAttribute('name') || f.id || (tipo + '_' + indice);
+                path.unshift([tipo, nombre, indice]);
+                w = w.parent;
+            }
+        } catch (e) {
+            return null;
+        }
+        return path;
         """
         try:
-            self.driver.switch_to.default_content()
-
-            for tipo, nombre, indice in path:
-                if tipo in ("iframe", "frame"):
-                    try:
-                        # Intentar por nombre primero
-                        self.driver.switch_to.frame(nombre)
-                    except:
-                        # Si falla, intentar por índice
-                        elementos = self.driver.find_elements(By.TAG_NAME, tipo)
-                        if indice < len(elementos):
-                            self.driver.switch_to.frame(elementos[indice])
-                        else:
-                            return False
-            return True
+            path = self.driver.execute_script(script)
+            if path is None:
+                return None
+            # La respuesta del navegador es la posición real del driver
+            self._path_frame_actual = [tuple(paso) for paso in path]
+            return list(self._path_frame_actual)
         except:
-            return False
+            return None
 
-    def _buscar_campo_por_texto_cercano(self, texto, tipo_elemento):
+    def _registrar_localizador(self, nombre_campo, estrategia, selector, path=None):
         """
-        🔍 Busca un campo por el texto visible que aparece cerca (en la misma fila, celda, etc.)
+        💾 Guarda la estrategia ganadora de un campo para las filas siguientes
         """
-        # XPaths para encontrar el campo asociado al texto
-        xpaths_busqueda = [
-            # Texto en TD, campo en siguiente TD
-            f"//td[contains(normalize-space(text()),'{texto}')]/following-sibling::td[1]//{tipo_elemento if tipo_elemento != 'button' else '*'}",
-            # Texto en TD, campo en TD siguiente cualquier nivel
-            f"//td[contains(normalize-space(.),'{texto}')]/following::td[1]//{tipo_elemento if tipo_elemento != 'button' else '*'}[1]",
-            # Texto en cualquier elemento, campo siguiente
-            f"//*[contains(normalize-space(text()),'{texto}')]/following::{tipo_elemento if tipo_elemento != 'button' else '*'}[1]",
-            # Label con for
-            f"//label[contains(normalize-space(.),'{texto}')]/@for",
-            # Texto en TH, campo en TD de misma fila
-            f"//tr[th[contains(normalize-space(.),'{texto}')]]/td//{tipo_elemento if tipo_elemento != 'button' else '*'}",
-        ]
+        if path is None:
+            path = self._obtener_path_contexto_actual()
+            if path is None:
+                return
 
-        # Para botones, agregar búsquedas específicas
-        if tipo_elemento == "button":
-            xpaths_busqueda.extend([
-                f"//input[@type='button'][@value='{texto}']",
-                f"//input[@type='submit'][@value='{texto}']",
-                f"//button[normalize-space(.)='{texto}']",
-                f"//a[normalize-space(.)='{texto}']",
-                f"//input[@type='button'][contains(@value,'{texto}')]",
-            ])
-
-        for xpath in xpaths_busqueda:
-            try:
-                # Si es un atributo (for), obtener el ID y buscar el elemento
-                if "/@for" in xpath:
-                    label = self.driver.find_element(By.XPATH, xpath.replace("/@for", ""))
-                    for_id = label.get_attribute("for")
-                    if for_id:
-                        elem = self.driver.find_element(By.ID, for_id)
-                        if elem and elem.is_displayed():
-                            return elem
-                else:
-                    elem = self.driver.find_element(By.XPATH, xpath)
-                    if elem and elem.is_displayed():
-                        return elem
-            except:
-                pass
+        self._cache_localizadores[self._clave_localizador(nombre_campo)] = {
+            "path": list(path),
+            "estrategia": estrategia,
+            "selector": selector
+        }
 
-        return None
+    def _registrar_localizador_desde_elemento(self, nombre_campo, elemento):
+        """
+        💾 Guarda un localizador reproducible (NAME o ID) de un elemento hallado
+        por los métodos de fallback, que no informan su estrategia
+        """
+        try:
+            nombre = elemento.get_attribute("name")
+            if nombre:
+                self._registrar_localizador(nombre_campo, "NAME", nombre)
+                return
+            id_elem = elemento.get_attribute("id")
+            if id_elem:
+                self._registrar_localizador(nombre_campo, "ID", id_elem)
+        except:
+            pass
 
-    # ═══════════════════════════════════════════════════════════════════════════
-    # MÉTODOS DE COMPATIBILIDAD (mantener los anteriores funcionando)
-    # ═══════════════════════════════════════════════════════════════════════════
+    def _registrar_ausencia(self, nombre_campo):
+        self._cache_localizadores[self._clave_localizador(nombre_campo)] = self.LOCALIZADOR_AUSENTE
 
-    def buscar_elemento_universal(self, nombre_campo, tipo_elemento="input"):
-        """
-        🎯 MÉTODO MAESTRO - Ahora usa el sistema profesional primero
+    def olvidar_ausencias(self):
+        """Un campo condicional ausente en una fila puede aparecer en la siguiente"""
+        for clave in [c for c, entrada in self._cache_localizadores.items() if entrada == self.LOCALIZADOR_AUSENTE]:
+            del self._cache_localizadores[clave]
+
+    def _campo_reaparecido(self, nombre_campo, tipo_elemento):
         """
-        # Primero intentar con el sistema profesional
-        resultado = self.buscar_elemento_profesional(nombre_campo)
-        if resultado:
-            return resultado
+        🔁 Busca de nuevo, sin esperas, un campo marcado como ausente
 
-        # Fallback al sistema anterior
-        self.log(f"  → Usando sistema de fallback para '{nombre_campo}'...")
+        Con el resolutor JS: una consulta con todos sus candidatos en todos los
+        frames. Sin él: los NAME de su definición dentro de PATH_FORMULARIO.
 
-        # Mapeo de campos a textos visibles literales
-        mapeo_textos = {
-            # SECCIÓN 1: Identificación del denunciado
-            "tipodoc": ["Tipo Documento", "Tipo Doc", "TIPO DOCUMENTO"],
-            "numdoc": ["Número", "Numero", "NRO", "NÚMERO"],
-            "nombre": ["Apellidos y Nombres", "Razón social", "APELLIDOS"],
-            "buscar": ["Buscar", "BUSCAR"],
-            "siguiente": ["Siguiente", "SIGUIENTE", "Validar"],
-
-            # SECCIÓN 2: Atención de denuncias
-            "modalidad": ["Modalidad Evasión Denunciada", "Modalidad", "MODALIDAD"],
-            "detalle": ["DETALLE DE LA DENUNCIA", "Detalle", "DETALLE"],
-            "fecha_sid": ["Fecha SID", "FECHA SID"],
-            "MesDesde": ["Del Mes", "Mes Desde", "DEL MES"],
-            "AnioDesde": ["Del Año", "Año Desde", "DEL AÑO"],
-            "MesHasta": ["Al Mes", "Mes Hasta", "AL MES"],
-            "AnioHasta": ["Al Año", "Año Hasta", "AL AÑO"],
-            "elementos": ["Tipo de Pruebas", "Elementos", "ELEMENTOS"],
-            "otros": ["Otros", "OTROS", "Detalle Otros"],
-
-            # SECCIÓN 3: Identificación del denunciante
-            "dpto": ["Departamento", "DEPARTAMENTO"],
-            "prov": ["Provincia", "PROVINCIA"],
-            "dist": ["Distrito", "DISTRITO"],
-            "telefono": ["Teléfono", "TELEFONO", "Telefono"],
-            "correo": ["Correo", "CORREO", "Email", "Correo Electrónico"],
-            "tipvia": ["Tipo Vía", "Vía", "TIPO VIA"],
-            "nomvia": ["Nombre Vía", "Nombre de Vía", "NOMBRE VIA"]
-        }
+        Returns:
+            El elemento visible o None
+        """
+        if self.modo_resolutor_js:
+            elemento, _ = self.resolver_campo_en_navegador(nombre_campo, tipo_elemento)
+            return elemento
 
-        # ═══════════════════════════════════════
-        # INTENTO 1: JavaScript en todos los iframes
-        # ═══════════════════════════════════════
-        self.log("  → Intento 1: JavaScript en iframes...")
+        if not self._cambiar_a_contexto(self.PATH_FORMULARIO):
+            return None
+        definicion = self._definicion_campo(nombre_campo, tipo_elemento)
+        for nombre in definicion["selectores"]:
+            for elemento in self.driver.find_elements(By.NAME, nombre):
+                if elemento.is_displayed():
+                    return elemento
+        return None
+
+    def _localizar_con_estrategia(self, estrategia, selector, tipo_elemento):
+        """
+        🎯 Reproduce UNA estrategia concreta en el contexto actual
+
+        Lanza NoSuchElementException / StaleElementReferenceException si el
+        localizador ya no sirve.
+        """
+        if estrategia == "NAME":
+            elem = self.driver.find_element(By.NAME, selector)
+        elif estrategia == "ID":
+            elem = self.driver.find_element(By.ID, selector)
+        elif estrategia in ("XPATH", "ONCLICK"):
+            elem = self.driver.find_element(By.XPATH, selector)
+        elif estrategia == "TEXTO":
+            elem = self._buscar_campo_por_texto_cercano(selector, tipo_elemento)
+            if not elem:
+                raise NoSuchElementException(f"Texto '{selector}' sin campo asociado")
+        else:
+            raise NoSuchElementException(f"Estrategia desconocida: {estrategia}")
+
+        if estrategia != "ONCLICK" and not elem.is_displayed():
+            raise NoSuchElementException(f"{estrategia}='{selector}' no visible")
+        return elem
+
+    def _consultar_cache_localizador(self, nombre_campo, tipo_elemento="input"):
+        """
+        ⚡ Resuelve un campo desde el caché sin recorrer la cascada
+
+        Returns:
+            Tupla (estado, elemento) donde estado es:
+            - "acierto": elemento encontrado con el localizador guardado
+            - "ausente": el campo ya se buscó sin éxito en esta fila y sección
+            - "sin_datos": no hay entrada utilizable (o se descartó)
+        """
+        clave = self._clave_localizador(nombre_campo)
+        entrada = self._cache_localizadores.get(clave)
+
+        if entrada is None:
+            return "sin_datos", None
+
+        if entrada == self.LOCALIZADOR_AUSENTE:
+            # Comprobación barata: el campo pudo aparecer después (p. ej. 'otros')
+            try:
+                elem = self._campo_reaparecido(nombre_campo, tipo_elemento)
+            except:
+                elem = None
+            if elem is not None:
+                self.log(f"  🗂️ '{nombre_campo}' ya no está ausente, se descarta la marca")
+                if self._cache_localizadores.get(clave) == self.LOCALIZADOR_AUSENTE:
+                    del self._cache_localizadores[clave]
+                    self._registrar_localizador_desde_elemento(nombre_campo, elem)
+                return "acierto", elem
+            self.log(f"  🗂️ Caché: '{nombre_campo}' conocido como ausente en {self.seccion_actual}")
+            return "ausente", None
+
+        try:
+            if not self._cambiar_a_contexto(entrada["path"]):
+                raise NoSuchElementException("El frame guardado ya no existe")
+            elem = self._localizar_con_estrategia(entrada["estrategia"], entrada["selector"], tipo_elemento)
+            self.log(f"  🗂️ Caché: '{nombre_campo}' por {entrada['estrategia']}")
+            return "acierto", elem
+        except (StaleElementReferenceException, NoSuchElementException):
+            self.log(f"  🗂️ Caché: localizador de '{nombre_campo}' invalidado, se repite la búsqueda")
+            del self._cache_localizadores[clave]
+            return "sin_datos", None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🏷️ ÍNDICE ETIQUETA → CONTROL (uno por frame y carga de página)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Funciones de etiquetas usadas por window.__botHelpers (etiqueta y resolver).
+    # construirIndice() recorre el documento UNA vez en orden y asocia cada texto
+    # de td/th/label (normalizado, sin tildes, en mayúsculas) con el primer
+    # input/select/botón que le sigue (equivalente a following::tipo[1]); label[for]
+    # apunta a su control y los botones/enlaces se indexan por su propio texto.
+    # El índice vive en el documento: una recarga del frame lo descarta y un
+    # cambio de estructura (fuera de los SELECT) lo invalida.
+    JS_FUNCIONES_ETIQUETAS = r"""
+    function plegar(t) {
+        return (t || '').normalize('NFD').replace(/[\u0300-\u036f]/g, '')
+            .replace(/\s+/g, ' ').trim().toUpperCase();
+    }
+    function esVisible(el) {
+        if (!el || el.type === 'hidden') return false;
+        var st = el.ownerDocument.defaultView.getComputedStyle(el);
+        if (st.display === 'none' || st.visibility === 'hidden') return false;
+        return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    }
+    function tipoControl(el) {
+        var tag = el.tagName;
+        if (tag === 'SELECT') return 'select';
+        if (tag === 'TEXTAREA') return 'input';
+        if (tag === 'BUTTON') return 'button';
+        if (tag === 'INPUT') {
+            var ty = (el.type || 'text').toLowerCase();
+            if (ty === 'hidden') return null;
+            if (ty === 'button' || ty === 'submit' || ty === 'reset' || ty === 'image') return 'button';
+            return 'input';
+        }
+        return null;
+    }
+    function textoEtiqueta(el) {
+        var texto = '';
+        if (el.querySelector('table, td, input, select, textarea')) {
+            for (var n = el.firstChild; n; n = n.nextSibling) {
+                if (n.nodeType === 3) texto += n.nodeValue + ' ';
+            }
+        } else {
+            texto = el.textContent;
+        }
+        texto = plegar(texto);
+        return texto && texto.length <= 120 ? texto : null;
+    }
+    function construirIndice(doc) {
+        var entradas = [];
+        var pendientes = {input: [], select: [], button: []};
+        var todos = doc.getElementsByTagName('*');
+        for (var i = 0; i < todos.length; i++) {
+            var el = todos[i];
+            var tag = el.tagName;
+            var tipo = tipoControl(el);
+            if (tipo) {
+                var esperando = pendientes[tipo];
+                for (var k = 0; k < esperando.length; k++) {
+                    if (!esperando[k].c[tipo]) esperando[k].c[tipo] = el;
+                }
+                pendientes[tipo] = [];
+                if (tipo === 'button') {
+                    var rotulo = plegar(el.value || el.textContent);
+                    if (rotulo) entradas.push({t: rotulo, c: {button: el}});
+                }
+            } else if (tag === 'A') {
+                var textoEnlace = plegar(el.textContent);
+                if (textoEnlace) entradas.push({t: textoEnlace, c: {button: el}});
+            } else if (tag === 'TD' || tag === 'TH' || tag === 'LABEL') {
+                var texto = textoEtiqueta(el);
+                if (!texto) continue;
+                var entrada = {t: texto, c: {}};
+                if (tag === 'LABEL' && el.htmlFor) {
+                    var destino = doc.getElementById(el.htmlFor);
+                    var tipoDestino = destino && tipoControl(destino);
+                    if (tipoDestino) entrada.c[tipoDestino] = destino;
+                }
+                entradas.push(entrada);
+                for (var clave in pendientes) {
+                    if (!entrada.c[clave]) pendientes[clave].push(entrada);
+                }
+            }
+        }
+        return entradas;
+    }
+    function indiceDe(doc) {
+        if (!doc.__botIndiceEtiquetas) {
+            doc.__botIndiceEtiquetas = construirIndice(doc);
+            if (!doc.__botIndiceVigilado) {
+                doc.__botIndiceVigilado = true;
+                new doc.defaultView.MutationObserver(function (mutaciones) {
+                    for (var i = 0; i < mutaciones.length; i++) {
+                        var objetivo = mutaciones[i].target;
+                        if (objetivo.nodeType === 1 && objetivo.closest && objetivo.closest('select')) continue;
+                        doc.__botIndiceEtiquetas = null;
+                        return;
+                    }
+                }).observe(doc.documentElement, {childList: true, subtree: true});
+            }
+        }
+        return doc.__botIndiceEtiquetas;
+    }
+    function buscarPorEtiqueta(doc, textos, tipo) {
+        var indice = indiceDe(doc);
+        var clave = (tipo === 'select' || tipo === 'button') ? tipo : 'input';
+        for (var q = 0; q < textos.length; q++) {
+            var buscado = plegar(textos[q]);
+            if (!buscado) continue;
+            var parcial = null;
+            for (var i = 0; i < indice.length; i++) {
+                var el = indice[i].c[clave];
+                if (!el || !el.isConnected || !esVisible(el)) continue;
+                if (indice[i].t === buscado) return el;
+                if (!parcial && indice[i].t.indexOf(buscado) !== -1) parcial = el;
+            }
+            if (parcial) return parcial;
+        }
+        return null;
+    }
+    """
+
+    def _buscar_por_etiqueta(self, textos, tipo_elemento="input"):
+        """
+        🏷️ Busca en el frame actual el control asociado a alguno de los textos
+
+        Usa el índice etiqueta → control del documento (se construye en la
+        primera consulta del frame y se reutiliza hasta que la página cambie).
+        """
+        try:
+            return self._llamar_helper("etiqueta", list(textos), tipo_elemento)
+        except:
+            return None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🧰 HELPERS JS INSTALADOS POR FRAME (window.__botHelpers)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Respuesta de JS_LLAMAR_HELPER cuando el frame no tiene los helpers
+    # (primera visita o el frame se recargó y perdió su window)
+    SIN_HELPERS = "__bot_sin_helpers__"
+
+    JS_LLAMAR_HELPER = """
+    var h = window.__botHelpers;
+    if (!h) return '__bot_sin_helpers__';
+    return h[arguments[0]].apply(null, Array.prototype.slice.call(arguments, 1));
+    """
+
+    def _llamar_helper(self, funcion, *args):
+        """
+        🧰 Invoca una función de window.__botHelpers en el frame actual
+
+        Solo viajan el nombre de la función y sus argumentos; la librería
+        (JS_HELPERS_BOT) se envía únicamente cuando el frame no la tiene.
+        """
+        resultado = self.driver.execute_script(self.JS_LLAMAR_HELPER, funcion, *args)
+        if isinstance(resultado, str) and resultado == self.SIN_HELPERS:
+            self.driver.execute_script(self.JS_HELPERS_BOT)
+            self._instalaciones_helpers += 1
+            resultado = self.driver.execute_script(self.JS_LLAMAR_HELPER, funcion, *args)
+        return resultado
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # ⚡ RESOLUTOR EN UN SOLO VIAJE (todas las estrategias, todos los frames)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Recorre window.top y sus frames del mismo origen evaluando, en cada documento,
+    # los candidatos del campo en el orden recibido (el mismo que usa
+    # _buscar_en_contexto_actual_detallado). El ganador queda marcado con
+    # data-bot-campo para recuperarlo con un solo find; se devuelven además
+    # aciertos/fallos/ms por candidato para las estadísticas de orden.
+    # Se instala como parte de window.__botHelpers (ver JS_HELPERS_BOT).
+    JS_FUNCION_RESOLUTOR = r"""
+    function resolverCampo(spec) {
+    var bloqueados = 0;
+    var respaldo = null;
+    var medidas = [];
+
+    function porXpath(doc, xp) {
+        try {
+            return doc.evaluate(xp, doc, null, 9, null).singleNodeValue;
+        } catch (e) { return null; }
+    }
+    function evaluar(doc, c, indice, path) {
+        var el;
+        if (c[0] === 'NAME' || c[0] === 'ID') {
+            el = c[0] === 'NAME' ? doc.getElementsByName(c[1])[0] : doc.getElementById(c[1]);
+            if (esVisible(el)) return el;
+            // Campo presente pero oculto: solo se usa si no hay nada visible
+            if (el && !el.disabled && !respaldo) respaldo = {el: el, path: path, indice: indice};
+            return null;
+        }
+        if (c[0] === 'XPATH') {
+            el = porXpath(doc, c[1]);
+            return esVisible(el) ? el : null;
+        }
+        if (c[0] === 'TEXTO') return buscarPorEtiqueta(doc, [c[1]], spec.tipo);
+        if (c[0] === 'ONCLICK') return porXpath(doc, c[1]);
+        return null;
+    }
+    function buscarEnDoc(doc, path) {
+        for (var i = 0; i < spec.candidatos.length; i++) {
+            var t0 = performance.now();
+            var el = evaluar(doc, spec.candidatos[i], i, path);
+            var m = medidas[i] || (medidas[i] = [0, 0, 0]);
+            m[2] += performance.now() - t0;
+            if (el) { m[0]++; return {el: el, indice: i, path: path}; }
+            m[1]++;
+        }
+        return null;
+    }
+    function recorrer(win, path, profundidad) {
+        var doc;
+        try { doc = win.document; doc.documentElement; } catch (e) { bloqueados++; return null; }
+        if (!doc) return null;
+        var r = buscarEnDoc(doc, path);
+        if (r) return r;
+        if (profundidad >= 3) return null;
+        var tipos = ['iframe', 'frame'];
+        for (var t = 0; t < tipos.length; t++) {
+            var frames = doc.getElementsByTagName(tipos[t]);
+            for (var k = 0; k < frames.length; k++) {
+                var f = frames[k];
+                var nombre = f.getAttribute('name') || f.id || (tipos[t] + '_' + k);
+                var sub = null;
+                try { sub = f.contentWindow; } catch (e) { bloqueados++; continue; }
+                if (!sub) continue;
+                var res = recorrer(sub, path.concat([[tipos[t], nombre, k]]), profundidad + 1);
+                if (res) return res;
+            }
+        }
+        return null;
+    }
+
+    var res = recorrer(window.top, [], 0);
+    var oculto = false;
+    if (!res && respaldo) { res = respaldo; oculto = true; }
+    if (!res) return {encontrado: false, bloqueados: bloqueados, medidas: medidas};
+
+    var previos = res.el.ownerDocument.querySelectorAll('[data-bot-campo="' + spec.nombre + '"]');
+    for (var p = 0; p < previos.length; p++) previos[p].removeAttribute('data-bot-campo');
+    res.el.setAttribute('data-bot-campo', spec.nombre);
+    return {encontrado: true, path: res.path, indice: res.indice, oculto: oculto,
+            bloqueados: bloqueados, medidas: medidas};
+    }
+    """
+
+    # Librería que _llamar_helper instala en cada frame. Vive en su window, así
+    # que una recarga del frame la descarta y la siguiente llamada la reinstala.
+    JS_HELPERS_BOT = JS_FUNCIONES_ETIQUETAS + JS_FUNCION_RESOLUTOR + r"""
+    function porNombre(doc, nombre) {
+        return doc.querySelector('[name="' + nombre + '"]') || doc.getElementById(nombre);
+    }
+    // Firma de la lista de un SELECT: cantidad + hash de los value
+    function firmaDe(el) {
+        var valores = [];
+        for (var i = 0; i < el.options.length; i++) valores.push(el.options[i].value);
+        var texto = valores.join('|');
+        var h = 5381;
+        for (var k = 0; k < texto.length; k++) h = ((h * 33) ^ texto.charCodeAt(k)) >>> 0;
+        return el.options.length + ':' + h;
+    }
+    // Firma y, si difiere de 'firma', las opciones [[value, texto], ...]
+    function opcionesDe(el, firma) {
+        var sello = firmaDe(el);
+        if (sello === firma) return {firma: sello};
+        var lista = [];
+        for (var j = 0; j < el.options.length; j++) {
+            lista.push([el.options[j].value, el.options[j].text.trim()]);
+        }
+        return {firma: sello, opciones: lista};
+    }
+    function selectPorNombre(nombre) {
+        var el = document.getElementsByName(nombre)[0];
+        return el && el.options ? el : null;
+    }
+    function framesDe(doc) {
+        var docs = [];
+        var frames = doc.querySelectorAll('iframe, frame');
+        for (var i = 0; i < frames.length; i++) {
+            try {
+                var d = frames[i].contentDocument || frames[i].contentWindow.document;
+                if (d) docs.push(d);
+            } catch (e) {
+                // Error de Same-Origin, continuar con siguiente iframe
+            }
+        }
+        return docs;
+    }
+    window.__botHelpers = {
+        // name/id en el documento, sus iframes y los frames anidados en ellos
+        buscar: function (nombre) {
+            var el = porNombre(document, nombre);
+            if (el) return el;
+            var docs = framesDe(document);
+            for (var i = 0; i < docs.length; i++) {
+                el = porNombre(docs[i], nombre);
+                if (el) return el;
+                var internos = framesDe(docs[i]);
+                for (var j = 0; j < internos.length; j++) {
+                    el = porNombre(internos[j], nombre);
+                    if (el) return el;
+                }
+            }
+            return null;
+        },
+        // Primer elemento con ese name, solo en este documento
+        nombre: function (nombre) {
+            return document.getElementsByName(nombre)[0] || null;
+        },
+        etiqueta: function (textos, tipo) {
+            return buscarPorEtiqueta(document, textos, tipo);
+        },
+        resolver: resolverCampo,
+        llenar: function (el, valor) {
+            el.value = valor;
+            el.dispatchEvent(new Event('input', {bubbles: true}));
+            el.dispatchEvent(new Event('change', {bubbles: true}));
+            return el.value;
+        },
+        valor: function (el) {
+            return el.value;
+        },
+        clic: function (el) {
+            return el.dispatchEvent(new MouseEvent('click', {
+                view: el.ownerDocument.defaultView,
+                bubbles: true,
+                cancelable: true
+            }));
+        },
+        listo: function () {
+            return document.readyState === 'complete';
+        },
+        opciones: opcionesDe,
+        // {nombre: [value, texto]} de selects (opción elegida), radios (marcado) e inputs
+        valores: function (nombres) {
+            var r = {};
+            for (var i = 0; i < nombres.length; i++) {
+                var grupo = document.getElementsByName(nombres[i]);
+                var el = grupo[0];
+                if (!el) { r[nombres[i]] = null; continue; }
+                if (el.options) {
+                    var op = el.options[el.selectedIndex];
+                    r[nombres[i]] = [el.value, op ? op.text.trim() : ''];
+                } else if (el.type === 'radio' || el.type === 'checkbox') {
+                    var marcado = '';
+                    for (var k = 0; k < grupo.length; k++) if (grupo[k].checked) marcado = grupo[k].value;
+                    r[nombres[i]] = [marcado, marcado];
+                } else {
+                    r[nombres[i]] = [el.value, el.value];
+                }
+            }
+            return r;
+        },
+        firmaPorNombre: function (nombre) {
+            var el = selectPorNombre(nombre);
+            return el ? firmaDe(el) : null;
+        },
+        opcionesPorNombre: function (nombre, firma) {
+            var el = selectPorNombre(nombre);
+            return el ? opcionesDe(el, firma) : null;
+        },
+        // SELECT visible cuyo name empieza con 'prefijo'; con 'value' y la lista
+        // sin cambios (misma firma) lo deja elegido en la misma llamada
+        submodalidad: function (prefijo, firma, value) {
+            var selects = document.getElementsByTagName('select');
+            for (var i = 0; i < selects.length; i++) {
+                var el = selects[i];
+                if ((el.name || '').indexOf(prefijo) !== 0 || !esVisible(el)) continue;
+                var r = opcionesDe(el, firma);
+                r.nombre = el.name;
+                r.el = el;
+                r.elegido = false;
+                if (value !== null && r.opciones === undefined) {
+                    for (var k = 0; k < el.options.length; k++) {
+                        if (el.options[k].value !== value) continue;
+                        if (el.selectedIndex !== k) {
+                            el.selectedIndex = k;
+                            el.dispatchEvent(new Event('change', {bubbles: true}));
+                        }
+                        r.elegido = true;
+                        break;
+                    }
+                }
+                return r;
+            }
+            return null;
+        },
+        // Predicados de sección lista en window.top y sus frames:
+        // título visible (texto plegado), campo clave visible y habilitado, documentos cargados
+        // ('complete' con spec.completo; si no, basta el DOM parseado)
+        seccion: function (spec) {
+            var r = {titulo: spec.titulos.length === 0, campo: !spec.campo, cargando: 0};
+            function revisar(win, profundidad) {
+                var doc;
+                try { doc = win.document; doc.documentElement; } catch (e) { return; }
+                if (!doc) return;
+                if (spec.completo ? doc.readyState !== 'complete' : doc.readyState === 'loading') r.cargando++;
+                if (!r.titulo && doc.body) {
+                    var walker = doc.createTreeWalker(doc.body, NodeFilter.SHOW_TEXT, null, false);
+                    var nodo;
+                    while (!r.titulo && (nodo = walker.nextNode())) {
+                        var texto = plegar(nodo.nodeValue);
+                        if (!texto) continue;
+                        for (var t = 0; t < spec.titulos.length; t++) {
+                            if (texto.indexOf(spec.titulos[t]) !== -1 && esVisible(nodo.parentElement)) {
+                                r.titulo = true;
+                                break;
+                            }
+                        }
+                    }
+                }
+                if (!r.campo) {
+                    var el = doc.getElementsByName(spec.campo)[0];
+                    if (esVisible(el) && !el.disabled) r.campo = true;
+                }
+                if (profundidad >= 3) return;
+                for (var k = 0; k < win.frames.length; k++) revisar(win.frames[k], profundidad + 1);
+            }
+            revisar(window.top, 0);
+            r.lista = r.titulo && r.campo && r.cargando === 0;
+            return r;
+        },
+        // resolverCampo para cada spec, con su duración en ms
+        verificar: function (specs) {
+            var resultados = [];
+            for (var i = 0; i < specs.length; i++) {
+                var t0 = performance.now();
+                var r = resolverCampo(specs[i]);
+                r.ms = performance.now() - t0;
+                resultados.push(r);
+            }
+            return resultados;
+        },
+        // Contador de XHR/fetch/envíos de formulario: se instala en cada documento
+        // nuevo de window.top y sus frames. 'marcar' fija el inicio de una acción;
+        // 'completo' cuenta como cargando todo documento que no llegó a 'complete'.
+        red: function (marcar, completo) {
+            var top = window.top;
+            if (marcar || !top.__botActividad) top.__botActividad = top.__botMarca = Date.now();
+            if (!top.__botEnvios) top.__botEnvios = [];
+            var r = {pendientes: 0, envios: 0, cargando: 0};
+            function actividad() { top.__botActividad = Date.now(); }
+            // Algo empezó (petición, envío o navegación): es lo que cuenta como efecto de la acción
+            function inicio() { actividad(); top.__botInicio = top.__botActividad; }
+            function instalar(win) {
+                if (win.__botRed) return;
+                var estado = win.__botRed = {pendientes: 0, enviado: false};
+                var fin = function () { estado.pendientes--; actividad(); };
+                var send = win.XMLHttpRequest.prototype.send;
+                win.XMLHttpRequest.prototype.send = function () {
+                    estado.pendientes++;
+                    inicio();
+                    this.addEventListener('loadend', fin);
+                    return send.apply(this, arguments);
+                };
+                if (win.fetch) {
+                    var fetchOriginal = win.fetch;
+                    win.fetch = function () {
+                        estado.pendientes++;
+                        inicio();
+                        var p = fetchOriginal.apply(this, arguments);
+                        p.then(fin, fin);
+                        return p;
+                    };
+                }
+                // Envío o navegación: pendiente hasta el 'load' del frame que lo contiene
+                function envio() {
+                    if (estado.enviado) return;
+                    estado.enviado = true;
+                    inicio();
+                    var marco = win.frameElement;
+                    if (!marco) return;
+                    top.__botEnvios.push(marco);
+                    marco.addEventListener('load', function cargado() {
+                        marco.removeEventListener('load', cargado);
+                        var i = top.__botEnvios.indexOf(marco);
+                        if (i !== -1) top.__botEnvios.splice(i, 1);
+                        actividad();
+                    });
+                }
+                var submit = win.HTMLFormElement.prototype.submit;
+                win.HTMLFormElement.prototype.submit = function () {
+                    envio();
+                    return submit.apply(this, arguments);
+                };
+                win.document.addEventListener('submit', envio, true);
+                win.addEventListener('beforeunload', envio);
+            }
+            function revisar(win, profundidad) {
+                var doc;
+                try { doc = win.document; doc.documentElement; } catch (e) { return; }
+                if (!doc) return;
+                instalar(win);
+                r.pendientes += win.__botRed.pendientes;
+                if (completo ? doc.readyState !== 'complete' : doc.readyState === 'loading') r.cargando++;
+                if (profundidad >= 3) return;
+                for (var k = 0; k < win.frames.length; k++) revisar(win.frames[k], profundidad + 1);
+            }
+            revisar(top, 0);
+            // Un frame quitado junto con su documento padre ya no dispara 'load'
+            top.__botEnvios = top.__botEnvios.filter(function (m) {
+                try { return m.isConnected && !!m.ownerDocument.defaultView; } catch (e) { return false; }
+            });
+            r.envios = top.__botEnvios.length;
+            r.quieto_ms = Date.now() - top.__botActividad;
+            // Lo que ya estaba pendiente o cargando al marcar no cuenta
+            r.actividad = top.__botInicio >= top.__botMarca;
+            return r;
+        },
+        elegir: function (el, indice) {
+            el.selectedIndex = indice;
+            el.dispatchEvent(new Event('change', {bubbles: true}));
+            return el.selectedIndex === indice;
+        },
+        // Marcadores de éxito y líneas de error del frame del formulario (spec.marco)
+        // spec: {marco, textos, errores (plegados), contenedores_error (selector CSS),
+        //        campos_con_valor, campos_presentes, selects_con_opciones}
+        // Devuelve TODOS los marcadores presentes: el llamador los compara con los de antes de la acción
+        estado: function (spec) {
+            var exitos = [];
+            var errores = [];
+            function buscarMarco(win, profundidad) {
+                try { if (win.name === spec.marco) return win; } catch (e) { return null; }
+                if (profundidad >= 3) return null;
+                for (var k = 0; k < win.frames.length; k++) {
+                    var encontrado = buscarMarco(win.frames[k], profundidad + 1);
+                    if (encontrado) return encontrado;
+                }
+                return null;
+            }
+            var doc = null;
+            try { doc = buscarMarco(window.top, 0).document; doc.documentElement; } catch (e) { doc = null; }
+            if (!doc || !doc.body) return {exitos: exitos, errores: errores};
+
+            var texto = plegar(doc.body.innerText || '');
+            for (var t = 0; t < spec.textos.length; t++) {
+                if (texto.indexOf(spec.textos[t]) !== -1) exitos.push('texto "' + spec.textos[t] + '"');
+            }
+            // Solo las líneas de contenedores de error visibles (no instrucciones fijas de la sección)
+            var vistas = {};
+            var contenedores = doc.querySelectorAll(spec.contenedores_error);
+            for (var c = 0; c < contenedores.length; c++) {
+                if (!esVisible(contenedores[c])) continue;
+                var lineas = (contenedores[c].innerText || '').split('\n');
+                for (var l = 0; l < lineas.length; l++) {
+                    var linea = lineas[l].trim().slice(0, 200);
+                    var plegada = plegar(linea);
+                    if (!plegada || vistas[plegada]) continue;
+                    for (var f = 0; f < spec.errores.length; f++) {
+                        if (plegada.indexOf(spec.errores[f]) !== -1) {
+                            vistas[plegada] = true;
+                            errores.push([spec.errores[f], linea]);
+                            break;
+                        }
+                    }
+                }
+            }
+            var inputs = doc.getElementsByTagName('input');
+            for (var i = 0; i < inputs.length; i++) {
+                var id = (inputs[i].name || '') + ' ' + (inputs[i].id || '');
+                for (var v = 0; v < spec.campos_con_valor.length; v++) {
+                    if (id.indexOf(spec.campos_con_valor[v]) !== -1 && inputs[i].value.trim().length > 2) {
+                        exitos.push('campo "' + spec.campos_con_valor[v] + '" = ' + inputs[i].value.trim().slice(0, 60));
+                    }
+                }
+            }
+            for (var p = 0; p < spec.campos_presentes.length; p++) {
+                if (esVisible(doc.getElementsByName(spec.campos_presentes[p])[0])) {
+                    exitos.push('campo "' + spec.campos_presentes[p] + '"');
+                }
+            }
+            for (var s = 0; s < spec.selects_con_opciones.length; s++) {
+                var sel = doc.getElementsByName(spec.selects_con_opciones[s])[0];
+                if (sel && sel.options && sel.options.length > 1) {
+                    exitos.push('select "' + spec.selects_con_opciones[s] + '" con ' + sel.options.length + ' opciones');
+                }
+            }
+            return {exitos: exitos, errores: errores};
+        },
+        // Aplica [{nombre, tipo: 'texto'|'radio', valor}] y devuelve los nombres no aplicados
+        llenarLote: function (campos) {
+            var fallidos = [];
+            for (var i = 0; i < campos.length; i++) {
+                var c = campos[i];
+                var el = null;
+                var candidatos = document.getElementsByName(c.nombre);
+                for (var k = 0; k < candidatos.length && !el; k++) {
+                    var cand = candidatos[k];
+                    if (c.tipo === 'radio' ? cand.value === c.valor : cand.type !== 'hidden') el = cand;
+                }
+                if (!el || el.disabled) { fallidos.push(c.nombre); continue; }
+                if (c.tipo === 'radio') {
+                    el.click();
+                    if (!el.checked) fallidos.push(c.nombre);
+                    continue;
+                }
+                el.value = c.valor;
+                el.dispatchEvent(new Event('input', {bubbles: true}));
+                el.dispatchEvent(new Event('change', {bubbles: true}));
+                el.dispatchEvent(new FocusEvent('blur'));
+                if (el.value !== c.valor) fallidos.push(c.nombre);
+            }
+            return fallidos;
+        }
+    };
+    return true;
+    """
+
+    def _definicion_campo(self, nombre_campo, tipo_elemento="input"):
+        """
+        📦 Entrada de CAMPOS_SUNAT ampliada con lo que prueban los fallbacks
+        (NAME/ID = nombre_campo y TEXTOS_LITERALES_CAMPOS); mínima si el campo no está definido
+        """
+        campo = self.CAMPOS_SUNAT.get(nombre_campo)
+        definicion = {
+            "tipo": campo["tipo"] if campo else tipo_elemento,
+            "selectores": list(campo["selectores"]) if campo else [],
+            "xpaths": list(campo["xpaths"]) if campo else [],
+            "textos_visibles": list(campo["textos_visibles"]) if campo else [],
+            "onclick": list(campo.get("onclick", [])) if campo else []
+        }
+
+        if nombre_campo not in definicion["selectores"]:
+            definicion["selectores"].append(nombre_campo)
+        for texto in self.TEXTOS_LITERALES_CAMPOS.get(nombre_campo, []):
+            if texto not in definicion["textos_visibles"]:
+                definicion["textos_visibles"].append(texto)
+        return definicion
+
+    def _especificacion_resolutor(self, nombre_campo, candidatos, tipo):
+        """
+        📦 Serializa los candidatos ya ordenados para el resolutor JS
+        """
+        return {
+            "nombre": nombre_campo,
+            "tipo": tipo,
+            "candidatos": [[estrategia, selector] for estrategia, selector in candidatos]
+        }
+
+    def resolver_campo_en_navegador(self, nombre_campo, tipo_elemento="input"):
+        """
+        ⚡ Resuelve un campo con UN solo execute_script
+
+        El navegador evalúa selectores, XPaths, textos visibles y onclick en todos
+        los frames del mismo origen y devuelve el primer elemento visible junto con
+        su path de frames.
+
+        Returns:
+            Tupla (elemento, concluyente). 'concluyente' es True si el resultado es
+            definitivo (encontrado, o ausente sin frames inaccesibles por origen).
+        """
+        definicion = self._definicion_campo(nombre_campo, tipo_elemento)
+        candidatos = self._candidatos_campo(definicion)
+        ordenados = self._ordenar_candidatos(nombre_campo, candidatos)
+        spec = self._especificacion_resolutor(nombre_campo, ordenados, definicion["tipo"])
+        inicio = time.time()
+
+        try:
+            resultado = self._llamar_helper("resolver", spec)
+        except Exception as e:
+            self.log(f"  ⚠️ Resolutor JS falló: {str(e)[:50]}")
+            return None, False
+
+        duracion_ms = (time.time() - inicio) * 1000
+        resultado = resultado or {}
+
+        medidas = {}
+        for indice, medida in enumerate(resultado.get("medidas") or []):
+            if not medida:
+                continue
+            aciertos, fallos, ms = medida
+            estrategia, selector = ordenados[indice]
+            medidas[(estrategia, selector)] = ms
+            self._acumular_estadistica_localizador(nombre_campo, estrategia, selector, int(aciertos), int(fallos), ms)
+
+        if not resultado.get("encontrado"):
+            bloqueados = resultado.get("bloqueados", 0)
+            self.log(f"  ⚡ Resolutor JS: '{nombre_campo}' no existe ({duracion_ms:.0f} ms, {bloqueados} frames sin acceso)")
+            return None, bloqueados == 0
+
+        estrategia, selector = ordenados[resultado["indice"]]
+        path = [tuple(paso) for paso in resultado["path"]]
+        if not self._cambiar_a_contexto(path):
+            return None, False
+
+        try:
+            elemento = self.driver.find_element(By.CSS_SELECTOR, f'[data-bot-campo="{nombre_campo}"]')
+        except NoSuchElementException:
+            return None, False
+
+        ubicacion = " → ".join(nombre for _, nombre, _ in path) or "main"
+        self.log(f"  ⚡ Resolutor JS: '{nombre_campo}' por {estrategia} en {ubicacion} ({duracion_ms:.0f} ms)")
+
+        if not resultado.get("oculto"):
+            self._contabilizar_ahorro_orden(nombre_campo, candidatos, (estrategia, selector), medidas)
+            self._registrar_localizador(nombre_campo, estrategia, selector, path=path)
+        return elemento, True
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🧪 EVALUACIÓN OFFLINE (un page_source de 'det' evaluado con lxml)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Controles que cuenta cada tipo de campo (equivalente a tipoControl() en JS)
+    CONDICION_CONTROL_OFFLINE = {
+        "select": "self::select",
+        "input": "self::textarea or (self::input and not(@type='hidden' or @type='button' "
+                 "or @type='submit' or @type='reset' or @type='image'))",
+        "button": "self::button or self::input[@type='button' or @type='submit' "
+                  "or @type='reset' or @type='image']"
+    }
+
+    # Ancestro (o el propio nodo) oculto por atributo o estilo en línea
+    XPATH_OCULTO_OFFLINE = (
+        "ancestor-or-self::*[@hidden or @type='hidden'"
+        " or contains(translate(@style, ' ', ''), 'display:none')"
+        " or contains(translate(@style, ' ', ''), 'visibility:hidden')]"
+    )
+
+    @staticmethod
+    def _plegar_texto(texto):
+        """Igual que plegar() en JS: sin tildes, espacios colapsados, mayúsculas"""
+        texto = unicodedata.normalize("NFD", texto or "")
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+        return " ".join(texto.split()).upper()
+
+    def _texto_etiqueta_offline(self, nodo):
+        if nodo.xpath("descendant::table|descendant::td|descendant::input|descendant::select|descendant::textarea"):
+            texto = " ".join(nodo.xpath("text()"))
+        else:
+            texto = nodo.text_content()
+        texto = self._plegar_texto(texto)
+        return texto if texto and len(texto) <= 120 else None
+
+    def _buscar_por_etiqueta_offline(self, arbol, texto, tipo_elemento):
+        """
+        🏷️ Controles asociados a un texto, exactos primero (como buscarPorEtiqueta en JS)
+        """
+        buscado = self._plegar_texto(texto)
+        if not buscado:
+            return []
+
+        clave = tipo_elemento if tipo_elemento in ("select", "button") else "input"
+        condicion = self.CONDICION_CONTROL_OFFLINE[clave]
+        exactos, parciales = [], []
+
+        if clave == "button":
+            for nodo in arbol.xpath(f"//*[{condicion} or self::a]"):
+                rotulo = self._plegar_texto(nodo.get("value") or nodo.text_content())
+                if rotulo == buscado:
+                    exactos.append(nodo)
+                elif rotulo and buscado in rotulo:
+                    parciales.append(nodo)
+            return exactos + parciales
+
+        for nodo in arbol.xpath("//td|//th|//label"):
+            rotulo = self._texto_etiqueta_offline(nodo)
+            if not rotulo or buscado not in rotulo:
+                continue
+            control = None
+            if nodo.tag == "label" and nodo.get("for"):
+                control = arbol.xpath(f"//*[@id=$id][{condicion}]", id=nodo.get("for"))
+            if not control:
+                control = nodo.xpath(f"(descendant::*[{condicion}] | following::*[{condicion}])[1]")
+            if control:
+                (exactos if rotulo == buscado else parciales).append(control[0])
+        return exactos + parciales
+
+    def _evaluar_candidato_offline(self, arbol, estrategia, selector, tipo_elemento):
+        """
+        🧪 Primer nodo utilizable para un candidato (estrategia, selector) en el árbol lxml
+        """
+        try:
+            if estrategia == "NAME":
+                nodos = arbol.xpath("//*[@name=$v]", v=selector)
+            elif estrategia == "ID":
+                nodos = arbol.xpath("//*[@id=$v]", v=selector)
+            elif estrategia in ("XPATH", "ONCLICK"):
+                nodos = arbol.xpath(selector)
+            elif estrategia == "TEXTO":
+                nodos = self._buscar_por_etiqueta_offline(arbol, selector, tipo_elemento)
+            else:
+                return None
+        except lxml_etree.XPathError:
+            return None
+
+        for nodo in nodos:
+            if not isinstance(getattr(nodo, "tag", None), str):
+                continue
+            if estrategia == "ONCLICK" or not nodo.xpath(self.XPATH_OCULTO_OFFLINE):
+                return nodo
+        return None
+
+    def resolver_campo_en_snapshot(self, nombre_campo, tipo_elemento="input"):
+        """
+        🧪 Evalúa TODOS los localizadores del campo sobre un único page_source de 'det'
+
+        XPaths, name/id y textos visibles se prueban en Python con lxml; solo el
+        ganador se pide al navegador (un find_element por su ruta absoluta).
+        Respaldo del resolutor JS (que ya resuelve en una llamada): sirve cuando
+        los helpers no se pueden usar en 'det' o modo_resolutor_js está apagado.
+
+        Returns:
+            WebElement o None
+        """
+        if lxml_html is None or not self._cambiar_a_contexto(self.PATH_FORMULARIO):
+            return None
+
+        inicio = time.time()
+        try:
+            arbol = lxml_html.document_fromstring(self.driver.page_source)
+        except Exception as e:
+            self.log(f"  ⚠️ Snapshot de 'det' no evaluable: {str(e)[:50]}")
+            return None
+
+        definicion = self._definicion_campo(nombre_campo, tipo_elemento)
+        ordenados = self._ordenar_candidatos(nombre_campo, self._candidatos_campo(definicion))
+        rutas_probadas = set()
+
+        for estrategia, selector in ordenados:
+            nodo = self._evaluar_candidato_offline(arbol, estrategia, selector, definicion["tipo"])
+            if nodo is None:
+                continue
+            ruta = arbol.getroottree().getpath(nodo)
+            if ruta in rutas_probadas:
+                continue
+            rutas_probadas.add(ruta)
+
+            try:
+                elemento = self.driver.find_element(By.XPATH, ruta)
+                if estrategia != "ONCLICK" and not elemento.is_displayed():
+                    continue
+            except (NoSuchElementException, StaleElementReferenceException):
+                continue
+
+            duracion_ms = (time.time() - inicio) * 1000
+            self.log(f"  🧪 Snapshot: '{nombre_campo}' por {estrategia} ({duracion_ms:.0f} ms, "
+                     f"{len(rutas_probadas)} find_element)")
+            self._registrar_localizador(nombre_campo, estrategia, selector, path=self.PATH_FORMULARIO)
+            return elemento
+
+        self.log(f"  🧪 Snapshot: '{nombre_campo}' sin candidatos en 'det'")
+        return None
+
+    def _obtener_todos_los_contextos(self):
+        """
+        📋 Obtiene lista de todos los contextos (main + iframes) para buscar
+        Returns: Lista de tuplas (nombre, path_para_navegar)
+        """
+        contextos = self._obtener_topologia_frames()
+
+        self.log(f"  📋 Total contextos detectados: {len(contextos)}")
+        for ctx_nombre, _ in contextos:
+            self.log(f"     - {ctx_nombre}")
+
+        return contextos
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🧭 TOPOLOGÍA DE FRAMES (una vez por carga de página)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Instala en window.top un contador de cambios de topología (MutationObserver
+    # sobre iframes/frames y su atributo src, más el evento load de cada frame)
+    # y devuelve, en el mismo viaje, el árbol de frames del mismo origen.
+    JS_TOPOLOGIA_FRAMES = """
+    var top = window.top;
+    var estado = top.__botTopologia;
+    if (!estado) {
+        estado = top.__botTopologia = {id: Math.random().toString(36).slice(2), version: 0};
+    }
+    function cambio() { estado.version++; }
+    function esFrame(n) { return n.nodeType === 1 && (n.tagName === 'IFRAME' || n.tagName === 'FRAME'); }
+    function observar(doc) {
+        if (!doc || !doc.documentElement || doc.__botObservado) return;
+        doc.__botObservado = true;
+        new doc.defaultView.MutationObserver(function (mutaciones) {
+            for (var i = 0; i < mutaciones.length; i++) {
+                var m = mutaciones[i];
+                if (m.type === 'attributes') {
+                    if (esFrame(m.target)) { cambio(); return; }
+                    continue;
+                }
+                var nodos = [].slice.call(m.addedNodes).concat([].slice.call(m.removedNodes));
+                for (var j = 0; j < nodos.length; j++) {
+                    var n = nodos[j];
+                    if (esFrame(n) || (n.nodeType === 1 && n.querySelector('iframe, frame'))) { cambio(); return; }
+                }
+            }
+        }).observe(doc.documentElement, {childList: true, subtree: true, attributes: true, attributeFilter: ['src']});
+    }
+
+    var contextos = [['main', []]];
+    function recorrer(doc, path, etiqueta, profundidad) {
+        observar(doc);
+        if (profundidad >= 3) return;
+        var tipos = ['iframe', 'frame'];
+        for (var t = 0; t < tipos.length; t++) {
+            var frames = doc.getElementsByTagName(tipos[t]);
+            for (var k = 0; k < frames.length; k++) {
+                var f = frames[k];
+                var nombre = f.getAttribute('name') || f.id || (tipos[t] + '_' + k);
+                if (!f.__botEscucha) {
+                    f.__botEscucha = true;
+                    f.addEventListener('load', cambio);
+                }
+                var subPath = path.concat([[tipos[t], nombre, k]]);
+                var subEtiqueta = (etiqueta ? etiqueta + '→' : '') + tipos[t] + ':' + nombre;
+                contextos.push([subEtiqueta, subPath]);
+                var subDoc = null;
+                try { subDoc = f.contentDocument; } catch (e) {}
+                if (subDoc) recorrer(subDoc, subPath, subEtiqueta, profundidad + 1);
+            }
+        }
+    }
+    recorrer(top.document, [], '', 0);
+    return {token: estado.id + ':' + estado.version, contextos: contextos};
+    """
+
+    JS_TOKEN_TOPOLOGIA = """
+    try {
+        var e = window.top.__botTopologia;
+        return e ? e.id + ':' + e.version : null;
+    } catch (err) {
+        return null;
+    }
+    """
+
+    def _invalidar_topologia(self):
+        self._topologia_frames = None
+        self._token_topologia = None
+
+    def _obtener_topologia_frames(self):
+        """
+        🧭 Devuelve los contextos (main + frames) reutilizando el árbol ya descubierto
+
+        El árbol se reconstruye solo si el observador inyectado desapareció
+        (navegación / nueva ventana) o registró un cambio de iframe, frame o src.
+
+        Returns: Lista de tuplas (nombre, path_para_navegar)
+        """
+        if self._topologia_frames is not None:
+            try:
+                token = self.driver.execute_script(self.JS_TOKEN_TOPOLOGIA)
+            except:
+                token = None
+            if token is not None and token == self._token_topologia:
+                return self._topologia_frames
+
+        try:
+            resultado = self.driver.execute_script(self.JS_TOPOLOGIA_FRAMES)
+            contextos = [
+                (nombre, [tuple(paso) for paso in path])
+                for nombre, path in resultado["contextos"]
+            ]
+            self._topologia_frames = contextos
+            self._token_topologia = resultado["token"]
+            self.log(f"  🧭 Topología de frames reconstruida: {len(contextos)} contextos")
+            return contextos
+        except Exception as e:
+            self.log(f"  ⚠️ No se pudo inyectar el observador de frames: {str(e)[:50]}")
+            self._invalidar_topologia()
+            return self._descubrir_contextos_selenium()
+
+    def _descubrir_contextos_selenium(self):
+        """
+        📋 Descubre los contextos recorriendo iframes/frames con Selenium
+        (respaldo cuando no se puede inyectar el observador de topología)
+        Returns: Lista de tuplas (nombre, path_para_navegar)
+        """
+        contextos = [("main", [])]
+
+        try:
+            self.driver.switch_to.default_content()
+
+            # Buscar iframes en documento principal
+            iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
+            frames = self.driver.find_elements(By.TAG_NAME, "frame")
+
+            self.log(f"  📊 Detectados: {len(iframes)} iframes, {len(frames)} frames en main")
+
+            for i, iframe in enumerate(iframes):
+                nombre = iframe.get_attribute("name") or iframe.get_attribute("id") or f"iframe_{i}"
+                contextos.append((f"iframe:{nombre}", [("iframe", nombre, i)]))
+
+                # Buscar frames anidados dentro de este iframe
+                try:
+                    self.driver.switch_to.frame(iframe)
+                    frames_internos = self.driver.find_elements(By.TAG_NAME, "frame")
+                    self.log(f"    → Dentro de '{nombre}': {len(frames_internos)} frames anidados")
+                    for j, frame in enumerate(frames_internos):
+                        nombre_frame = frame.get_attribute("name") or f"frame_{j}"
+                        self.log(f"      - Frame encontrado: '{nombre_frame}'")
+                        contextos.append((
+                            f"iframe:{nombre}→frame:{nombre_frame}",
+                            [("iframe", nombre, i), ("frame", nombre_frame, j)]
+                        ))
+                    self.driver.switch_to.default_content()
+                except Exception as e:
+                    self.log(f"    ⚠️ Error explorando iframe '{nombre}': {str(e)[:50]}")
+                    self.driver.switch_to.default_content()
+
+            for i, frame in enumerate(frames):
+                nombre = frame.get_attribute("name") or f"frame_{i}"
+                contextos.append((f"frame:{nombre}", [("frame", nombre, i)]))
+
+        except Exception as e:
+            self.log(f"  ⚠️ Error obteniendo contextos: {e}")
+
+        self._frame_desconocido()
+        return contextos
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 📍 CURSOR DE FRAMES (solo los switch_to necesarios)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # iframeApplication → det (el formulario de registro)
+    PATH_FORMULARIO = [("iframe", "iframeApplication", 0), ("frame", "det", 0)]
+
+    def _frame_desconocido(self):
+        """El próximo cambio de contexto parte de default_content"""
+        self._path_frame_actual = None
+
+    def _cambiar_a_ventana(self, handle):
+        self.driver.switch_to.window(handle)
+        self._path_frame_actual = []
+
+    def _cambiar_a_contexto(self, path):
+        """
+        🔄 Cambia al contexto especificado por el path
+
+        Parte del frame donde ya está el driver: sube con parent_frame() hasta
+        el ancestro común y baja solo lo que falta (nada si ya está ahí).
+        """
+        destino = [tuple(paso) for paso in path]
+        actual = self._path_frame_actual
+
+        comun = 0
+        if actual is not None:
+            while (comun < len(actual) and comun < len(destino)
+                   and actual[comun][:2] == destino[comun][:2]):
+                comun += 1
+            if comun == len(actual) == len(destino):
+                self._cambios_frame_evitados += len(destino) + 1
+                return True
+            self._cambios_frame_evitados += comun
+
+        try:
+            if actual is None or comun == 0:
+                self.driver.switch_to.default_content()
+                comun = 0
+            else:
+                for _ in range(len(actual) - comun):
+                    self.driver.switch_to.parent_frame()
+
+            for k, (tipo, nombre, indice) in enumerate(destino[comun:], start=comun):
+                self._path_frame_actual = destino[:k]
+                if tipo in ("iframe", "frame"):
+                    try:
+                        # Intentar por nombre primero
+                        self.driver.switch_to.frame(nombre)
+                    except:
+                        # Si falla, intentar por índice
+                        elementos = self.driver.find_elements(By.TAG_NAME, tipo)
+                        if indice < len(elementos):
+                            self.driver.switch_to.frame(elementos[indice])
+                        else:
+                            return False
+            self._path_frame_actual = destino
+            return True
+        except:
+            self._path_frame_actual = None
+            return False
+
+    @contextmanager
+    def en_frame(self, path):
+        """
+        📍 Ejecuta un bloque dentro de path y vuelve al frame anterior al salir
+
+        Uso:
+            with self.en_frame(self.PATH_FORMULARIO) as dentro:
+                if dentro: ...
+        """
+        anterior = self._path_frame_actual
+        try:
+            yield self._cambiar_a_contexto(path)
+        finally:
+            if anterior is not None:
+                self._cambiar_a_contexto(anterior)
+
+    def _buscar_campo_por_texto_cercano(self, texto, tipo_elemento):
+        """
+        🔍 Busca un campo por el texto visible que aparece cerca (en la misma fila, celda, etc.)
+        """
+        return self._buscar_por_etiqueta([texto], tipo_elemento)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # MÉTODOS DE COMPATIBILIDAD (mantener los anteriores funcionando)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Mapeo de campos a textos visibles literales (fallback de buscar_elemento_universal)
+    TEXTOS_LITERALES_CAMPOS = {
+        # SECCIÓN 1: Identificación del denunciado
+        "tipodoc": ["Tipo Documento", "Tipo Doc", "TIPO DOCUMENTO"],
+        "numdoc": ["Número", "Numero", "NRO", "NÚMERO"],
+        "nombre": ["Apellidos y Nombres", "Razón social", "APELLIDOS"],
+        "buscar": ["Buscar", "BUSCAR"],
+        "siguiente": ["Siguiente", "SIGUIENTE", "Validar"],
+
+        # SECCIÓN 2: Atención de denuncias
+        "modalidad": ["Modalidad Evasión Denunciada", "Modalidad", "MODALIDAD"],
+        "detalle": ["DETALLE DE LA DENUNCIA", "Detalle", "DETALLE"],
+        "fecha_sid": ["Fecha SID", "FECHA SID"],
+        "MesDesde": ["Del Mes", "Mes Desde", "DEL MES"],
+        "AnioDesde": ["Del Año", "Año Desde", "DEL AÑO"],
+        "MesHasta": ["Al Mes", "Mes Hasta", "AL MES"],
+        "AnioHasta": ["Al Año", "Año Hasta", "AL AÑO"],
+        "elementos": ["Tipo de Pruebas", "Elementos", "ELEMENTOS"],
+        "otros": ["Otros", "OTROS", "Detalle Otros"],
+
+        # SECCIÓN 3: Identificación del denunciante
+        "dpto": ["Departamento", "DEPARTAMENTO"],
+        "prov": ["Provincia", "PROVINCIA"],
+        "dist": ["Distrito", "DISTRITO"],
+        "telefono": ["Teléfono", "TELEFONO", "Telefono"],
+        "correo": ["Correo", "CORREO", "Email", "Correo Electrónico"],
+        "tipvia": ["Tipo Vía", "Vía", "TIPO VIA"],
+        "nomvia": ["Nombre Vía", "Nombre de Vía", "NOMBRE VIA"]
+    }
+
+    def buscar_elemento_universal(self, nombre_campo, tipo_elemento="input"):
+        """
+        🎯 MÉTODO MAESTRO - Ahora usa el sistema profesional primero
+
+        Antes de cualquier búsqueda consulta el caché de localizadores de la
+        sesión; el resultado final (acierto, o ausencia tras la cascada completa)
+        queda guardado en él.
+        """
+        estado, resultado = self._consultar_cache_localizador(nombre_campo, tipo_elemento)
+        if estado == "acierto":
+            return resultado
+        if estado == "ausente":
+            return None
+
+        if self.modo_resolutor_js:
+            resultado, concluyente = self.resolver_campo_en_navegador(nombre_campo, tipo_elemento)
+            if resultado is not None:
+                return resultado
+            if concluyente:
+                # Una consulta instantánea no prueba la ausencia (campo aún sin
+                # renderizar o que depende de la fila): no se marca como ausente
+                return None
+            self.log("  → Resolutor JS no concluyente, usando la cascada completa...")
+
+        resultado = self._buscar_elemento_universal_sin_cache(nombre_campo, tipo_elemento)
+        if resultado is None:
+            # Un plazo agotado no prueba que el campo no exista
+            if not self._plazo_agotado():
+                self._registrar_ausencia(nombre_campo)
+        elif self._clave_localizador(nombre_campo) not in self._cache_localizadores:
+            self._registrar_localizador_desde_elemento(nombre_campo, resultado)
+        return resultado
+
+    def _buscar_elemento_universal_sin_cache(self, nombre_campo, tipo_elemento="input"):
+        """
+        🔎 Cascada completa: sistema profesional + fallbacks anteriores
+        """
+        if self.modo_evaluacion_offline and nombre_campo in self.CAMPOS_SUNAT:
+            resultado = self.resolver_campo_en_snapshot(nombre_campo, tipo_elemento)
+            if resultado:
+                return resultado
+
+        if self._plazo_agotado(nombre_campo):
+            return None
+
+        # Primero intentar con el sistema profesional
+        resultado = self.buscar_elemento_profesional(nombre_campo)
+        if resultado:
+            return resultado
+
+        # Fallback al sistema anterior
+        self.log(f"  → Usando sistema de fallback para '{nombre_campo}'...")
+
+        if self._plazo_agotado(nombre_campo):
+            return None
+
+        # ═══════════════════════════════════════
+        # INTENTO 1: JavaScript en todos los iframes
+        # ═══════════════════════════════════════
+        self.log("  → Intento 1: JavaScript en iframes...")
         try:
             resultado = self.buscar_con_javascript(nombre_campo, tipo_elemento)
             if resultado:
@@ -991,244 +2379,1001 @@ class BotDenunciasSUNAT:
         except Exception as e:
             self.log(f"  → JavaScript falló: {str(e)[:50]}")
 
-        # ═══════════════════════════════════════
-        # INTENTO 2: Selenium recursivo por selector
-        # ═══════════════════════════════════════
-        self.log("  → Intento 2: Selenium recursivo por selector...")
-        try:
-            resultado = self.buscar_en_todos_contextos_recursivo(By.NAME, nombre_campo)
-            if resultado:
-                self.log("  ✅ Encontrado con Selenium recursivo (by NAME)")
-                return resultado
-        except Exception as e:
-            self.log(f"  → Selenium recursivo falló: {str(e)[:50]}")
+        if self._plazo_agotado(nombre_campo):
+            return None
+
+        # ═══════════════════════════════════════
+        # INTENTO 2: Selenium recursivo por selector
+        # ═══════════════════════════════════════
+        self.log("  → Intento 2: Selenium recursivo por selector...")
+        try:
+            resultado = self.buscar_en_todos_contextos_recursivo(By.NAME, nombre_campo)
+            if resultado:
+                self.log("  ✅ Encontrado con Selenium recursivo (by NAME)")
+                return resultado
+        except Exception as e:
+            self.log(f"  → Selenium recursivo falló: {str(e)[:50]}")
+
+        if self._plazo_agotado(nombre_campo):
+            return None
+
+        # También probar por ID si el nombre coincide
+        self.log("  → Intento 2b: Selenium recursivo por ID...")
+        try:
+            resultado = self.buscar_en_todos_contextos_recursivo(By.ID, nombre_campo)
+            if resultado:
+                self.log("  ✅ Encontrado con Selenium recursivo (by ID)")
+                return resultado
+        except:
+            pass
+
+        if self._plazo_agotado(nombre_campo):
+            return None
+
+        # ═══════════════════════════════════════
+        # INTENTO 3: Por texto literal visible
+        # ═══════════════════════════════════════
+        if nombre_campo in self.TEXTOS_LITERALES_CAMPOS:
+            self.log("  → Intento 3: Búsqueda por texto literal...")
+            for texto in self.TEXTOS_LITERALES_CAMPOS[nombre_campo]:
+                if self._plazo_agotado():
+                    break
+                try:
+                    resultado = self.buscar_por_texto_literal(texto, tipo_elemento)
+                    if resultado:
+                        self.log(f"  ✅ Encontrado por texto literal '{texto}'")
+                        return resultado
+                except:
+                    pass
+
+        if self._plazo_agotado(nombre_campo):
+            return None
+
+        # ═══════════════════════════════════════
+        # INTENTO 4: Método anterior (fallback)
+        # ═══════════════════════════════════════
+        self.log("  → Intento 4: Método híbrido anterior...")
+        try:
+            resultado = self.acceder_al_formulario_y_buscar_campo(nombre_campo)
+            if resultado:
+                self.log("  ✅ Encontrado con método híbrido anterior")
+                return resultado
+        except:
+            pass
+
+        self.log(f"  ❌ No se encontró '{nombre_campo}' con ningún método")
+        return None
+
+    def buscar_con_javascript(self, nombre_campo, tipo_elemento="input"):
+        """
+        🌐 Busca elemento por name/id en el frame actual y sus iframes (helper 'buscar')
+        """
+        try:
+            return self._llamar_helper("buscar", nombre_campo)
+        except Exception as e:
+            return None
+
+    def buscar_en_todos_contextos_recursivo(self, by, valor, max_profundidad=3):
+        """
+        🔄 Busca elemento en todos los iframes/frames (hasta max_profundidad niveles)
+        Cuando encuentra el elemento, SE QUEDA en ese contexto.
+        """
+        for _, ctx_path in self._obtener_topologia_frames():
+            if len(ctx_path) > max_profundidad:
+                continue
+            if not self._cambiar_a_contexto(ctx_path):
+                continue
+            try:
+                elemento = self.driver.find_element(by, valor)
+                if elemento.is_displayed() or elemento.is_enabled():
+                    return elemento  # ¡Mantener contexto!
+            except:
+                pass
+
+        return None
+
+    def buscar_por_texto_literal(self, texto_buscar, tipo_elemento="input"):
+        """
+        📝 Busca elemento por el texto visible literal (ej: "Tipo Documento")
+        Busca en todos los contextos de la topología de frames, leyendo el
+        índice etiqueta → control de cada frame.
+        """
+        for _, ctx_path in self._obtener_topologia_frames():
+            if len(ctx_path) > 3:
+                continue
+            if not self._cambiar_a_contexto(ctx_path):
+                continue
+            resultado = self._buscar_por_etiqueta([texto_buscar], tipo_elemento)
+            if resultado:
+                return resultado
+
+        return None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 📌 ELEMENTOS UBICADOS (elemento + frame, se ubican una vez por llenado)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def ubicar_campo(self, nombre_campo, tipo_elemento="input"):
+        """
+        📌 Ubica un campo con buscar_elemento_universal y lo devuelve como ElementoUbicado
+
+        Returns:
+            ElementoUbicado o None
+        """
+        elemento = self.buscar_elemento_universal(nombre_campo, tipo_elemento)
+        if elemento is None:
+            return None
+
+        entrada = self._cache_localizadores.get(self._clave_localizador(nombre_campo))
+        path = entrada["path"] if isinstance(entrada, dict) else self._obtener_path_contexto_actual()
+        return self._recordar_ubicado(ElementoUbicado(nombre_campo, elemento, path))
+
+    def _recordar_ubicado(self, ubicado):
+        self._campos_ubicados[self._clave_localizador(ubicado.nombre_campo)] = ubicado
+        return ubicado
+
+    def _entrar_a_ubicado(self, ubicado):
+        """🔄 Regresa al frame del elemento ubicado"""
+        if ubicado.path is not None:
+            self._cambiar_a_contexto(ubicado.path)
+
+    def leer_valor_campo(self, nombre_campo, tipo_elemento="input"):
+        """
+        📖 Lee el value actual de un campo reutilizando su última ubicación
+        """
+        ubicado = self._campos_ubicados.get(self._clave_localizador(nombre_campo))
+        for _ in range(2):
+            if ubicado is None:
+                ubicado = self.ubicar_campo(nombre_campo, tipo_elemento)
+                if ubicado is None:
+                    return None
+            try:
+                # Leer sin mover al driver del frame en que trabaja quien llama
+                if ubicado.path is None:
+                    return self._llamar_helper("valor", ubicado.elemento)
+                with self.en_frame(ubicado.path):
+                    return self._llamar_helper("valor", ubicado.elemento)
+            except StaleElementReferenceException:
+                ubicado = None
+        return None
+
+    def llenar_campo_universal(self, nombre_campo, valor, tipo_elemento="input", ubicado=None):
+        """
+        ✏️ Llena un campo usando el método universal de búsqueda
+
+        Si recibe un ElementoUbicado no vuelve a buscar; solo regresa a su frame.
+        """
+        self.log(f"\n  ✏️ Llenando campo '{nombre_campo}' con valor '{valor}'")
+
+        for _ in range(2):
+            if ubicado is None:
+                ubicado = self.ubicar_campo(nombre_campo, tipo_elemento)
+                if ubicado is None:
+                    self.log(f"  ❌ No se encontró el campo '{nombre_campo}'")
+                    return False
+
+            try:
+                self._entrar_a_ubicado(ubicado)
+                return self._escribir_en_elemento(ubicado.elemento, valor, tipo_elemento, nombre_campo)
+            except StaleElementReferenceException:
+                self.log(f"  ♻️ Referencia obsoleta de '{nombre_campo}', se vuelve a ubicar")
+                ubicado = None
+            except Exception as e:
+                self.log(f"  ❌ Error al llenar campo: {str(e)[:50]}")
+                return False
+
+        return False
+
+    def _escribir_en_elemento(self, elemento, valor, tipo_elemento, nombre_campo):
+        if tipo_elemento == "select":
+            return self._llenar_select_inteligente(elemento, valor, nombre_campo)
+
+        # Input normal
+        try:
+            elemento.clear()
+            elemento.send_keys(valor)
+            self.log(f"  ✅ Valor ingresado: '{valor}'")
+            return True
+        except StaleElementReferenceException:
+            raise
+        except:
+            # Fallback JavaScript
+            self._llamar_helper("llenar", elemento, valor)
+            self.log(f"  ✅ Valor ingresado (JS): '{valor}'")
+            return True
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 📦 LLENADO MASIVO POR SECCIÓN (un execute_script para inputs y radios)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Campos cuyos scripts reaccionan a cada tecla (máscaras) o al perder el foco
+    # (numdoc consulta el documento al servidor): siempre se teclean, sin blur sintético
+    CAMPOS_SENSIBLES_TECLADO = {"fecha_sid", "numdoc"}
+
+    def _nombre_real_campo(self, nombre_campo):
+        """name del control según el caché de localizadores (p. ej. 'telef' para 'telefono')"""
+        entrada = self._cache_localizadores.get(self._clave_localizador(nombre_campo))
+        if isinstance(entrada, dict) and entrada["estrategia"] == "NAME":
+            return entrada["selector"]
+        return nombre_campo
+
+    def llenar_lote_seccion(self, campos):
+        """
+        📦 Llena varios inputs/textareas/radios de la sección actual de una vez
+
+        Args:
+            campos: lista de (nombre_campo, valor, tipo) con tipo "input" o "radio",
+                en el orden del formulario
+
+        Los inputs reciben value + eventos input/change/blur; los radios un click().
+        El orden se respeta: los campos de CAMPOS_SENSIBLES_TECLADO cortan el lote y
+        se teclean en su lugar con el método robusto; los que un lote no pudo
+        aplicar se llenan uno por uno justo después de ese lote.
+
+        Returns:
+            Lista de nombres de campo que no se pudieron llenar
+        """
+        fallidos, tramo = [], []
+        for nombre_campo, valor, tipo in campos:
+            if self._valor_ya_presente(nombre_campo, valor, tipo):
+                self.log(f"  ⏭️ '{nombre_campo}' ya tiene '{str(valor)[:50]}', se omite")
+                continue
+            self._olvidar_valor_formulario(nombre_campo)
+            if self.modo_llenado_masivo and nombre_campo not in self.CAMPOS_SENSIBLES_TECLADO:
+                tramo.append((nombre_campo, valor, tipo))
+                continue
+            fallidos += self._aplicar_tramo_lote(tramo)
+            tramo = []
+            if not self._llenar_campo_individual(nombre_campo, valor, tipo):
+                fallidos.append(nombre_campo)
+        fallidos += self._aplicar_tramo_lote(tramo)
+        return fallidos
+
+    def _aplicar_tramo_lote(self, lote):
+        """Un execute_script para 'lote'; lo no aplicado se llena uno por uno. Devuelve los fallidos"""
+        if not lote:
+            return []
+        spec = [
+            {"nombre": self._nombre_real_campo(nombre_campo),
+             "tipo": "radio" if tipo == "radio" else "texto",
+             "valor": str(valor)}
+            for nombre_campo, valor, tipo in lote
+        ]
+        # Los radios y el blur de los inputs disparan sus onchange/onblur
+        self._invalidar_lectura()
+        try:
+            if not self._cambiar_a_contexto(self.PATH_FORMULARIO):
+                raise NoSuchElementException("Frame 'det' no disponible")
+            inicio = time.time()
+            no_aplicados = set(self._llamar_helper("llenarLote", spec) or [])
+            self.log(f"  📦 Lote: {len(lote) - len(no_aplicados)}/{len(lote)} campos en una llamada "
+                     f"({(time.time() - inicio) * 1000:.0f} ms)")
+        except Exception as e:
+            self.log(f"  ⚠️ Llenado masivo falló: {str(e)[:50]}")
+            no_aplicados = {item["nombre"] for item in spec}
+
+        self.verificar_alertas("el llenado en lote")
+
+        fallidos = []
+        for (nombre_campo, valor, tipo), item in zip(lote, spec):
+            if item["nombre"] in no_aplicados and not self._llenar_campo_individual(nombre_campo, valor, tipo):
+                fallidos.append(nombre_campo)
+        return fallidos
+
+    def _llenar_campo_individual(self, nombre_campo, valor, tipo):
+        if tipo == "radio":
+            return self._marcar_radio(nombre_campo, valor)
+        return self.llenar_campo_con_espera_robusta(nombre_campo, valor, "input", timeout=15)
+
+    def _marcar_radio(self, nombre_radio, valor):
+        """🔘 Clic JS en el radio name=nombre_radio / value=valor, con reintentos"""
+        xpath_radio = f"//input[@name='{nombre_radio}' and @value='{valor}']"
+        self._invalidar_lectura()
+        for intento in range(1, 4):
+            try:
+                radio = self.driver.find_element(By.XPATH, xpath_radio)
+                self.driver.execute_script("arguments[0].click();", radio)
+                self.log(f"    ✅ Radio '{nombre_radio}'={valor} seleccionado (intento {intento})")
+                return True
+            except:
+                if intento < 3:
+                    self.log(f"    ⚠️ Intento {intento} falló, reintentando...")
+                    self.esperar(f"radio presente: {nombre_radio}",
+                                 EC.presence_of_element_located((By.XPATH, xpath_radio)), 1)
+        self.log(f"    ⚠️ No se pudo seleccionar radio '{nombre_radio}' después de 3 intentos")
+        return False
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # ⏭️ OMITIR ESCRITURAS SIN CAMBIOS (valores leídos por sección y tras cada onchange)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    CAMPOS_SECCION = {
+        "seccion2": ["modalidad", "rdoTipo", "fecha_sid", "detalle", "MesDesde", "AnioDesde",
+                     "MesHasta", "AnioHasta", "tipoPru", "elementos", "otros"],
+        "seccion3": ["tipodoc", "numdoc", "telefono", "correo", "dpto", "prov", "dist",
+                     "tipvia", "nomvia", "nro", "interior", "tipzona"],
+    }
+
+    def leer_valores_seccion(self):
+        """
+        📖 Lee en UNA llamada los valores actuales de los campos de la sección
+
+        Quedan en self._valores_formulario como {(sección, campo): (value, texto)}.
+        Es el estado del formulario de ESTA fila (cada fila abre uno nuevo).
+        """
+        self._lectura_vigente = False
+        nombres = self.CAMPOS_SECCION.get(self.seccion_actual, [])
+        if not self.modo_omitir_sin_cambios or not nombres:
+            return
+        try:
+            if not self._cambiar_a_contexto(self.PATH_FORMULARIO):
+                return
+            reales = {campo: self._nombre_real_campo(campo) for campo in nombres}
+            valores = self._llamar_helper("valores", list(reales.values())) or {}
+        except Exception as e:
+            self.log(f"  ⚠️ No se pudieron leer los valores de la sección: {str(e)[:50]}")
+            return
+
+        for campo, real in reales.items():
+            clave = self._clave_localizador(campo)
+            if valores.get(real) is None:
+                self._valores_formulario.pop(clave, None)
+            else:
+                self._valores_formulario[clave] = tuple(valores[real])
+        self._lectura_vigente = True
+
+    def _invalidar_lectura(self):
+        """
+        Un select o radio recién escrito dispara onchange que puede limpiar,
+        habilitar o recargar otros campos (tipodoc → numdoc, modalidad, rdoTipo,
+        tipoPru): la próxima consulta vuelve a leer la sección
+        """
+        self._lectura_vigente = False
+
+    def _valor_ya_presente(self, nombre_campo, valor, tipo_elemento="input"):
+        """
+        ⏭️ ¿El formulario ya tiene 'valor' en el campo? (según la lectura de la
+        sección, repetida si hubo escrituras con onchange desde la anterior)
+
+        Para SELECT compara el texto de la opción elegida sin tildes ni
+        mayúsculas (o el mismo conjunto de palabras).
+        """
+        if not self.modo_omitir_sin_cambios:
+            return False
+        if not self._lectura_vigente:
+            self.leer_valores_seccion()
+            if not self._lectura_vigente:
+                return False
+        actual = self._valores_formulario.get(self._clave_localizador(nombre_campo))
+        if actual is None:
+            return False
+
+        value_actual, texto_actual = actual
+        valor = str(valor).strip()
+        if tipo_elemento != "select":
+            return value_actual == valor
+        if not value_actual:
+            return False
+        return self._coincidencia_confiable(texto_actual, valor)
+
+    def _olvidar_valor_formulario(self, nombre_campo):
+        """Tras escribir, la lectura previa de ese campo deja de valer"""
+        self._valores_formulario.pop(self._clave_localizador(nombre_campo), None)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🚨 INTERCEPTOR DE alert()/confirm() (falla la fila si SUNAT reporta un error)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Reemplaza alert/confirm en window.top y todos sus frames del mismo origen
+    # (los frames recargados se vuelven a cubrir en la siguiente llamada) y
+    # devuelve vaciado el buffer [[tipo, texto], ...] que vive en window.top.
+    # confirm() responde true, como lo haría el usuario al continuar.
+    JS_INTERCEPTOR_ALERTAS = r"""
+    var raiz = window.top;
+    if (!raiz.__botAlertas) raiz.__botAlertas = [];
+    function instalar(win) {
+        try {
+            if (!win.__botAlertasInstaladas) {
+                win.__botAlertasInstaladas = true;
+                win.alert = function (msg) { raiz.__botAlertas.push(['alert', String(msg)]); };
+                win.confirm = function (msg) { raiz.__botAlertas.push(['confirm', String(msg)]); return true; };
+            }
+        } catch (e) {
+            return;
+        }
+        for (var i = 0; i < win.frames.length; i++) instalar(win.frames[i]);
+    }
+    instalar(raiz);
+    return raiz.__botAlertas.splice(0);
+    """
+
+    def _revisar_alertas(self):
+        """
+        🚨 Instala el interceptor donde falte y pasa los alert() nuevos a _alertas_pendientes
+
+        Returns:
+            True si hay alertas pendientes de reportar
+        """
+        try:
+            mensajes = self.driver.execute_script(self.JS_INTERCEPTOR_ALERTAS) or []
+        except UnexpectedAlertPresentException as e:
+            # alert() nativo disparado antes de que el frame tuviera el interceptor
+            texto = getattr(e, "alert_text", None)
+            try:
+                alerta = self.driver.switch_to.alert
+                texto = alerta.text
+                alerta.accept()
+            except:
+                pass
+            mensajes = [["alert", texto or "(alerta sin texto)"]]
+        except:
+            mensajes = []
+
+        for tipo, texto in mensajes:
+            if tipo == "confirm":
+                self.log(f"  💬 Confirmación aceptada: {texto[:100]}")
+            else:
+                self._alertas_pendientes.append(texto)
+        return bool(self._alertas_pendientes)
+
+    def _clasificar_alerta(self, texto):
+        """
+        🚨 'exito' si el texto confirma el grabado (textos de RESULTADOS_ACCIONES['grabar']),
+        'error' si contiene una frase de TEXTOS_ERROR_FORMULARIO y 'aviso' en otro caso
+
+        El éxito se revisa primero: una denuncia ya grabada nunca debe reintentarse.
+        """
+        plegado = self._plegar_texto(texto)
+        if any(self._plegar_texto(t) in plegado for t in self.RESULTADOS_ACCIONES["grabar"]["textos"]):
+            return "exito"
+        if any(self._plegar_texto(t) in plegado for t in self.TEXTOS_ERROR_FORMULARIO):
+            return "error"
+        return "aviso"
+
+    def verificar_alertas(self, accion, estricta=False):
+        """
+        🚨 Clasifica los alert() que SUNAT mostró tras 'accion'
+
+        Un error lanza una excepción (falla la fila); los avisos solo se registran,
+        salvo con estricta=True (Buscar, Siguiente, Grabar): ahí cualquier alert que
+        no confirme el grabado es un rechazo ("Seleccione el departamento", etc.).
+
+        Returns:
+            Texto del alert de éxito (denuncia grabada) o None
+        """
+        if not self._revisar_alertas():
+            return None
+        alertas, self._alertas_pendientes = self._alertas_pendientes, []
+        exito = None
+        errores = []
+        for texto in (t.strip() for t in alertas):
+            tipo = self._clasificar_alerta(texto)
+            if tipo == "exito":
+                self.log(f"  ✅ Alerta de SUNAT tras {accion}: {texto}")
+                exito = exito or texto
+            elif tipo == "error" or estricta:
+                errores.append(texto)
+            else:
+                self.log(f"  💬 Aviso de SUNAT tras {accion}: {texto[:100]}")
+
+        if errores:
+            textos = " | ".join(errores)
+            self.log(f"  🚨 Alerta de SUNAT tras {accion}: {textos}")
+            if not exito:
+                raise Exception(f"SUNAT rechazó {accion}: {textos}")
+        return exito
 
-        # También probar por ID si el nombre coincide
-        self.log("  → Intento 2b: Selenium recursivo por ID...")
-        try:
-            resultado = self.buscar_en_todos_contextos_recursivo(By.ID, nombre_campo)
-            if resultado:
-                self.log("  ✅ Encontrado con Selenium recursivo (by ID)")
-                return resultado
-        except:
-            pass
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🔎 RESULTADO DE BUSCAR / SIGUIENTE / GRABAR (éxito o error, lo primero que aparezca)
+    # ═══════════════════════════════════════════════════════════════════════════
 
-        # ═══════════════════════════════════════
-        # INTENTO 3: Por texto literal visible
-        # ═══════════════════════════════════════
-        if nombre_campo in mapeo_textos:
-            self.log("  → Intento 3: Búsqueda por texto literal...")
-            for texto in mapeo_textos[nombre_campo]:
-                try:
-                    resultado = self.buscar_por_texto_literal(texto, tipo_elemento)
-                    if resultado:
-                        self.log(f"  ✅ Encontrado por texto literal '{texto}'")
-                        return resultado
-                except:
-                    pass
+    # Estado esperado tras cada acción (en 'det'); basta con que aparezca una condición
+    # que no se cumplía antes del clic
+    RESULTADOS_ACCIONES = {
+        "buscar": {
+            "nombre": "Buscar",
+            "textos": [],
+            "campos_con_valor": ["razonsocial", "nombre", "apellidos", "razon"],
+            "campos_presentes": [],
+            "selects_con_opciones": ["departamento"]
+        },
+        "siguiente_seccion1": {
+            "nombre": "Siguiente (Sección 1)",
+            "textos": ["ATENCIÓN DE DENUNCIAS"],
+            "campos_con_valor": [],
+            "campos_presentes": ["modalidad"],
+            "selects_con_opciones": []
+        },
+        "siguiente_seccion2": {
+            "nombre": "Siguiente (Sección 2)",
+            "textos": ["IDENTIFICACIÓN DEL DENUNCIANTE"],
+            "campos_con_valor": [],
+            "campos_presentes": ["telefono", "correo"],
+            "selects_con_opciones": []
+        },
+        "grabar": {
+            "nombre": "Grabar",
+            "textos": ["SE REGISTRÓ", "REGISTRADA", "GRABÓ CORRECTAMENTE", "NÚMERO DE DENUNCIA"],
+            "campos_con_valor": [],
+            "campos_presentes": [],
+            "selects_con_opciones": []
+        }
+    }
 
-        # ═══════════════════════════════════════
-        # INTENTO 4: Método anterior (fallback)
-        # ═══════════════════════════════════════
-        self.log("  → Intento 4: Método híbrido anterior...")
+    # Frases de error de validación de SUNAT (comparadas sin tildes ni mayúsculas)
+    TEXTOS_ERROR_FORMULARIO = [
+        "NO EXISTE", "NO SE ENCONTRÓ", "NO ES VÁLIDO", "INVÁLIDO", "DEBE INGRESAR",
+        "DEBE SELECCIONAR", "ERROR AL", "NO SE PUDO"
+    ]
+
+    # Contenedores de mensajes de error en 'det': solo sus líneas cuentan como error
+    SELECTORES_ERROR_FORMULARIO = [
+        "[class*='error' i]", "[id*='error' i]", "[class*='alert' i]",
+        "font[color='red' i]", "font[color='#ff0000' i]",
+        "[style*='color:red' i]", "[style*='color: red' i]"
+    ]
+
+    def _estado_formulario(self, accion):
+        config = self.RESULTADOS_ACCIONES[accion]
+        spec = {
+            "marco": self.PATH_FORMULARIO[-1][1],
+            "textos": [self._plegar_texto(t) for t in config["textos"]],
+            "errores": [self._plegar_texto(t) for t in self.TEXTOS_ERROR_FORMULARIO],
+            "contenedores_error": ", ".join(self.SELECTORES_ERROR_FORMULARIO),
+            "campos_con_valor": config["campos_con_valor"],
+            "campos_presentes": config["campos_presentes"],
+            "selects_con_opciones": config["selects_con_opciones"]
+        }
+        # Desde window.top (el helper ubica 'det'): sobrevive a la recarga del frame
+        if not self._cambiar_a_contexto([]):
+            return {}
+        return self._llamar_helper("estado", spec) or {}
+
+    def estado_previo(self, accion):
+        """
+        📸 Marcadores de éxito y líneas de error ya presentes ANTES de una acción
+        (no cuentan como resultado de ella)
+        """
         try:
-            resultado = self.acceder_al_formulario_y_buscar_campo(nombre_campo)
-            if resultado:
-                self.log("  ✅ Encontrado con método híbrido anterior")
-                return resultado
+            estado = self._estado_formulario(accion)
         except:
-            pass
+            estado = {}
+        return {
+            "exitos": estado.get("exitos", []),
+            "errores": [linea for _, linea in estado.get("errores", [])]
+        }
 
-        self.log(f"  ❌ No se encontró '{nombre_campo}' con ningún método")
-        return None
+    def esperar_resultado(self, accion, previo=None, timeout=15):
+        """
+        🔎 Espera a la vez el estado siguiente esperado y los marcadores de error
 
-    def buscar_con_javascript(self, nombre_campo, tipo_elemento="input"):
+        Solo cuentan los marcadores que no estaban en 'previo' (estado_previo()
+        tomado antes del clic). Termina en cuanto aparece cualquiera de los dos.
+        Cualquier alert() que no confirme el grabado, o una línea de error nueva,
+        lanza una excepción con su texto (la fila falla de inmediato); un alert()
+        que confirma el grabado cuenta como éxito.
+
+        Returns:
+            True si se detectó el estado esperado, False si venció el timeout
+        """
+        nombre = self.RESULTADOS_ACCIONES[accion]["nombre"]
+        previo = previo or {"exitos": [], "errores": []}
+
+        def resultado(driver):
+            try:
+                if self.verificar_alertas(nombre, estricta=True):
+                    return ("exito", "alerta de grabado")
+            except Exception as e:
+                return ("error", str(e))
+            try:
+                estado = self._estado_formulario(accion)
+            except Exception:
+                self._frame_desconocido()
+                estado = {}
+
+            nuevos = [linea for _, linea in estado.get("errores", []) if linea not in previo["errores"]]
+            if nuevos:
+                self.log(f"  🚨 Error de SUNAT tras {nombre}: {nuevos[0]}")
+                return ("error", f"SUNAT rechazó {nombre}: {nuevos[0]}")
+
+            exitos = [marcador for marcador in estado.get("exitos", []) if marcador not in previo["exitos"]]
+            return ("exito", exitos[0]) if exitos else None
+
+        inicio = time.monotonic()
+        visto = self.esperar(f"resultado: {nombre}", resultado, timeout)
+        if visto is None:
+            return False
+        tipo, detalle = visto
+        if tipo == "error":
+            raise Exception(detalle)
+        self.log(f"  ✅ {nombre}: {detalle} ({time.monotonic() - inicio:.1f}s)")
+        return True
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 📐 CALIBRACIÓN DE TIMEOUTS (latencias observadas por paso, persistidas)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    ARCHIVO_CALIBRACION_ESPERAS = "calibracion_esperas.json"
+
+    # Latencias recientes que se guardan por paso y mínimo para calibrar
+    MUESTRAS_CALIBRACION = 50
+    MUESTRAS_MINIMAS_CALIBRACION = 5
+    # timeout = percentil 95 × 1.5 + 1 s, entre 1/4 y 3 veces el valor por defecto
+    PERCENTIL_CALIBRACION = 95
+    FACTOR_CALIBRACION = 1.5
+    MARGEN_CALIBRACION = 1.0
+    PISO_CALIBRACION = 0.25
+    TOPE_CALIBRACION = 3
+
+    def timeout_calibrado(self, paso, por_defecto):
         """
-        🌐 Busca elemento usando JavaScript que accede a todos los iframes
+        📐 Timeout de un paso según sus latencias recientes
+
+        Usa 'por_defecto' si no hay suficientes muestras o si la última espera
+        de ese paso venció (la intranet está más lenta que lo observado).
         """
-        script = """
-        function buscarEnTodosLosContextos(nombreCampo, tipoElemento) {
-            // Buscar en documento principal
-            var elemento = document.querySelector('[name="' + nombreCampo + '"]') ||
-                          document.getElementById(nombreCampo);
-            if (elemento) return elemento;
-
-            // Buscar en todos los iframes
-            var iframes = document.querySelectorAll('iframe, frame');
-            for (var i = 0; i < iframes.length; i++) {
-                try {
-                    var iframeDoc = iframes[i].contentDocument || iframes[i].contentWindow.document;
-
-                    // Buscar directo en este iframe
-                    elemento = iframeDoc.querySelector('[name="' + nombreCampo + '"]') ||
-                              iframeDoc.getElementById(nombreCampo);
-                    if (elemento) return elemento;
-
-                    // Buscar en frames anidados dentro del iframe
-                    var framesInternos = iframeDoc.querySelectorAll('iframe, frame');
-                    for (var j = 0; j < framesInternos.length; j++) {
-                        try {
-                            var frameDoc = framesInternos[j].contentDocument ||
-                                          framesInternos[j].contentWindow.document;
-                            elemento = frameDoc.querySelector('[name="' + nombreCampo + '"]') ||
-                                      frameDoc.getElementById(nombreCampo);
-                            if (elemento) return elemento;
-                        } catch(e) {}
-                    }
-                } catch(e) {
-                    // Error de Same-Origin, continuar con siguiente iframe
-                }
+        entrada = self._calibracion_esperas.get(paso)
+        if not self.modo_calibracion_esperas or not entrada or entrada["vencida"]:
+            return por_defecto
+        muestras = sorted(entrada["muestras"])
+        if len(muestras) < self.MUESTRAS_MINIMAS_CALIBRACION:
+            return por_defecto
+        percentil = muestras[math.ceil(self.PERCENTIL_CALIBRACION / 100 * len(muestras)) - 1]
+        calculado = percentil * self.FACTOR_CALIBRACION + self.MARGEN_CALIBRACION
+        calculado = max(calculado, por_defecto * self.PISO_CALIBRACION)
+        return round(min(calculado, por_defecto * self.TOPE_CALIBRACION), 1)
+
+    def _observar_latencia(self, paso, segundos, cumplida):
+        entrada = self._calibracion_esperas.setdefault(paso, {"muestras": [], "vencida": False})
+        entrada["vencida"] = not cumplida
+        if cumplida:
+            entrada["muestras"] = (entrada["muestras"] + [round(segundos, 3)])[-self.MUESTRAS_CALIBRACION:]
+
+    def _cargar_calibracion_esperas(self):
+        try:
+            with open(self.ARCHIVO_CALIBRACION_ESPERAS, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(datos, dict):
+            return {}
+
+        # Archivo editado a mano o de otra versión: se descartan las entradas con otra forma
+        calibracion = {}
+        for paso, entrada in datos.items():
+            muestras = entrada.get("muestras") if isinstance(entrada, dict) else None
+            if not isinstance(muestras, list) or not all(
+                    isinstance(m, (int, float)) and not isinstance(m, bool) and m >= 0 for m in muestras):
+                continue
+            calibracion[paso] = {
+                "muestras": muestras[-self.MUESTRAS_CALIBRACION:],
+                "vencida": entrada.get("vencida") is True
             }
-            return null;
-        }
-        return buscarEnTodosLosContextos(arguments[0], arguments[1]);
+        return calibracion
+
+    def guardar_calibracion_esperas(self):
+        try:
+            with open(self.ARCHIVO_CALIBRACION_ESPERAS, "w", encoding="utf-8") as f:
+                json.dump(self._calibracion_esperas, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            self.log(f"⚠️ No se pudo guardar la calibración de esperas: {e}")
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # ⏳ MOTOR DE ESPERAS (condiciones con nombre, sondeo corto y plazo acotado)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    INTERVALO_ESPERA = 0.1
+
+    def esperar(self, nombre, condicion, timeout=10):
         """
+        ⏳ Sondea 'condicion' (callable(driver), p. ej. un expected_condition)
+        cada INTERVALO_ESPERA hasta que devuelva algo verdadero o venza el timeout
+
+        El tiempo queda en el reporte de esperas bajo 'nombre'.
 
+        Returns:
+            Lo que devolvió la condición, o None si venció el timeout
+        """
+        timeout = self.timeout_calibrado(nombre, timeout)
+        inicio = time.monotonic()
         try:
-            elemento = self.driver.execute_script(script, nombre_campo, tipo_elemento)
-            return elemento
-        except Exception as e:
-            return None
+            resultado = WebDriverWait(
+                self.driver, timeout, poll_frequency=self.INTERVALO_ESPERA,
+                ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)
+            ).until(condicion)
+        except TimeoutException:
+            resultado = None
+        self._registrar_espera(nombre, time.monotonic() - inicio, resultado is not None)
+        if resultado is None:
+            self.log(f"  ⏱️ Espera '{nombre}' vencida ({timeout}s)")
+        return resultado
 
-    def buscar_en_todos_contextos_recursivo(self, by, valor, max_profundidad=3):
+    def esperar_o_fallar(self, nombre, condicion, timeout=10):
+        """Como esperar(), pero lanza TimeoutException si vence (para los bloques try existentes)"""
+        resultado = self.esperar(nombre, condicion, timeout)
+        if resultado is None:
+            raise TimeoutException(f"Espera '{nombre}' vencida")
+        return resultado
+
+    def _registrar_espera(self, nombre, segundos, cumplida):
+        veces, total, vencidas = self._tiempos_espera.get(nombre, (0, 0.0, 0))
+        self._tiempos_espera[nombre] = (veces + 1, total + segundos, vencidas + (0 if cumplida else 1))
+        self._observar_latencia(nombre, segundos, cumplida)
+
+    def reportar_esperas(self):
+        """📊 Tiempo total esperado por condición en la corrida (de mayor a menor)"""
+        if not self._tiempos_espera:
+            return
+        total = sum(segundos for _, segundos, _ in self._tiempos_espera.values())
+        self.log(f"⏳ Esperas por condición ({total:.1f} s en total):")
+        for nombre, (veces, segundos, vencidas) in sorted(self._tiempos_espera.items(),
+                                                          key=lambda item: -item[1][1]):
+            extra = f", {vencidas} vencidas" if vencidas else ""
+            self.log(f"   {segundos:7.1f} s  {nombre} ({veces} veces, {segundos / veces:.2f} s c/u{extra})")
+
+    # Condiciones con nombre: cada una devuelve un callable(driver) para esperar()
+
+    def _carga_completa(self):
+        """Con carga 'normal' un documento está listo en 'complete'; si no, al parsearse el DOM"""
+        return self.estrategia_carga == "normal"
+
+    def _cond_documento_listo(self):
+        """Documento del contexto actual listo ('complete', o 'interactive' con carga eager/none)"""
+        if self._carga_completa():
+            return lambda d: d.execute_script("return document.readyState") == "complete"
+        return lambda d: d.execute_script("return document.readyState") != "loading"
+
+    def _cond_documentos_cargados(self):
+        """window.top y todos sus frames listos (ver _cond_documento_listo)"""
+        spec = {"titulos": [], "campo": None, "completo": self._carga_completa()}
+        return lambda d: (self._cambiar_a_contexto([])
+                          and (self._llamar_helper("seccion", spec) or {}).get("lista"))
+
+    def _cond_login_listo(self):
+        """Página de login con 'cuenta', 'password' y el botón de validaIA() ya definida"""
+        return lambda d: d.execute_script(
+            "return !!(document.getElementsByName('cuenta')[0] && document.getElementsByName('password')[0]"
+            " && document.querySelector(\"input[onclick='validaIA()']\")) && typeof validaIA === 'function';")
+
+    def _cond_ventana_menu_lista(self):
+        """Ventana menuS03Alias con el documento listo y las opciones nivel3 del menú lateral"""
+        documento_listo = self._cond_documento_listo()
+        return lambda d: ("menuS03Alias" in d.current_url and documento_listo(d)
+                          and d.execute_script("return !!document.querySelector('li.nivel3');"))
+
+    def _cond_ventana_abierta(self, cantidad_inicial):
+        """Hay más ventanas que 'cantidad_inicial'"""
+        return lambda d: len(d.window_handles) > cantidad_inicial
+
+    def _cond_elemento_clickeable(self, elemento):
+        """Elemento ya ubicado visible y habilitado"""
+        return lambda d: elemento.is_displayed() and elemento.is_enabled()
+
+    def _cond_registro_denuncias_visible(self):
+        """Opción nivel4 'Registro de Denuncias' visible (su nivel3 'Denuncias' desplegado)"""
+        return EC.visibility_of_any_elements_located((
+            By.XPATH, "//li[@id='nivel4_5_5_2_10' or (contains(@class, 'nivel4') "
+                      "and .//span[text()='Registro de Denuncias'])]"))
+
+    # Marca el documento que tiene ahora 'iframeApplication' (si lo hay); la marca
+    # vive en su window y desaparece cuando el iframe carga otro documento
+    JS_MARCAR_IFRAME_FORMULARIO = """
+    var f = document.getElementById('iframeApplication');
+    if (f && f.contentWindow) {
+        try { f.contentWindow.__botDocumentoPrevio = true; } catch (e) {}
+    }
+    return !!f;
+    """
+
+    JS_IFRAME_FORMULARIO_NUEVO = """
+    var f = document.getElementById('iframeApplication');
+    if (!f || !f.contentWindow) return false;
+    try {
+        var win = f.contentWindow;
+        return !win.__botDocumentoPrevio && win.location.href !== 'about:blank';
+    } catch (e) {
+        return true;
+    }
+    """
+
+    def _cond_iframe_formulario(self):
         """
-        🔄 Busca elemento de forma RECURSIVA en todos los iframes/frames
-        Cuando encuentra el elemento, SE QUEDA en ese contexto.
+        iframe 'iframeApplication' con un documento distinto del que tenía al crear
+        la condición (crearla ANTES del clic: un formulario ya abierto no cuenta)
         """
-        self.driver.switch_to.default_content()
+        if self._cambiar_a_contexto([]):
+            self.driver.execute_script(self.JS_MARCAR_IFRAME_FORMULARIO)
+        return lambda d: self._cambiar_a_contexto([]) and d.execute_script(self.JS_IFRAME_FORMULARIO_NUEVO)
 
-        def buscar_recursivo(profundidad=0):
-            if profundidad > max_profundidad:
-                return None
+    def _cond_campo_habilitado(self, nombre_campo):
+        """Campo del formulario visible y habilitado"""
+        nombre = self._nombre_real_campo(nombre_campo)
 
-            # Buscar en contexto actual
-            try:
-                elemento = self.driver.find_element(by, valor)
-                if elemento.is_displayed() or elemento.is_enabled():
-                    return elemento
-            except:
-                pass
+        def condicion(driver):
+            if not self._cambiar_a_contexto(self.PATH_FORMULARIO):
+                return False
+            elemento = self._llamar_helper("nombre", nombre)
+            return elemento is not None and elemento.is_displayed() and elemento.is_enabled()
+        return condicion
 
-            # Buscar en cada iframe/frame hijo
-            frames = []
-            try:
-                frames = self.driver.find_elements(By.TAG_NAME, "iframe")
-                frames += self.driver.find_elements(By.TAG_NAME, "frame")
-            except:
-                pass
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 📡 ACTIVIDAD DE RED (XHR, fetch y envíos de formulario en todos los frames)
+    # ═══════════════════════════════════════════════════════════════════════════
 
-            for i, frame in enumerate(frames):
-                try:
-                    self.driver.switch_to.frame(frame)
-                    resultado = buscar_recursivo(profundidad + 1)
-                    if resultado:
-                        return resultado  # ¡Mantener contexto!
-                    self.driver.switch_to.parent_frame()
-                except:
-                    try:
-                        self.driver.switch_to.parent_frame()
-                    except:
-                        self.driver.switch_to.default_content()
+    # Milisegundos sin actividad para dar por terminada la respuesta del servidor
+    QUIETUD_RED_MS = 300
 
-            return None
+    def armar_monitor_red(self):
+        """
+        📡 Instala el contador de red (iframeApplication, det y demás frames) y
+        marca el inicio de la acción; se llama ANTES del clic o del cambio
+        """
+        if not self.modo_monitor_red:
+            return False
+        try:
+            return self._estado_red(marcar=True) is not None
+        except Exception as e:
+            self.log(f"  ⚠️ No se pudo instalar el monitor de red: {str(e)[:50]}")
+            return False
 
-        return buscar_recursivo()
+    def esperar_red_inactiva(self, quietud_ms=None, timeout=15):
+        """
+        📡 Espera a que no haya XHR/fetch pendientes, envíos sin recargar ni
+        documentos cargando, y que pasen quietud_ms sin actividad desde la acción
 
-    def buscar_por_texto_literal(self, texto_buscar, tipo_elemento="input"):
+        Returns:
+            True si la red quedó inactiva, False si venció el timeout o no hay monitor
         """
-        📝 Busca elemento por el texto visible literal (ej: "Tipo Documento")
-        Busca en todos los contextos de forma recursiva.
-        """
-        self.driver.switch_to.default_content()
-
-        # XPaths para buscar por texto visible
-        xpaths = [
-            # Buscar label/td con texto y luego el input/select siguiente
-            f"//td[contains(text(), '{texto_buscar}')]/following::*[self::input or self::select or self::button][1]",
-            f"//td[contains(text(), '{texto_buscar}')]//following-sibling::td//{tipo_elemento}",
-            f"//label[contains(text(), '{texto_buscar}')]/following::*[self::input or self::select][1]",
-            f"//th[contains(text(), '{texto_buscar}')]/following::*[self::input or self::select][1]",
-            # Para botones
-            f"//input[@value='{texto_buscar}']",
-            f"//button[contains(text(), '{texto_buscar}')]",
-            f"//input[contains(@value, '{texto_buscar}')]",
-        ]
+        if not self.modo_monitor_red:
+            return False
+        quietud_ms = quietud_ms or self.QUIETUD_RED_MS
 
-        def buscar_en_contexto():
-            for xpath in xpaths:
-                try:
-                    elemento = self.driver.find_element(By.XPATH, xpath)
-                    if elemento.is_displayed() or elemento.is_enabled():
-                        return elemento
-                except:
-                    pass
-            return None
+        def inactiva(driver):
+            try:
+                estado = self._estado_red()
+            except Exception:
+                return False
+            return bool(estado) and estado["pendientes"] + estado["envios"] + estado["cargando"] == 0 \
+                and estado["quieto_ms"] >= quietud_ms
+
+        return self.esperar("red inactiva", inactiva, timeout) is not None
+
+    def _cond_red_activada(self):
+        """Empezó una petición, envío o navegación después de armar_monitor_red() (el clic hizo algo)"""
+        def condicion(driver):
+            try:
+                return (self._estado_red() or {}).get("actividad")
+            except Exception:
+                return False
+        return condicion
 
-        def buscar_recursivo(profundidad=0):
-            if profundidad > 3:
+    def _estado_red(self, marcar=False):
+        """
+        Helper 'red' en window.top; el driver vuelve al frame donde estaba (el
+        formulario, casi siempre), así la acción siguiente no busca en top
+        """
+        with self.en_frame([]) as dentro:
+            if not dentro:
                 return None
+            return self._llamar_helper("red", marcar, self._carga_completa())
 
-            # Buscar en contexto actual
-            resultado = buscar_en_contexto()
-            if resultado:
-                return resultado
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🚦 SECCIÓN LISTA (predicados en el navegador, sin transferir page_source)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Se cumplen todos: algún título visible, el campo clave visible y habilitado,
+    # y todos los documentos de window.top listos (ver _cond_documento_listo)
+    PREDICADOS_SECCION = {
+        "seccion2": {
+            "nombre": "Sección 2",
+            "titulos": ["ATENCIÓN DE DENUNCIAS"],
+            "campo": "modalidad"
+        },
+        "seccion3": {
+            "nombre": "Sección 3",
+            "titulos": ["IDENTIFICACIÓN DEL DENUNCIANTE"],
+            "campo": "telefono"
+        },
+        "grabada": {
+            "nombre": "Formulario tras Grabar",
+            "titulos": [],
+            "campo": None
+        }
+    }
 
-            # Buscar en frames hijos
-            frames = []
+    def esperar_seccion(self, seccion, timeout=20):
+        """
+        🚦 Espera a que la sección esté lista evaluando PREDICADOS_SECCION en el navegador
+
+        Cada consulta devuelve solo unos booleanos (no el HTML del frame).
+
+        Returns:
+            True si la sección quedó lista, False si venció el timeout
+        """
+        config = self.PREDICADOS_SECCION[seccion]
+        timeout = self.timeout_calibrado(f"sección lista: {config['nombre']}", timeout)
+        spec = {
+            "titulos": [self._plegar_texto(t) for t in config["titulos"]],
+            "campo": config["campo"],
+            "completo": self._carga_completa()
+        }
+        inicio = time.monotonic()
+        estado = {}
+
+        while time.monotonic() - inicio < timeout:
             try:
-                frames = self.driver.find_elements(By.TAG_NAME, "iframe")
-                frames += self.driver.find_elements(By.TAG_NAME, "frame")
-            except:
-                pass
+                # Desde window.top: sobrevive a la recarga del frame del formulario
+                if self._cambiar_a_contexto([]):
+                    estado = self._llamar_helper("seccion", spec) or {}
+            except Exception:
+                self._frame_desconocido()
+                estado = {}
+            if estado.get("lista"):
+                self._registrar_espera(f"sección lista: {config['nombre']}", time.monotonic() - inicio, True)
+                self.log(f"  🚦 {config['nombre']} lista ({time.monotonic() - inicio:.1f}s)")
+                return True
+            time.sleep(self.INTERVALO_ESPERA)
 
-            for frame in frames:
-                try:
-                    self.driver.switch_to.frame(frame)
-                    resultado = buscar_recursivo(profundidad + 1)
-                    if resultado:
-                        return resultado
-                    self.driver.switch_to.parent_frame()
-                except:
-                    try:
-                        self.driver.switch_to.parent_frame()
-                    except:
-                        self.driver.switch_to.default_content()
+        self._registrar_espera(f"sección lista: {config['nombre']}", time.monotonic() - inicio, False)
 
-            return None
+        pendientes = [nombre for nombre, clave in (("título", "titulo"), ("campo clave", "campo"))
+                      if not estado.get(clave)]
+        if estado.get("cargando"):
+            pendientes.append(f"{estado['cargando']} documentos cargando")
+        self.log(f"  ⏱️ {config['nombre']} no quedó lista en {timeout}s "
+                 f"(falta: {', '.join(pendientes) or 'respuesta del navegador'})")
+        return False
 
-        return buscar_recursivo()
+    # Presupuesto máximo (s) por campo; los demás usan el timeout de la llamada.
+    # Los opcionales llevan plazos cortos: si no están, no vale la pena esperar.
+    PRESUPUESTO_CAMPOS = {
+        "otros": 4,
+        "tipzona": 3,
+        "fecha_sid": 6,
+    }
 
-    def llenar_campo_universal(self, nombre_campo, valor, tipo_elemento="input"):
+    @contextmanager
+    def _plazo_de_busqueda(self, nombre_campo, timeout):
         """
-        ✏️ Llena un campo usando el método universal de búsqueda
+        ⏳ Abre el plazo de búsqueda de un campo (un plazo anidado nunca amplía al externo)
         """
-        self.log(f"\n  ✏️ Llenando campo '{nombre_campo}' con valor '{valor}'")
-
-        elemento = self.buscar_elemento_universal(nombre_campo, tipo_elemento)
-        if not elemento:
-            self.log(f"  ❌ No se encontró el campo '{nombre_campo}'")
-            return False
+        segundos = self.timeout_calibrado(f"campo: {nombre_campo}",
+                                          self.PRESUPUESTO_CAMPOS.get(nombre_campo, timeout))
+        anterior = self._plazo
+        if anterior is not None and anterior.restante() < segundos:
+            plazo = anterior
+        else:
+            plazo = PlazoBusqueda(segundos)
 
+        self._plazo = plazo
         try:
-            if tipo_elemento == "select":
-                return self._llenar_select_inteligente(elemento, valor, nombre_campo)
-            else:
-                # Input normal
-                try:
-                    elemento.clear()
-                    time.sleep(0.2)
-                    elemento.send_keys(valor)
-                    self.log(f"  ✅ Valor ingresado: '{valor}'")
-                    return True
-                except:
-                    # Fallback JavaScript
-                    self.driver.execute_script(f"arguments[0].value = '{valor}';", elemento)
-                    self.log(f"  ✅ Valor ingresado (JS): '{valor}'")
-                    return True
+            yield plazo
+        finally:
+            self._plazo = anterior
 
-        except Exception as e:
-            self.log(f"  ❌ Error al llenar campo: {str(e)[:50]}")
+    def _plazo_agotado(self, nombre_campo=None):
+        if self._plazo is None or not self._plazo.agotado():
             return False
+        if nombre_campo:
+            self.log(f"  ⏳ Presupuesto de {self._plazo.segundos}s agotado para '{nombre_campo}'")
+        return True
+
+    def _acotar_espera(self, segundos):
+        """Espera propia de una estrategia, recortada al plazo en curso"""
+        return self._plazo.acotar(segundos) if self._plazo is not None else segundos
+
+    def _dormir(self, segundos):
+        time.sleep(self._acotar_espera(segundos))
+
+    # Pausa mínima antes del reintento N (× N): tras un intento fallido el documento
+    # suele estar ya 'complete' y esperar solo eso no daría ningún respiro
+    PAUSA_MINIMA_REINTENTO = 1.0
+
+    def _pausa_reintento(self, intento, timeout=3):
+        """Espera el documento listo, y al menos PAUSA_MINIMA_REINTENTO × intento en total"""
+        inicio = time.monotonic()
+        self.esperar("documento cargado", self._cond_documento_listo(), timeout)
+        self._dormir(max(0.0, self.PAUSA_MINIMA_REINTENTO * intento - (time.monotonic() - inicio)))
 
     def llenar_campo_con_espera_robusta(self, nombre_campo, valor, tipo_elemento="input", timeout=20):
         """
@@ -1241,58 +3386,81 @@ class BotDenunciasSUNAT:
             nombre_campo: nombre del campo (name attribute)
             valor: valor a llenar
             tipo_elemento: "input", "select", etc.
-            timeout: segundos de espera (default 20)
+            timeout: segundos de espera (default 20); PRESUPUESTO_CAMPOS lo
+                reemplaza por campo. Es el plazo TOTAL de la búsqueda, no por intento.
         """
-        self.log(f"\n  🚀 Llenando campo '{nombre_campo}' (modo robusto)...")
-        elemento_encontrado = False
+        if self._valor_ya_presente(nombre_campo, valor, tipo_elemento):
+            self.log(f"  ⏭️ '{nombre_campo}' ya tiene '{str(valor)[:50]}', se omite")
+            return True
 
-        # INTENTO 1: Búsqueda directa por NAME con espera extendida
-        try:
-            self.log(f"    → Intento 1: Búsqueda directa por NAME ({timeout}s espera)...")
-            wait = WebDriverWait(self.driver, timeout)
-            elemento = wait.until(
-                EC.presence_of_element_located((By.NAME, nombre_campo))
-            )
-            self.log(f"    ✅ Campo '{nombre_campo}' encontrado (búsqueda directa)")
-            elemento_encontrado = True
-        except Exception as e:
-            self.log(f"    ⚠️ Intento 1 falló: {str(e)[:50]}")
+        self._olvidar_valor_formulario(nombre_campo)
+        if tipo_elemento == "select":
+            self._invalidar_lectura()
+        inicio = time.monotonic()
+        with self._plazo_de_busqueda(nombre_campo, timeout) as plazo:
+            resultado = self._llenar_campo_con_plazo(nombre_campo, valor, tipo_elemento, plazo)
+        # Un llenado fallido no aporta muestra pero deja el paso "vencido": la
+        # siguiente búsqueda vuelve al plazo por defecto
+        self._observar_latencia(f"campo: {nombre_campo}", time.monotonic() - inicio, bool(resultado))
+        self.verificar_alertas(f"llenar '{nombre_campo}'")
+        return resultado
+
+    def _llenar_campo_con_plazo(self, nombre_campo, valor, tipo_elemento, plazo):
+        self.log(f"\n  🚀 Llenando campo '{nombre_campo}' (modo robusto, plazo {plazo.segundos}s)...")
+        ubicado = None
+
+        # INTENTO 0: Localizador ya resuelto en una fila anterior (sin esperas)
+        estado, elemento = self._consultar_cache_localizador(nombre_campo, tipo_elemento)
+        if estado == "acierto":
+            entrada = self._cache_localizadores[self._clave_localizador(nombre_campo)]
+            ubicado = self._recordar_ubicado(ElementoUbicado(nombre_campo, elemento, entrada["path"]))
+
+        # INTENTO 1: Búsqueda directa por NAME; deja al menos la mitad del plazo al resto
+        if ubicado is None:
+            try:
+                espera = max(1.0, plazo.restante() / 2)
+                self.log(f"    → Intento 1: Búsqueda directa por NAME ({espera:.0f}s espera)...")
+                wait = WebDriverWait(self.driver, espera)
+                elemento = wait.until(
+                    EC.visibility_of_element_located((By.NAME, nombre_campo))
+                )
+                self.log(f"    ✅ Campo '{nombre_campo}' encontrado (búsqueda directa)")
+                ubicado = self._recordar_ubicado(
+                    ElementoUbicado(nombre_campo, elemento, self._obtener_path_contexto_actual())
+                )
+            except Exception as e:
+                self.log(f"    ⚠️ Intento 1 falló: {str(e)[:50]}")
 
-        # INTENTO 2: Verificar usando JavaScript
-        if not elemento_encontrado:
+        # INTENTO 2: Buscar con JavaScript en el frame actual
+        if ubicado is None and not self._plazo_agotado(nombre_campo):
             try:
-                self.log("    → Intento 2: Verificación con JavaScript...")
-                resultado = self.driver.execute_script(f"""
-                    var campo = document.getElementsByName('{nombre_campo}')[0];
-                    if (campo) {{
-                        return true;
-                    }}
-                    return false;
-                """)
-                if resultado:
+                self.log("    → Intento 2: Búsqueda con JavaScript...")
+                elemento = self._llamar_helper("nombre", nombre_campo)
+                if elemento:
                     self.log(f"    ✅ Campo '{nombre_campo}' encontrado (JavaScript)")
-                    elemento_encontrado = True
+                    ubicado = self._recordar_ubicado(
+                        ElementoUbicado(nombre_campo, elemento, self._obtener_path_contexto_actual())
+                    )
             except Exception as e:
                 self.log(f"    ⚠️ Intento 2 falló: {str(e)[:50]}")
 
         # INTENTO 3: Usar método universal (con todas sus estrategias)
-        if not elemento_encontrado:
+        if ubicado is None and not self._plazo_agotado(nombre_campo):
             try:
                 self.log("    → Intento 3: Usando buscar_elemento_universal...")
-                elemento_test = self.buscar_elemento_universal(nombre_campo, tipo_elemento)
-                if elemento_test:
+                ubicado = self.ubicar_campo(nombre_campo, tipo_elemento)
+                if ubicado:
                     self.log(f"    ✅ Campo '{nombre_campo}' encontrado (método universal)")
-                    elemento_encontrado = True
             except Exception as e:
                 self.log(f"    ⚠️ Intento 3 falló: {str(e)[:50]}")
 
-        if not elemento_encontrado:
+        if ubicado is None:
             self.log(f"    ❌ No se encontró el campo '{nombre_campo}' después de 3 intentos")
             return False
 
-        # Ahora llenar el campo usando el método estándar
+        # Llenar el MISMO elemento ubicado (sin volver a buscarlo)
         self.log(f"    → Llenando campo con valor: '{valor}'...")
-        resultado = self.llenar_campo_universal(nombre_campo, valor, tipo_elemento)
+        resultado = self.llenar_campo_universal(nombre_campo, valor, tipo_elemento, ubicado=ubicado)
 
         if resultado:
             self.log(f"    ✅ Campo '{nombre_campo}' llenado exitosamente")
@@ -1301,108 +3469,208 @@ class BotDenunciasSUNAT:
 
         return resultado
 
-    def _llenar_select_inteligente(self, elemento, valor, nombre_campo):
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 📋 OPCIONES DE SELECT (una llamada por lectura, caché por sesión)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _opciones_select(self, elemento, nombre_campo):
         """
-        🎯 Rellena un SELECT con búsqueda inteligente y flexible
+        📋 Lista [(índice, value, texto), ...] de un SELECT
 
-        Estrategias en orden:
-        1. Coincidencia exacta
-        2. Coincidencia exacta ignorando mayúsculas
-        3. Valor del Excel contenido en opción
-        4. Opción contenida en valor del Excel
-        5. Similitud por palabras clave
-        6. Búsqueda de palabras parciales
+        El navegador devuelve solo la firma de la lista (cantidad + hash de los
+        value) si coincide con la del caché, así las listas estáticas no se
+        vuelven a transferir y las dinámicas (provincia, distrito) se refrescan solas.
+        """
+        clave = self._clave_localizador(nombre_campo)
+        firma, opciones = self._cache_opciones.get(clave, (None, None))
+
+        resultado = self._llamar_helper("opciones", elemento, firma)
+        if resultado.get("opciones") is None and opciones is not None:
+            self.log(f"  📋 Opciones de '{nombre_campo}' desde caché")
+            return opciones
+
+        opciones = [(i, value, texto) for i, (value, texto) in enumerate(resultado["opciones"])]
+        self._cache_opciones[clave] = (resultado["firma"], opciones)
+        return opciones
+
+    def _elegir_opcion(self, elemento, indice):
+        """🎯 Selecciona por índice (selectedIndex + evento change)"""
+        self._invalidar_lectura()
+        if not self._llamar_helper("elegir", elemento, indice):
+            Select(elemento).select_by_index(indice)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🔤 ÍNDICE DE OPCIONES Y MAPEO VALOR EXCEL → OPCIÓN (persistido)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    ARCHIVO_MAPEO_OPCIONES = "mapeo_opciones.json"
+
+    # Estrategias cuyo resultado se guarda en el mapeo; las parciales (contenido,
+    # palabras clave, prefijo) se recalculan en cada corrida
+    ESTRATEGIAS_MAPEO_CONFIABLES = ("exacto", "sin tildes ni mayúsculas", "mismas palabras")
 
-        Si no encuentra, muestra TODAS las opciones disponibles
+    def _clave_mapeo_opciones(self, nombre_campo):
+        """Las listas dependientes (prov, dist) se aprenden por valor del padre"""
+        clave = f"{self.seccion_actual}:{nombre_campo}"
+        padres = self._padres_opciones.get(nombre_campo)
+        return f"{clave}:{'/'.join(padres)}" if padres else clave
+
+    def _coincidencia_confiable(self, texto_opcion, valor):
+        """¿Mismo texto sin tildes ni mayúsculas, o el mismo conjunto de palabras?"""
+        opcion, buscado = self._plegar_texto(texto_opcion), self._plegar_texto(str(valor))
+        return bool(buscado) and (opcion == buscado or set(opcion.split()) == set(buscado.split()))
+
+    def _opcion_aprendida(self, nombre_campo, indice, valor_buscar):
         """
-        select = Select(elemento)
-        opciones = select.options
+        Índice de la opción del mapeo aprendido, solo si su texto sigue coincidiendo
+        de forma confiable con 'valor_buscar' (descarta entradas de corridas anteriores)
+        """
+        mapeo_campo = self._mapeo_opciones.get(self._clave_mapeo_opciones(nombre_campo), {})
+        idx = indice["por_value"].get(mapeo_campo.get(self._plegar_texto(valor_buscar)))
+        if idx is None:
+            return None
+        texto = next((t for i, t, _ in indice["lista"] if i == idx), "")
+        return idx if self._coincidencia_confiable(texto, valor_buscar) else None
 
-        # Obtener lista de textos de opciones (excluyendo vacías)
-        opciones_texto = [(i, op.text.strip()) for i, op in enumerate(opciones) if op.text.strip()]
+    def _indice_opciones(self, nombre_campo, opciones):
+        """
+        🔤 Índice normalizado de una lista de opciones (se reutiliza mientras la lista no cambie)
 
-        self.log(f"  📋 Campo '{nombre_campo}' tiene {len(opciones_texto)} opciones disponibles")
+        Returns:
+            dict con 'exacto', 'plegado' (sin tildes/mayúsculas), 'palabras'
+            (conjunto de palabras plegadas) y 'por_value' → índice, más 'lista'
+            [(índice, texto, plegado)] para las búsquedas parciales y 'firma'
+            (hash de los value/texto) para memorizar coincidencias
+        """
+        clave = self._clave_localizador(nombre_campo)
+        previo = self._indices_opciones.get(clave)
+        if previo is not None and previo["opciones"] is opciones:
+            return previo
+
+        indice = {"opciones": opciones, "exacto": {}, "plegado": {}, "palabras": {},
+                  "por_value": {}, "lista": []}
+        for idx, value, texto in opciones:
+            if not texto:
+                continue
+            plegado = self._plegar_texto(texto)
+            indice["exacto"].setdefault(texto, idx)
+            indice["plegado"].setdefault(plegado, idx)
+            indice["palabras"].setdefault(frozenset(plegado.split()), idx)
+            indice["por_value"].setdefault(value, idx)
+            indice["lista"].append((idx, texto, plegado))
+        indice["firma"] = hash(tuple((value, texto) for _, value, texto in opciones))
+
+        self._indices_opciones[clave] = indice
+        return indice
+
+    def _buscar_en_indice_opciones(self, indice, valor_buscar):
+        """
+        🔍 Busca un valor del Excel en el índice de opciones
 
-        valor_buscar = str(valor).strip()
-        valor_upper = valor_buscar.upper()
-        valor_lower = valor_buscar.lower()
+        Returns:
+            Tupla (índice_opción, descripción_estrategia) o (None, None)
+        """
+        if valor_buscar in indice["exacto"]:
+            return indice["exacto"][valor_buscar], "exacto"
 
-        # ═══════════════════════════════════════════════════════════
-        # ESTRATEGIA 1: Coincidencia EXACTA
-        # ═══════════════════════════════════════════════════════════
-        for idx, texto in opciones_texto:
-            if texto == valor_buscar:
-                select.select_by_visible_text(texto)
-                self.log(f"  ✅ Seleccionado (exacto): '{texto}'")
-                return True
+        plegado = self._plegar_texto(valor_buscar)
+        if not plegado:
+            return None, None
+        if plegado in indice["plegado"]:
+            return indice["plegado"][plegado], "sin tildes ni mayúsculas"
 
-        # ═══════════════════════════════════════════════════════════
-        # ESTRATEGIA 2: Coincidencia exacta SIN MAYÚSCULAS
-        # ═══════════════════════════════════════════════════════════
-        for idx, texto in opciones_texto:
-            if texto.upper() == valor_upper:
-                select.select_by_visible_text(texto)
-                self.log(f"  ✅ Seleccionado (sin mayúsculas): '{texto}'")
-                return True
+        palabras = frozenset(plegado.split())
+        if palabras in indice["palabras"]:
+            return indice["palabras"][palabras], "mismas palabras"
 
-        # ═══════════════════════════════════════════════════════════
-        # ESTRATEGIA 3: Valor del Excel CONTENIDO en opción
         # Ejemplo: Excel="DNI" → Opción="6 - DNI"
-        # ═══════════════════════════════════════════════════════════
-        for idx, texto in opciones_texto:
-            if valor_upper in texto.upper():
-                select.select_by_visible_text(texto)
-                self.log(f"  ✅ Seleccionado (contenido): '{texto}' contiene '{valor_buscar}'")
-                return True
+        for idx, _, texto_plegado in indice["lista"]:
+            if plegado in texto_plegado:
+                return idx, "contenido"
+
+        # Ejemplo: Excel="DOCUMENTO NACIONAL DE IDENTIDAD DNI" → Opción="DNI"
+        for idx, _, texto_plegado in indice["lista"]:
+            if texto_plegado and texto_plegado in plegado:
+                return idx, "inverso"
+
+        claves = [p for p in plegado.split() if len(p) > 2]
+        if claves:
+            mejor, max_coincidencias = None, 0
+            for idx, _, texto_plegado in indice["lista"]:
+                coincidencias = sum(1 for palabra in claves if palabra in texto_plegado)
+                if coincidencias > max_coincidencias:
+                    mejor, max_coincidencias = idx, coincidencias
+            if mejor is not None:
+                return mejor, f"palabras clave, {max_coincidencias} coincidencias"
 
-        # ═══════════════════════════════════════════════════════════
-        # ESTRATEGIA 4: Opción CONTENIDA en valor del Excel
-        # Ejemplo: Excel="DOCUMENTO NACIONAL DE IDENTIDAD" → Opción="DNI"
-        # ═══════════════════════════════════════════════════════════
-        for idx, texto in opciones_texto:
-            if texto.upper() in valor_upper:
-                select.select_by_visible_text(texto)
-                self.log(f"  ✅ Seleccionado (inverso): '{valor_buscar}' contiene '{texto}'")
-                return True
+        if len(plegado) >= 3:
+            prefijo = plegado[:3]
+            for idx, _, texto_plegado in indice["lista"]:
+                if texto_plegado.startswith(prefijo):
+                    return idx, f"prefijo '{prefijo}'"
+
+        return None, None
+
+    def _coincidencia_en_opciones(self, nombre_campo, indice, valor_buscar):
+        """
+        _buscar_en_indice_opciones memorizado en la sesión por (clave del mapeo,
+        valor plegado, firma de la lista): las coincidencias parciales (contenido,
+        inverso, palabras clave, prefijo) recorren la lista una sola vez
+        """
+        clave = (self._clave_mapeo_opciones(nombre_campo), self._plegar_texto(valor_buscar), indice["firma"])
+        if clave in self._coincidencias_opciones:
+            return self._coincidencias_opciones[clave]
+        idx, estrategia = self._buscar_en_indice_opciones(indice, valor_buscar)
+        if idx is not None:
+            self._coincidencias_opciones[clave] = (idx, estrategia)
+        return idx, estrategia
 
-        # ═══════════════════════════════════════════════════════════
-        # ESTRATEGIA 5: Búsqueda por PALABRAS CLAVE
-        # Divide el valor en palabras y busca coincidencias
-        # ═══════════════════════════════════════════════════════════
-        palabras_valor = [p.strip().upper() for p in valor_buscar.split() if len(p.strip()) > 2]
+    def _llenar_select_inteligente(self, elemento, valor, nombre_campo):
+        """
+        🎯 Rellena un SELECT con búsqueda inteligente y flexible
 
-        if palabras_valor:
-            mejor_coincidencia = None
-            max_coincidencias = 0
+        Primero usa el mapeo aprendido valor Excel → value de opción (O(1)).
+        Si no lo hay, busca en el índice normalizado de la lista:
+        1. Coincidencia exacta
+        2. Coincidencia sin tildes ni mayúsculas
+        3. Mismo conjunto de palabras
+        4. Valor del Excel contenido en opción
+        5. Opción contenida en valor del Excel
+        6. Similitud por palabras clave
+        7. Prefijo de 3 caracteres
+
+        Toda coincidencia se memoriza para la sesión (_coincidencia_en_opciones);
+        solo las 1-3 se guardan en el mapeo persistido (ESTRATEGIAS_MAPEO_CONFIABLES).
+        Si no encuentra, muestra las opciones y elige la primera válida como
+        coincidencia de BAJA CONFIANZA (nunca se memoriza).
+        """
+        opciones = self._opciones_select(elemento, nombre_campo)
+        indice = self._indice_opciones(nombre_campo, opciones)
+        textos = {idx: texto for idx, texto, _ in indice["lista"]}
 
-            for idx, texto in opciones_texto:
-                texto_upper = texto.upper()
-                coincidencias = sum(1 for palabra in palabras_valor if palabra in texto_upper)
+        self.log(f"  📋 Campo '{nombre_campo}' tiene {len(textos)} opciones disponibles")
 
-                if coincidencias > max_coincidencias:
-                    max_coincidencias = coincidencias
-                    mejor_coincidencia = (idx, texto)
+        valor_buscar = str(valor).strip()
 
-            if mejor_coincidencia and max_coincidencias > 0:
-                select.select_by_visible_text(mejor_coincidencia[1])
-                self.log(f"  ✅ Seleccionado (palabras clave, {max_coincidencias} coincidencias): '{mejor_coincidencia[1]}'")
-                return True
+        idx = self._opcion_aprendida(nombre_campo, indice, valor_buscar)
+        if idx is not None:
+            self._elegir_opcion(elemento, idx)
+            self.log(f"  ✅ Seleccionado (mapeo aprendido): '{textos[idx]}'")
+            return True
 
-        # ═══════════════════════════════════════════════════════════
-        # ESTRATEGIA 6: Búsqueda PARCIAL por caracteres
-        # Busca si los primeros caracteres coinciden
-        # ═══════════════════════════════════════════════════════════
-        if len(valor_buscar) >= 3:
-            prefijo = valor_upper[:3]
-            for idx, texto in opciones_texto:
-                if texto.upper().startswith(prefijo):
-                    select.select_by_visible_text(texto)
-                    self.log(f"  ✅ Seleccionado (prefijo '{prefijo}'): '{texto}'")
-                    return True
+        idx, estrategia = self._coincidencia_en_opciones(nombre_campo, indice, valor_buscar)
+        if idx is not None:
+            self._elegir_opcion(elemento, idx)
+            self.log(f"  ✅ Seleccionado ({estrategia}): '{textos[idx]}'")
+            if estrategia in self.ESTRATEGIAS_MAPEO_CONFIABLES:
+                mapeo_campo = self._mapeo_opciones.setdefault(self._clave_mapeo_opciones(nombre_campo), {})
+                mapeo_campo[self._plegar_texto(valor_buscar)] = opciones[idx][1]
+            return True
 
         # ═══════════════════════════════════════════════════════════
         # NO ENCONTRADO: Mostrar TODAS las opciones disponibles
         # ═══════════════════════════════════════════════════════════
+        opciones_texto = [(idx, texto) for idx, texto, _ in indice["lista"]]
         self.log(f"  ❌ No se encontró coincidencia para '{valor_buscar}'")
         self.log(f"  📋 Opciones disponibles en el SELECT:")
         for idx, texto in opciones_texto[:20]:  # Mostrar máximo 20 opciones
@@ -1414,15 +3682,186 @@ class BotDenunciasSUNAT:
         # Seleccionar primera opción válida como fallback
         if len(opciones_texto) > 1:
             idx_fallback, texto_fallback = opciones_texto[1]  # Ignorar opción 0 (suele ser vacía)
-            select.select_by_visible_text(texto_fallback)
-            self.log(f"  ⚠️ Seleccionado PRIMERA opción por defecto: '{texto_fallback}'")
+            self._elegir_opcion(elemento, idx_fallback)
+            self.log(f"  ⚠️ BAJA CONFIANZA: '{valor_buscar}' sin coincidencia en '{nombre_campo}', "
+                     f"se eligió la primera opción por defecto: '{texto_fallback}'")
             return True
 
         return False
 
-    def clic_boton_universal(self, nombre_boton):
+    def _value_para_opcion(self, nombre_campo, opciones, valor):
+        """value de la opción que corresponde a 'valor' (mapeo aprendido o índice, sin fallback)"""
+        indice = self._indice_opciones(nombre_campo, opciones)
+        valor_buscar = str(valor).strip()
+        idx = self._opcion_aprendida(nombre_campo, indice, valor_buscar)
+        if idx is None:
+            idx = self._coincidencia_en_opciones(nombre_campo, indice, valor_buscar)[0]
+        return opciones[idx][1] if idx is not None else None
+
+    def _opcion_disponible(self, nombre_campo, opciones, valor):
+        """¿La lista contiene una opción para 'valor' (mapeo aprendido o índice, sin fallback)?"""
+        return self._value_para_opcion(nombre_campo, opciones, valor) is not None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🗺️ CASCADA DEPARTAMENTO → PROVINCIA → DISTRITO (esperas por evento)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _firma_select(self, nombre_campo):
+        """Firma actual de las opciones de un SELECT del formulario (None si no existe)"""
+        try:
+            if not self._cambiar_a_contexto(self.PATH_FORMULARIO):
+                return None
+            return self._llamar_helper("firmaPorNombre", self._nombre_real_campo(nombre_campo))
+        except:
+            return None
+
+    def esperar_opciones_dependientes(self, nombre_campo, firma_anterior, valor=None,
+                                      clave_ubigeo=None, timeout=10):
+        """
+        ⏳ Espera a que un SELECT dependiente recargue sus opciones
+
+        Termina en cuanto la lista cambió (firma distinta de firma_anterior) y,
+        si se indica 'valor', contiene una opción para él. La lista leída queda
+        en el caché de opciones, así el llenado posterior no la vuelve a pedir.
+
+        Con clave_ubigeo (p. ej. ("LIMA",) o ("LIMA", "LIMA")) y una lista ya
+        vista para esa clave, basta comparar la firma: no se transfieren opciones.
+
+        Returns:
+            True si la lista esperada está lista, False si venció el timeout
+        """
+        clave_opciones = self._clave_localizador(nombre_campo)
+        nombre = self._nombre_real_campo(nombre_campo)
+        timeout = self.timeout_calibrado(f"select poblado: {nombre_campo}", timeout)
+        conocida = self._cache_ubigeo.get(clave_ubigeo) if self.modo_cache_ubigeo and clave_ubigeo else None
+        visto = firma_anterior
+        inicio = time.monotonic()
+
+        while time.monotonic() - inicio < timeout:
+            try:
+                if conocida is not None:
+                    firma = self._llamar_helper("firmaPorNombre", nombre)
+                    if firma == conocida[0]:
+                        self._cache_opciones[clave_opciones] = conocida
+                        self._registrar_espera(f"select poblado: {nombre_campo}", time.monotonic() - inicio, True)
+                        self.log(f"    🗺️ '{nombre_campo}' listo ({time.monotonic() - inicio:.1f}s, lista conocida)")
+                        return True
+                    if firma is not None and firma != firma_anterior:
+                        # Cambió a una lista distinta de la conocida: se lee y se reemplaza
+                        conocida = None
+                        continue
+                else:
+                    resultado = self._llamar_helper("opcionesPorNombre", nombre, visto)
+                    if resultado and resultado.get("opciones") is not None:
+                        visto = resultado["firma"]
+                        opciones = [(i, v, t) for i, (v, t) in enumerate(resultado["opciones"])]
+                        if len(opciones) > 1 and (valor is None or
+                                                  self._opcion_disponible(nombre_campo, opciones, valor)):
+                            self._cache_opciones[clave_opciones] = (visto, opciones)
+                            if self.modo_cache_ubigeo and clave_ubigeo:
+                                self._cache_ubigeo[clave_ubigeo] = (visto, opciones)
+                            self._registrar_espera(f"select poblado: {nombre_campo}",
+                                                   time.monotonic() - inicio, True)
+                            self.log(f"    🗺️ '{nombre_campo}' listo ({time.monotonic() - inicio:.1f}s, "
+                                     f"{len(opciones)} opciones)")
+                            return True
+            except StaleElementReferenceException:
+                pass
+            except Exception as e:
+                self.log(f"    ⚠️ Error esperando '{nombre_campo}': {str(e)[:50]}")
+                return False
+            time.sleep(self.INTERVALO_ESPERA)
+
+        self._registrar_espera(f"select poblado: {nombre_campo}", time.monotonic() - inicio, False)
+        self.log(f"    ⏱️ '{nombre_campo}' no se actualizó en {timeout}s")
+        return False
+
+    def _cargar_mapeo_opciones(self):
+        try:
+            with open(self.ARCHIVO_MAPEO_OPCIONES, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(datos, dict):
+            return {}
+
+        # Archivo editado a mano o de otra versión: se descartan las entradas con otra forma
+        return {
+            clave: {valor: value for valor, value in mapeo.items() if isinstance(value, str)}
+            for clave, mapeo in datos.items() if isinstance(mapeo, dict)
+        }
+
+    def guardar_mapeo_opciones(self):
+        try:
+            with open(self.ARCHIVO_MAPEO_OPCIONES, "w", encoding="utf-8") as f:
+                json.dump(self._mapeo_opciones, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            self.log(f"⚠️ No se pudo guardar el mapeo de opciones: {e}")
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🧩 SUB MODALIDAD (select descubierto en el navegador, caché por modalidad)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    PREFIJO_SUBMODALIDAD = "codigosubtrib"
+
+    def llenar_submodalidad(self, valor_modalidad, valor_sub, timeout=5):
+        """
+        🧩 Llena la Sub Modalidad que corresponde a la modalidad elegida
+
+        El navegador devuelve el SELECT visible cuyo name empieza con
+        PREFIJO_SUBMODALIDAD, así se cubre cualquier modalidad sin tabla fija.
+        modalidad → (name, firma, opciones) queda en caché de sesión: con el
+        value ya conocido, ubicar y elegir la opción es una sola llamada.
+
+        Returns:
+            True si quedó seleccionada, False si no apareció o no se pudo elegir
+        """
+        conocido = self._cache_submodalidad.get(valor_modalidad)
+        firma = value = None
+        if conocido:
+            nombre, firma, opciones = conocido
+            value = self._value_para_opcion(nombre, opciones, valor_sub)
+
+        try:
+            if not self._cambiar_a_contexto(self.PATH_FORMULARIO):
+                return False
+            timeout = self.timeout_calibrado("select visible: Sub Modalidad", timeout)
+            inicio = time.monotonic()
+            while True:
+                resultado = self._llamar_helper("submodalidad", self.PREFIJO_SUBMODALIDAD, firma, value)
+                if resultado or time.monotonic() - inicio >= timeout:
+                    break
+                time.sleep(self.INTERVALO_ESPERA)
+            self._registrar_espera("select visible: Sub Modalidad", time.monotonic() - inicio, bool(resultado))
+
+            if not resultado:
+                self.log(f"  ⚠️ Ninguna Sub Modalidad visible para la modalidad '{valor_modalidad}'")
+                return False
+
+            nombre = resultado["nombre"]
+            if resultado.get("opciones") is not None:
+                opciones = [(i, v, t) for i, (v, t) in enumerate(resultado["opciones"])]
+            else:
+                opciones = conocido[2]
+            if valor_modalidad is not None:
+                self._cache_submodalidad[valor_modalidad] = (nombre, resultado["firma"], opciones)
+            self._cache_opciones[self._clave_localizador(nombre)] = (resultado["firma"], opciones)
+
+            if resultado["elegido"]:
+                self._invalidar_lectura()
+                self.log(f"  ✅ Sub Modalidad '{nombre}' seleccionada (caché de modalidad)")
+                return True
+            self.log(f"  🧩 Sub Modalidad de '{valor_modalidad}': '{nombre}' ({len(opciones)} opciones)")
+            return self._llenar_select_inteligente(resultado["el"], valor_sub, nombre)
+        except Exception as e:
+            self.log(f"  ⚠️ Error en Sub Modalidad: {str(e)[:80]}")
+            return False
+
+    def clic_boton_universal(self, nombre_boton, efecto=None):
         """
         🖱️ Hace clic en un botón usando múltiples métodos
+
+        'efecto' se pasa a hacer_clic_robusto: un clic sin ese efecto no cuenta.
         """
         self.log(f"\n  🖱️ Haciendo clic en botón '{nombre_boton}'")
 
@@ -1457,7 +3896,7 @@ class BotDenunciasSUNAT:
                 elemento = self.buscar_elemento_universal(id_boton, "button")
                 if elemento:
                     # Usar método robusto de clic con múltiples estrategias
-                    if self.hacer_clic_robusto(elemento, f"botón '{nombre_boton}'", max_intentos=2):
+                    if self.hacer_clic_robusto(elemento, f"botón '{nombre_boton}'", max_intentos=2, efecto=efecto):
                         self.log(f"  ✅ Clic exitoso (por ID)")
                         return True
             except Exception as e:
@@ -1470,7 +3909,7 @@ class BotDenunciasSUNAT:
                 elemento = self.buscar_por_texto_literal(texto, "button")
                 if elemento:
                     # Usar método robusto de clic
-                    if self.hacer_clic_robusto(elemento, f"botón '{texto}'", max_intentos=2):
+                    if self.hacer_clic_robusto(elemento, f"botón '{texto}'", max_intentos=2, efecto=efecto):
                         self.log(f"  ✅ Clic exitoso (por texto '{texto}')")
                         return True
             except Exception as e:
@@ -1480,6 +3919,7 @@ class BotDenunciasSUNAT:
         # INTENTO 3: Ejecutar función JavaScript directamente
         for func_js in config.get("funciones_js", []):
             try:
+                self._frame_desconocido()
                 self.driver.execute_script(func_js)
                 self.log(f"  ✅ Función JS ejecutada: {func_js}")
                 return True
@@ -1495,31 +3935,16 @@ class BotDenunciasSUNAT:
 
         for xpath in xpaths_onclick:
             try:
-                self.driver.switch_to.default_content()
-                # Buscar recursivamente
-                def buscar_boton_recursivo(profundidad=0):
-                    if profundidad > 3:
-                        return None
+                elemento = None
+                for _, ctx_path in self._obtener_topologia_frames():
+                    if len(ctx_path) > 3 or not self._cambiar_a_contexto(ctx_path):
+                        continue
                     try:
-                        elem = self.driver.find_element(By.XPATH, xpath)
-                        return elem
+                        elemento = self.driver.find_element(By.XPATH, xpath)
+                        break
                     except:
                         pass
 
-                    frames = self.driver.find_elements(By.TAG_NAME, "iframe") + \
-                             self.driver.find_elements(By.TAG_NAME, "frame")
-                    for frame in frames:
-                        try:
-                            self.driver.switch_to.frame(frame)
-                            resultado = buscar_boton_recursivo(profundidad + 1)
-                            if resultado:
-                                return resultado
-                            self.driver.switch_to.parent_frame()
-                        except:
-                            pass
-                    return None
-
-                elemento = buscar_boton_recursivo()
                 if elemento:
                     self.driver.execute_script("arguments[0].click();", elemento)
                     self.log(f"  ✅ Clic exitoso (por onclick)")
@@ -1539,9 +3964,8 @@ class BotDenunciasSUNAT:
         """
         try:
             # Buscar el campo tipodoc
-            campo = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.NAME, "tipodoc"))
-            )
+            campo = self.esperar_o_fallar("campo 'tipodoc'",
+                                          EC.presence_of_element_located((By.NAME, "tipodoc")), 10)
             self.log("      ✓ Campo 'tipodoc' encontrado")
             return True
         except:
@@ -1557,12 +3981,12 @@ class BotDenunciasSUNAT:
         try:
             self.log("Realizando login...")
             self.driver.get(self.URL_LOGIN)
-            time.sleep(2)
+            self._path_frame_actual = []
+            # Con carga 'eager'/'none' get() vuelve antes: esperar los campos y validaIA()
+            self.esperar_o_fallar("login: página lista", self._cond_login_listo(), 20)
             
             # Usuario
-            campo_usuario = self.wait.until(
-                EC.presence_of_element_located((By.NAME, "cuenta"))
-            )
+            campo_usuario = self.driver.find_element(By.NAME, "cuenta")
             campo_usuario.clear()
             campo_usuario.send_keys(self.USUARIO)
             
@@ -1574,8 +3998,10 @@ class BotDenunciasSUNAT:
             # Click Iniciar Sesion
             boton_login = self.driver.find_element(By.XPATH, "//input[@onclick='validaIA()']")
             boton_login.click()
-            
-            time.sleep(3)
+
+            # La página de login se descarga y carga el menú
+            self.esperar("login enviado", EC.staleness_of(campo_usuario), 15)
+            self.esperar("documento cargado", self._cond_documento_listo(), 15)
             self.log("✅ Login exitoso")
             return True
             
@@ -1595,23 +4021,20 @@ class BotDenunciasSUNAT:
            - Clic en nivel4 "Registro de Denuncias" (id="nivel4_5_5_2_10")
         4. El formulario se carga EN LA MISMA PESTAÑA al lado derecho (iframe)
         """
+        self.seccion_actual = "navegacion"
         try:
             self.log("Navegando al formulario...")
 
-            wait_largo = WebDriverWait(self.driver, 30)
             ventana_original = self.driver.current_window_handle
             ventanas_iniciales = len(self.driver.window_handles)
 
             # ═══ PASO 1: Click en "Tributarios" ═══
             self.log("  → Paso 1: Buscando 'Tributarios'...")
             try:
-                time.sleep(2)
-                link_tributarios = wait_largo.until(
-                    EC.element_to_be_clickable((By.LINK_TEXT, "Tributarios"))
-                )
+                link_tributarios = self.esperar_o_fallar("clickeable: 'Tributarios'",
+                                                         EC.element_to_be_clickable((By.LINK_TEXT, "Tributarios")), 30)
                 self.log("  → Haciendo clic en 'Tributarios'...")
                 link_tributarios.click()
-                time.sleep(2)
                 self.log("  ✅ Clic en 'Tributarios' exitoso")
             except Exception as e:
                 self.log(f"  ⚠️ 'Tributarios' no encontrado o no necesario: {str(e)}")
@@ -1619,12 +4042,12 @@ class BotDenunciasSUNAT:
             # ═══ PASO 2: Click en "Denuncias" - ABRE NUEVA VENTANA ═══
             self.log("  → Paso 2: Buscando 'Denuncias' (abre nueva ventana)...")
             try:
-                link_denuncias = wait_largo.until(
-                    EC.element_to_be_clickable((By.LINK_TEXT, "Denuncias"))
-                )
+                link_denuncias = self.esperar("clickeable: 'Denuncias'",
+                                              EC.element_to_be_clickable((By.LINK_TEXT, "Denuncias")), 30)
+                if link_denuncias is None:
+                    raise Exception("'Denuncias' no quedó clickeable en 30s")
                 self.log("  → Haciendo clic en 'Denuncias'...")
                 link_denuncias.click()
-                time.sleep(3)
                 self.log("  ✅ Clic en 'Denuncias' - Esperando nueva ventana...")
             except Exception as e:
                 self.log(f"  ❌ Error al hacer clic en 'Denuncias': {str(e)}")
@@ -1634,16 +4057,16 @@ class BotDenunciasSUNAT:
             self.log("  → Paso 3: Detectando nueva ventana menuS03Alias...")
             try:
                 # Esperar hasta que se abra una nueva ventana
-                wait_largo.until(lambda d: len(d.window_handles) > ventanas_iniciales)
-                time.sleep(2)
+                if not self.esperar("ventana nueva", self._cond_ventana_abierta(ventanas_iniciales), 30):
+                    raise Exception("No se abrió la ventana de Denuncias en 30s")
 
                 ventanas = self.driver.window_handles
                 self.log(f"  → {len(ventanas)} ventanas detectadas")
 
-                # Cambiar a la última ventana (la nueva)
+                # Cambiar a la última ventana (la nueva) y esperar al menú lateral
                 nueva_ventana = ventanas[-1]
-                self.driver.switch_to.window(nueva_ventana)
-                time.sleep(2)
+                self._cambiar_a_ventana(nueva_ventana)
+                self.esperar("ventana menuS03Alias lista", self._cond_ventana_menu_lista(), 15)
 
                 url_actual = self.driver.current_url
                 self.log(f"  ✅ Cambiado a nueva ventana: {url_actual}")
@@ -1671,14 +4094,14 @@ class BotDenunciasSUNAT:
 
                     # Estrategia 1: Por ID exacto
                     try:
-                        nivel3_denuncias = wait_largo.until(
-                            EC.presence_of_element_located((By.ID, "nivel3_5_5_2_1"))
-                        )
+                        nivel3_denuncias = self.esperar_o_fallar(
+                            "menú: nivel3 por ID",
+                            EC.presence_of_element_located((By.ID, "nivel3_5_5_2_1")), 30)
                         self.log(f"  → Nivel3 encontrado por ID")
 
                         # Usar método robusto de clic
-                        if self.hacer_clic_robusto(nivel3_denuncias, "nivel3 'Denuncias'"):
-                            time.sleep(2)
+                        if self.hacer_clic_robusto(nivel3_denuncias, "nivel3 'Denuncias'",
+                                                   efecto=self._cond_registro_denuncias_visible()):
                             nivel3_expandido = True
                             break
                     except:
@@ -1687,16 +4110,16 @@ class BotDenunciasSUNAT:
                     # Estrategia 2: Por XPATH con clase y data-id
                     if not nivel3_expandido:
                         try:
-                            nivel3_denuncias = wait_largo.until(
+                            nivel3_denuncias = self.esperar_o_fallar(
+                                "menú: nivel3 por XPATH",
                                 EC.presence_of_element_located((
                                     By.XPATH,
                                     "//li[@class='nivel3 liOpcion opcionEmpresas opcionHuerfano' and @data-id='5_5_2_1']"
-                                ))
-                            )
+                                )), 30)
                             self.log(f"  → Nivel3 encontrado por XPATH")
 
-                            if self.hacer_clic_robusto(nivel3_denuncias, "nivel3 'Denuncias' (XPATH)"):
-                                time.sleep(2)
+                            if self.hacer_clic_robusto(nivel3_denuncias, "nivel3 'Denuncias' (XPATH)",
+                                                       efecto=self._cond_registro_denuncias_visible()):
                                 nivel3_expandido = True
                                 break
                         except:
@@ -1705,16 +4128,16 @@ class BotDenunciasSUNAT:
                     # Estrategia 3: Por texto "Denuncias" en nivel3
                     if not nivel3_expandido:
                         try:
-                            nivel3_denuncias = wait_largo.until(
+                            nivel3_denuncias = self.esperar_o_fallar(
+                                "menú: nivel3 por texto",
                                 EC.presence_of_element_located((
                                     By.XPATH,
                                     "//li[contains(@class, 'nivel3')]//span[text()='Denuncias']"
-                                ))
-                            )
+                                )), 30)
                             self.log(f"  → Nivel3 encontrado por texto")
 
-                            if self.hacer_clic_robusto(nivel3_denuncias, "nivel3 'Denuncias' (texto)"):
-                                time.sleep(2)
+                            if self.hacer_clic_robusto(nivel3_denuncias, "nivel3 'Denuncias' (texto)",
+                                                       efecto=self._cond_registro_denuncias_visible()):
                                 nivel3_expandido = True
                                 break
                         except:
@@ -1739,8 +4162,8 @@ class BotDenunciasSUNAT:
                                         self.log(f"  → Encontrado nivel3 con texto: '{texto}'")
 
                                         if elem.is_displayed():
-                                            if self.hacer_clic_robusto(elem, "nivel3 'Denuncias' (sin selector)"):
-                                                time.sleep(2)
+                                            if self.hacer_clic_robusto(elem, "nivel3 'Denuncias' (sin selector)",
+                                                                       efecto=self._cond_registro_denuncias_visible()):
                                                 nivel3_expandido = True
                                                 break
                                 except:
@@ -1757,12 +4180,12 @@ class BotDenunciasSUNAT:
 
                     if intento_nivel3 < 3:
                         self.log(f"  ⚠️ Intento {intento_nivel3} falló, esperando antes de reintentar...")
-                        time.sleep(3)
+                        self._pausa_reintento(intento_nivel3)
 
                 except Exception as e:
                     self.log(f"  ⚠️ Error en intento {intento_nivel3}: {str(e)}")
                     if intento_nivel3 < 3:
-                        time.sleep(3)
+                        self._pausa_reintento(intento_nivel3)
 
             if not nivel3_expandido:
                 # DEBUG: Mostrar opciones disponibles
@@ -1794,14 +4217,14 @@ class BotDenunciasSUNAT:
 
                     # Estrategia 1: Por ID exacto
                     try:
-                        registro_denuncias = wait_largo.until(
-                            EC.presence_of_element_located((By.ID, "nivel4_5_5_2_10"))
-                        )
+                        registro_denuncias = self.esperar_o_fallar(
+                            "menú: Registro de Denuncias por ID",
+                            EC.presence_of_element_located((By.ID, "nivel4_5_5_2_10")), 30)
                         self.log(f"  → 'Registro de Denuncias' encontrado por ID")
 
                         # Usar método robusto de clic
-                        if self.hacer_clic_robusto(registro_denuncias, "'Registro de Denuncias'"):
-                            time.sleep(3)
+                        if self.hacer_clic_robusto(registro_denuncias, "'Registro de Denuncias'",
+                                                   efecto=self._cond_iframe_formulario(), espera_efecto=10):
                             registro_clickeado = True
                             break
                     except:
@@ -1810,16 +4233,16 @@ class BotDenunciasSUNAT:
                     # Estrategia 2: Por XPATH con data-id
                     if not registro_clickeado:
                         try:
-                            registro_denuncias = wait_largo.until(
+                            registro_denuncias = self.esperar_o_fallar(
+                                "menú: Registro de Denuncias por XPATH",
                                 EC.presence_of_element_located((
                                     By.XPATH,
                                     "//li[@class='nivel4 liOpcion opcionEmpresas opcionHuerfano subMenu' and @data-id='5.5.2.1.1']"
-                                ))
-                            )
+                                )), 30)
                             self.log(f"  → 'Registro de Denuncias' encontrado por XPATH")
 
-                            if self.hacer_clic_robusto(registro_denuncias, "'Registro de Denuncias' (XPATH)"):
-                                time.sleep(3)
+                            if self.hacer_clic_robusto(registro_denuncias, "'Registro de Denuncias' (XPATH)",
+                                                       efecto=self._cond_iframe_formulario(), espera_efecto=10):
                                 registro_clickeado = True
                                 break
                         except:
@@ -1828,18 +4251,18 @@ class BotDenunciasSUNAT:
                     # Estrategia 3: Por texto "Registro de Denuncias"
                     if not registro_clickeado:
                         try:
-                            registro_denuncias = wait_largo.until(
+                            registro_denuncias = self.esperar_o_fallar(
+                                "menú: Registro de Denuncias por texto",
                                 EC.presence_of_element_located((
                                     By.XPATH,
                                     "//li[contains(@class, 'nivel4')]//span[text()='Registro de Denuncias']"
-                                ))
-                            )
+                                )), 30)
                             self.log(f"  → 'Registro de Denuncias' encontrado por texto")
 
                             # Necesitamos hacer clic en el <li>, no en el <span>
                             registro_li = registro_denuncias.find_element(By.XPATH, "..")
-                            if self.hacer_clic_robusto(registro_li, "'Registro de Denuncias' (texto)"):
-                                time.sleep(3)
+                            if self.hacer_clic_robusto(registro_li, "'Registro de Denuncias' (texto)",
+                                                       efecto=self._cond_iframe_formulario(), espera_efecto=10):
                                 registro_clickeado = True
                                 break
                         except:
@@ -1863,8 +4286,8 @@ class BotDenunciasSUNAT:
 
                                         # Verificar que sea visible y clickeable
                                         if elem.is_displayed():
-                                            if self.hacer_clic_robusto(elem, "'Registro de Denuncias' (búsqueda sin selector)"):
-                                                time.sleep(3)
+                                            if self.hacer_clic_robusto(elem, "'Registro de Denuncias' (búsqueda sin selector)",
+                                                                       efecto=self._cond_iframe_formulario(), espera_efecto=10):
                                                 registro_clickeado = True
                                                 break
                                 except:
@@ -1900,8 +4323,8 @@ class BotDenunciasSUNAT:
 
                             if registro_elem:
                                 self.log(f"  → 'Registro de Denuncias' encontrado con JavaScript")
-                                if self.hacer_clic_robusto(registro_elem, "'Registro de Denuncias' (JavaScript)"):
-                                    time.sleep(3)
+                                if self.hacer_clic_robusto(registro_elem, "'Registro de Denuncias' (JavaScript)",
+                                                           efecto=self._cond_iframe_formulario(), espera_efecto=10):
                                     registro_clickeado = True
                                     break
                             else:
@@ -1912,12 +4335,12 @@ class BotDenunciasSUNAT:
 
                     if intento_registro < 3:
                         self.log(f"  ⚠️ Intento {intento_registro} falló, esperando antes de reintentar...")
-                        time.sleep(3)
+                        self._pausa_reintento(intento_registro)
 
                 except Exception as e:
                     self.log(f"  ⚠️ Error en intento {intento_registro}: {str(e)}")
                     if intento_registro < 3:
-                        time.sleep(3)
+                        self._pausa_reintento(intento_registro)
 
             if not registro_clickeado:
                 # DEBUG: Mostrar opciones disponibles
@@ -1957,6 +4380,113 @@ class BotDenunciasSUNAT:
             self.log(f"❌ ERROR GENERAL EN NAVEGACIÓN: {str(e)}")
             return False
     
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 🩺 VERIFICACIÓN PREVIA DE LOCALIZADORES (Sección 1, antes de la primera fila)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    # Campos de CAMPOS_SUNAT presentes en la Sección 1 recién cargada
+    CAMPOS_VERIFICACION_PREVIA = ["tipodoc", "numdoc", "buscar", "siguiente"]
+
+    def verificar_localizadores(self):
+        """
+        🩺 Resuelve en UNA llamada todos los CAMPOS_VERIFICACION_PREVIA
+
+        Cada campo se evalúa con sus candidatos en el orden de CAMPOS_SUNAT, así
+        se sabe si el selector principal (NAME/ID del primer selector) sigue
+        funcionando. Los que solo se ubican por un candidato alternativo quedan
+        en el caché de localizadores de la Sección 1 y las filas los usan directo.
+
+        Returns:
+            True si todos los campos se ubicaron, False si falta alguno
+        """
+        self.seccion_actual = "seccion1"
+        self.log("🩺 Verificando localizadores de la Sección 1...")
+
+        campos = []
+        for nombre_campo in self.CAMPOS_VERIFICACION_PREVIA:
+            definicion = self._definicion_campo(nombre_campo)
+            candidatos = self._candidatos_campo(definicion)
+            spec = self._especificacion_resolutor(nombre_campo, candidatos, definicion["tipo"])
+            campos.append((nombre_campo, definicion["selectores"][0], candidatos, spec))
+
+        inicio = time.time()
+        try:
+            resultados = self._llamar_helper("verificar", [spec for _, _, _, spec in campos])
+        except Exception as e:
+            self.log(f"  ❌ No se pudo verificar: {str(e)[:80]}")
+            return False
+        duracion_ms = (time.time() - inicio) * 1000
+
+        ausentes = []
+        alternativos = []
+        for (nombre_campo, principal, candidatos, _), resultado in zip(campos, resultados):
+            for indice, medida in enumerate(resultado.get("medidas") or []):
+                if medida:
+                    estrategia, selector = candidatos[indice]
+                    self._acumular_estadistica_localizador(nombre_campo, estrategia, selector,
+                                                           int(medida[0]), int(medida[1]), medida[2])
+
+            if not resultado.get("encontrado"):
+                ausentes.append(nombre_campo)
+                self.log(f"  ❌ '{nombre_campo}': no se ubica con ningún localizador ({resultado['ms']:.0f} ms)")
+                continue
+
+            estrategia, selector = candidatos[resultado["indice"]]
+            if resultado.get("oculto"):
+                self.log(f"  ⚠️ '{nombre_campo}': solo existe oculto ({estrategia} '{selector}', "
+                         f"{resultado['ms']:.0f} ms)")
+            elif estrategia in ("NAME", "ID") and selector == principal:
+                self.log(f"  ✅ '{nombre_campo}': principal {estrategia} '{selector}' ({resultado['ms']:.0f} ms)")
+            else:
+                alternativos.append(nombre_campo)
+                self._registrar_localizador(nombre_campo, estrategia, selector,
+                                            path=[tuple(paso) for paso in resultado["path"]])
+                self.log(f"  ⚠️ '{nombre_campo}': principal '{principal}' roto, se usará {estrategia} "
+                         f"'{selector}' ({resultado['ms']:.0f} ms)")
+
+        self.log(f"🩺 Verificación en {duracion_ms:.0f} ms: {len(campos) - len(ausentes)}/{len(campos)} ubicados, "
+                 f"{len(alternativos)} por localizador alternativo")
+        if ausentes:
+            self.log(f"❌ Campos sin localizador: {', '.join(ausentes)}")
+        return not ausentes
+
+    def verificar_formulario(self):
+        """
+        🩺 Abre el formulario, verifica los localizadores y vuelve a la ventana principal
+        """
+        if not self.navegar_a_formulario_registro():
+            self.log("❌ Fallo en navegación al formulario")
+            return False
+        try:
+            return self.verificar_localizadores()
+        finally:
+            try:
+                if len(self.driver.window_handles) > 1:
+                    self.driver.close()
+                    self._cambiar_a_ventana(self.driver.window_handles[0])
+            except:
+                pass
+
+    def ejecutar_verificacion(self):
+        """
+        🩺 Chequeo rápido independiente: login + verificación, sin procesar el Excel
+        """
+        try:
+            if not self.iniciar_navegador():
+                return False
+            if not self.hacer_login():
+                return False
+            correcto = self.verificar_formulario()
+            self.reportar_esperas()
+            self.guardar_estadisticas_localizadores()
+            self.guardar_calibracion_esperas()
+            return correcto
+        except Exception as e:
+            self.log(f"❌ Error en la verificación: {str(e)}")
+            return False
+        finally:
+            self.cerrar_navegador()
+
     # ============================================
     # SECCIÓN 1: IDENTIFICACIÓN DEL DENUNCIADO
     # ============================================
@@ -1965,6 +4495,7 @@ class BotDenunciasSUNAT:
         """
         DIAGNÓSTICO COMPLETO - Verifica si estamos en el iframe y qué campos hay
         """
+        self._frame_desconocido()
         self.log("\n" + "=" * 80)
         self.log("🔍 DIAGNÓSTICO COMPLETO DEL IFRAME Y CAMPOS")
         self.log("=" * 80)
@@ -2066,6 +4597,7 @@ class BotDenunciasSUNAT:
         3. Búsqueda por texto literal visible ("Tipo Documento", "Número", etc.)
         4. Métodos anteriores como fallback
         """
+        self.seccion_actual = "seccion1"
         try:
             self.log("="*70)
             self.log("📝 SECCIÓN 1: IDENTIFICACIÓN DEL DENUNCIADO")
@@ -2086,8 +4618,10 @@ class BotDenunciasSUNAT:
             # Usar método UNIVERSAL para llenar el select
             if not self.llenar_campo_universal("tipodoc", valor_tipo, "select"):
                 raise Exception("No se pudo llenar campo 'tipodoc'")
+            self.verificar_alertas("llenar 'tipodoc'")
 
-            time.sleep(0.5)
+            # El tipo de documento habilita (y ajusta) el campo Número
+            self.esperar("campo habilitado: numdoc", self._cond_campo_habilitado("numdoc"), 3)
 
             # ═══════════════════════════════════════
             # PASO 2: NÚMERO (input)
@@ -2104,8 +4638,7 @@ class BotDenunciasSUNAT:
             # Usar método UNIVERSAL para llenar el input
             if not self.llenar_campo_universal("numdoc", valor_numero, "input"):
                 raise Exception("No se pudo llenar campo 'numdoc'")
-
-            time.sleep(0.5)
+            self.verificar_alertas("llenar 'numdoc'")
 
             # ═══════════════════════════════════════
             # PASO 3: BOTÓN BUSCAR
@@ -2114,6 +4647,9 @@ class BotDenunciasSUNAT:
 
             # ESTRATEGIA: Ejecutar DIRECTAMENTE la función JavaScript del botón
             # El clic normal de Selenium no dispara el evento onclick correctamente
+            previo = self.estado_previo("buscar")
+            self.armar_monitor_red()
+            self._cambiar_a_contexto(self.PATH_FORMULARIO)
             clic_exitoso = False
 
             # INTENTO 1: Ejecutar función JavaScript directamente
@@ -2153,7 +4689,7 @@ class BotDenunciasSUNAT:
             if not clic_exitoso:
                 try:
                     self.log("   → Intento 4: Método universal...")
-                    if self.clic_boton_universal("buscar"):
+                    if self.clic_boton_universal("buscar", efecto=self._cond_red_activada()):
                         clic_exitoso = True
                 except:
                     pass
@@ -2161,69 +4697,12 @@ class BotDenunciasSUNAT:
             if not clic_exitoso:
                 raise Exception("No se pudo hacer clic en botón Buscar después de 4 intentos")
 
-            # ESPERAR hasta que se carguen los datos automáticamente
+            # ESPERAR a que se carguen los datos del denunciado (o a un error de SUNAT)
             self.log("   ⏳ Esperando a que se carguen los datos del denunciado...")
-
-            try:
-                # Esperar hasta que el campo de "Apellidos y Nombres" tenga contenido
-                # Este campo se llena automáticamente después de hacer clic en Buscar
-                wait_busqueda = WebDriverWait(self.driver, 10)
-
-                # Buscar el campo que contiene los apellidos/nombres (puede tener diferentes nombres)
-                campos_posibles = ["razonsocial", "nombre", "apellidos", "razon"]
-                campo_encontrado = False
-
-                for nombre_campo in campos_posibles:
-                    try:
-                        # Esperar a que el campo exista Y tenga contenido
-                        def campo_tiene_contenido(driver):
-                            try:
-                                campos = driver.find_elements(By.XPATH,
-                                    f"//input[contains(@name, '{nombre_campo}') or contains(@id, '{nombre_campo}')]")
-                                for campo in campos:
-                                    valor = campo.get_attribute("value")
-                                    if valor and len(valor.strip()) > 2:
-                                        return True
-                                return False
-                            except:
-                                return False
-
-                        if wait_busqueda.until(campo_tiene_contenido):
-                            self.log(f"   ✅ Datos cargados correctamente (campo '{nombre_campo}' tiene contenido)")
-                            campo_encontrado = True
-                            break
-                    except:
-                        continue
-
-                if not campo_encontrado:
-                    # Fallback: esperar que el select de Departamento tenga opciones
-                    try:
-                        def departamento_cargado(driver):
-                            try:
-                                dept = driver.find_element(By.NAME, "departamento")
-                                if dept.tag_name.lower() == "select":
-                                    select_dept = Select(dept)
-                                    return len(select_dept.options) > 1
-                                return False
-                            except:
-                                return False
-
-                        if wait_busqueda.until(departamento_cargado):
-                            self.log("   ✅ Datos cargados correctamente (departamento tiene opciones)")
-                            campo_encontrado = True
-                    except:
-                        pass
-
-                if not campo_encontrado:
-                    self.log("   ⚠️ No se pudo verificar la carga de datos, esperando 5 segundos adicionales...")
-                    time.sleep(5)
-                else:
-                    # Pequeña espera adicional para asegurar que todo esté cargado
-                    time.sleep(1)
-
-            except Exception as e:
-                self.log(f"   ⚠️ Error esperando carga: {str(e)}, continuando...")
-                time.sleep(3)
+            self.esperar_red_inactiva(timeout=15)
+            if not self.esperar_resultado("buscar", previo, timeout=15):
+                self.log("   ⚠️ No se pudo verificar la carga de datos, continuando...")
+            self._cambiar_a_contexto(self.PATH_FORMULARIO)
 
             # ═══════════════════════════════════════
             # PASO 4: BOTÓN SIGUIENTE
@@ -2231,6 +4710,9 @@ class BotDenunciasSUNAT:
             self.log("\n📋 PASO 4/4: Botón Siguiente")
 
             # ESTRATEGIA: Ejecutar DIRECTAMENTE la función JavaScript del botón
+            previo = self.estado_previo("siguiente_seccion1")
+            self.armar_monitor_red()
+            self._cambiar_a_contexto(self.PATH_FORMULARIO)
             clic_siguiente_exitoso = False
 
             # INTENTO 1: Ejecutar función JavaScript directamente
@@ -2259,7 +4741,7 @@ class BotDenunciasSUNAT:
             if not clic_siguiente_exitoso:
                 try:
                     self.log("   → Intento 3: Método universal...")
-                    if self.clic_boton_universal("siguiente"):
+                    if self.clic_boton_universal("siguiente", efecto=self._cond_red_activada()):
                         clic_siguiente_exitoso = True
                 except:
                     pass
@@ -2267,7 +4749,8 @@ class BotDenunciasSUNAT:
             if not clic_siguiente_exitoso:
                 raise Exception("No se pudo hacer clic en botón Siguiente después de 3 intentos")
 
-            time.sleep(2)
+            self.esperar_red_inactiva(timeout=20)
+            self.esperar_resultado("siguiente_seccion1", previo, timeout=20)
 
             self.log("\n" + "="*70)
             self.log("✅✅✅ SECCIÓN 1 COMPLETADA ✅✅✅")
@@ -2328,22 +4811,18 @@ class BotDenunciasSUNAT:
     # ============================================
     
     def llenar_seccion2_atencion_denuncias(self, datos):
+        self.seccion_actual = "seccion2"
         try:
             self.log("📝 Llenando Sección 2: ATENCIÓN DE DENUNCIAS...")
 
             # PASO CRÍTICO: Verificar que la nueva sección cargó completamente
             self.log("  → Verificando que la página cargó correctamente...")
 
-            # MÉTODO 1: Verificar que el título "ATENCIÓN DE DENUNCIAS" esté visible
-            try:
-                wait_titulo = WebDriverWait(self.driver, 20)
-                titulo_visible = wait_titulo.until(
-                    lambda d: "ATENCIÓN DE DENUNCIAS" in d.page_source
-                )
-                if titulo_visible:
-                    self.log("  ✅ Título 'ATENCIÓN DE DENUNCIAS' detectado")
-            except:
-                self.log("  ⚠️ No se detectó el título en 20 segundos")
+            # Título "ATENCIÓN DE DENUNCIAS" visible, Modalidad habilitada y sin cargas pendientes
+            self.esperar_seccion("seccion2", timeout=20)
+
+            # Valores que ya tiene el formulario (se omiten los que no cambian)
+            self.leer_valores_seccion()
 
             # 5. Modalidad Evasión (Columna C) - USAR MÉTODO ROBUSTO
             valor_seleccionado = None
@@ -2352,16 +4831,15 @@ class BotDenunciasSUNAT:
                 self.log(f"  → Modalidad: {valor[:50]}...")
 
                 # MÉTODO ROBUSTO: Búsqueda con múltiples estrategias y espera extendida
+                self.armar_monitor_red()
                 if self.llenar_campo_con_espera_robusta("modalidad", valor, "select", timeout=20):
-                    # Obtener el valor seleccionado para usar en submodalidad
+                    # El cambio de modalidad puede consultar al servidor (Sub Modalidad)
+                    self.esperar_red_inactiva(timeout=10)
+                    # Valor seleccionado (para submodalidad), leído del elemento ya ubicado
                     try:
-                        elemento_modalidad = self.buscar_elemento_universal("modalidad", "select")
-                        if elemento_modalidad:
-                            select_obj = Select(elemento_modalidad)
-                            valor_seleccionado = select_obj.first_selected_option.get_attribute("value")
+                        valor_seleccionado = self.leer_valor_campo("modalidad", "select")
                     except:
                         pass
-                    time.sleep(1)
                 else:
                     raise Exception("No se pudo seleccionar Modalidad")
             
@@ -2370,17 +4848,16 @@ class BotDenunciasSUNAT:
                 valor_sub = str(datos['Submodalidad']).strip()
 
                 if valor_sub != "" and valor_sub != "-":
-                    name_submodalidad = self.obtener_selector_submodalidad(valor_seleccionado)
-
-                    if name_submodalidad:
-                        # MÉTODO ROBUSTO para submodalidad
-                        if self.llenar_campo_con_espera_robusta(name_submodalidad, valor_sub, "select", timeout=15):
-                            self.log(f"  → Sub Modalidad: {valor_sub}")
-                            time.sleep(0.5)
-                        else:
-                            self.log(f"  ⚠️ No se pudo seleccionar Sub Modalidad")
+                    # El select visible tras el cambio de modalidad se descubre en el navegador
+                    if self.llenar_submodalidad(valor_seleccionado, valor_sub):
+                        self.log(f"  → Sub Modalidad: {valor_sub}")
+                    else:
+                        self.log(f"  ⚠️ No se pudo seleccionar Sub Modalidad")
             
-            # 7. Tipo de Denuncia (Columna E) - Radio button con reintentos
+            # Radios e inputs contiguos (7, 8 y 9) se aplican en un solo lote, en su lugar del formulario
+            lote = []
+
+            # 7. Tipo de Denuncia (Columna E) - Radio button
             if 'Tipo de denuncia' in datos and pd.notna(datos['Tipo de denuncia']):
                 valor = str(datos['Tipo de denuncia']).strip()
                 self.log(f"  → Tipo Denuncia: {valor}")
@@ -2392,25 +4869,9 @@ class BotDenunciasSUNAT:
                     "formato electrónico": "4", "formato electronico": "4", "electronico": "4"
                 }
 
-                valor_radio = mapeo_tipo.get(valor.lower(), "4")
+                lote.append(("rdoTipo", mapeo_tipo.get(valor.lower(), "4"), "radio"))
 
-                # Reintentos para hacer clic en radio button
-                for intento in range(1, 4):
-                    try:
-                        radio_button = self.driver.find_element(By.XPATH,
-                            f"//input[@name='rdoTipo' and @value='{valor_radio}']")
-                        self.driver.execute_script("arguments[0].click();", radio_button)
-                        self.log(f"    ✅ Radio button seleccionado (intento {intento})")
-                        time.sleep(0.5)
-                        break
-                    except Exception as e:
-                        if intento < 3:
-                            self.log(f"    ⚠️ Intento {intento} falló, reintentando...")
-                            time.sleep(1)
-                        else:
-                            self.log(f"    ⚠️ No se pudo seleccionar radio button después de 3 intentos")
-            
-            # 8. Fecha SID (Columna F) - CONDICIONAL
+            # 8. Fecha SID (Columna F) - CONDICIONAL (se teclea: CAMPOS_SENSIBLES_TECLADO)
             if 'Fecha SID' in datos and pd.notna(datos['Fecha SID']):
                 valor_raw = datos['Fecha SID']
 
@@ -2419,10 +4880,7 @@ class BotDenunciasSUNAT:
 
                     if fecha_formateada:
                         self.log(f"  → Fecha SID: {fecha_formateada}")
-                        # MÉTODO ROBUSTO para campo de fecha
-                        if not self.llenar_campo_con_espera_robusta("fecha_sid", fecha_formateada, "input", timeout=15):
-                            self.log(f"    ⚠️ No se pudo llenar Fecha SID")
-                        time.sleep(0.5)
+                        lote.append(("fecha_sid", fecha_formateada, "input"))
 
             # 9. Detalle (Columna G)
             if 'Detalle de la denuncia' in datos and pd.notna(datos['Detalle de la denuncia']):
@@ -2433,12 +4891,11 @@ class BotDenunciasSUNAT:
                     valor = valor[:1440]
 
                 self.log(f"  → Detalle: {valor[:50]}...")
+                lote.append(("detalle", valor, "input"))
+
+            for nombre_campo in self.llenar_lote_seccion(lote):
+                self.log(f"    ⚠️ No se pudo llenar '{nombre_campo}'")
 
-                # MÉTODO ROBUSTO para llenar campo de detalle
-                if not self.llenar_campo_con_espera_robusta("detalle", valor, "input", timeout=15):
-                    self.log(f"    ⚠️ No se pudo llenar Detalle")
-                time.sleep(0.5)
-            
             # 10-11. Del Mes / Del Año (Columna H)
             if 'Desde' in datos and pd.notna(datos['Desde']):
                 fecha_desde = self.extraer_mes_anio(datos['Desde'])
@@ -2457,8 +4914,6 @@ class BotDenunciasSUNAT:
                     else:
                         self.log(f"    ⚠️ No se pudo seleccionar Año Desde")
 
-                    time.sleep(0.5)
-
             # 12-13. Al Mes / Al Año (Columna I)
             if 'Hasta' in datos and pd.notna(datos['Hasta']):
                 fecha_hasta = self.extraer_mes_anio(datos['Hasta'])
@@ -2477,70 +4932,54 @@ class BotDenunciasSUNAT:
                     else:
                         self.log(f"    ⚠️ No se pudo seleccionar Año Hasta")
 
-                    time.sleep(0.5)
-            
-            # 14. Pruebas Ofrecidas (Columna J) - Radio buttons con reintentos
+            # 14. Pruebas Ofrecidas (Columna J) - Radio buttons
+            valor_prueba = None
+            lote = []
             if 'PRUEBA' in datos and pd.notna(datos['PRUEBA']):
                 valor_prueba = str(datos['PRUEBA']).strip().upper()
                 self.log(f"  → Pruebas: {valor_prueba}")
 
                 if valor_prueba in ["NO", "N"]:
-                    # Reintentos para radio button NO
-                    for intento in range(1, 4):
-                        try:
-                            radio_no = self.driver.find_element(By.XPATH,
-                                "//input[@name='tipoPru' and @value='N']")
-                            self.driver.execute_script("arguments[0].click();", radio_no)
-                            self.log(f"    ✅ Radio 'NO' seleccionado")
-                            time.sleep(0.5)
-                            break
-                        except:
-                            if intento < 3:
-                                time.sleep(1)
-
+                    lote.append(("tipoPru", "N", "radio"))
                 elif valor_prueba in ["SI", "SÍ", "S"]:
-                    # Reintentos para radio button SI
-                    for intento in range(1, 4):
-                        try:
-                            radio_si = self.driver.find_element(By.XPATH,
-                                "//input[@name='tipoPru' and @value='S']")
-                            self.driver.execute_script("arguments[0].click();", radio_si)
-                            self.log(f"    ✅ Radio 'SI' seleccionado")
-                            time.sleep(1)
-                            break
-                        except:
-                            if intento < 3:
-                                time.sleep(1)
+                    lote.append(("tipoPru", "S", "radio"))
 
-                    # 15. Tipo de Pruebas (Columna K)
-                    if 'EN CASO DE SI' in datos and pd.notna(datos['EN CASO DE SI']):
-                        valor_tipo_prueba = str(datos['EN CASO DE SI']).strip()
+            for nombre_campo in self.llenar_lote_seccion(lote):
+                self.log(f"    ⚠️ No se pudo llenar '{nombre_campo}'")
 
-                        if valor_tipo_prueba != "" and valor_tipo_prueba != "-":
-                            self.log(f"    → Tipo Prueba: {valor_tipo_prueba}")
+            if valor_prueba in ["SI", "SÍ", "S"]:
+                self.esperar("campo habilitado: elementos", self._cond_campo_habilitado("elementos"), 3)
 
-                            # MÉTODO ROBUSTO para select de pruebas
-                            if self.llenar_campo_con_espera_robusta("elementos", valor_tipo_prueba, "select", timeout=15):
-                                time.sleep(0.5)
+                # 15. Tipo de Pruebas (Columna K)
+                if 'EN CASO DE SI' in datos and pd.notna(datos['EN CASO DE SI']):
+                    valor_tipo_prueba = str(datos['EN CASO DE SI']).strip()
 
-                                # 16. Si es "Otros, detalle" (Columna L)
-                                if "otros" in valor_tipo_prueba.lower() and "detalle" in valor_tipo_prueba.lower():
-                                    if 'OTRO, DETALLE' in datos and pd.notna(datos['OTRO, DETALLE']):
-                                        valor_detalle = str(datos['OTRO, DETALLE']).strip()
+                    if valor_tipo_prueba != "" and valor_tipo_prueba != "-":
+                        self.log(f"    → Tipo Prueba: {valor_tipo_prueba}")
 
-                                        if valor_detalle != "" and valor_detalle != "-":
-                                            self.log(f"    → Detalle Otros: {valor_detalle}")
+                        # MÉTODO ROBUSTO para select de pruebas
+                        if self.llenar_campo_con_espera_robusta("elementos", valor_tipo_prueba, "select", timeout=15):
+                            # 16. Si es "Otros, detalle" (Columna L)
+                            if "otros" in valor_tipo_prueba.lower() and "detalle" in valor_tipo_prueba.lower():
+                                self.esperar("campo habilitado: otros", self._cond_campo_habilitado("otros"), 3)
+                                if 'OTRO, DETALLE' in datos and pd.notna(datos['OTRO, DETALLE']):
+                                    valor_detalle = str(datos['OTRO, DETALLE']).strip()
 
-                                            # MÉTODO ROBUSTO para campo otros
-                                            if not self.llenar_campo_con_espera_robusta("otros", valor_detalle, "input", timeout=15):
-                                                self.log(f"      ⚠️ No se pudo llenar Detalle Otros")
-                                            time.sleep(0.5)
-                            else:
-                                self.log(f"    ⚠️ No se pudo seleccionar Tipo de Prueba")
+                                    if valor_detalle != "" and valor_detalle != "-":
+                                        self.log(f"    → Detalle Otros: {valor_detalle}")
+
+                                        # MÉTODO ROBUSTO para campo otros
+                                        if not self.llenar_campo_con_espera_robusta("otros", valor_detalle, "input", timeout=15):
+                                            self.log(f"      ⚠️ No se pudo llenar Detalle Otros")
+                        else:
+                            self.log(f"    ⚠️ No se pudo seleccionar Tipo de Prueba")
             
             # 17. Siguiente - Ejecutar JavaScript directamente (MÉTODO QUE FUNCIONA)
             self.log("  → Clic en 'Siguiente'...")
 
+            previo = self.estado_previo("siguiente_seccion2")
+            self.armar_monitor_red()
+            self._cambiar_a_contexto(self.PATH_FORMULARIO)
             clic_siguiente_exitoso = False
 
             # MÉTODO PRINCIPAL: Ejecutar función JavaScript directamente (✅ COMPROBADO QUE FUNCIONA)
@@ -2566,9 +5005,10 @@ class BotDenunciasSUNAT:
             if not clic_siguiente_exitoso:
                 raise Exception("No se pudo hacer clic en Siguiente después de intentos")
 
-            # ESPERA AUMENTADA: La página necesita tiempo para cargar la nueva sección
-            self.log("  → Esperando carga de nueva sección (5 segundos)...")
-            time.sleep(5)
+            # La nueva sección (o un error de validación) decide cuándo seguir
+            self.log("  → Esperando carga de nueva sección...")
+            self.esperar_red_inactiva(timeout=20)
+            self.esperar_resultado("siguiente_seccion2", previo, timeout=20)
 
             self.log("✅ Sección 2 completada")
             return True
@@ -2582,14 +5022,16 @@ class BotDenunciasSUNAT:
     # ============================================
     
     def llenar_seccion3_identificacion_denunciante(self, datos):
+        self.seccion_actual = "seccion3"
         try:
             self.log("📝 Llenando Sección 3: IDENTIFICACIÓN DEL DENUNCIANTE...")
 
             # VERIFICACIÓN DE CARGA: Similar a Sección 2
             self.log("  → Verificando que la página cargó correctamente...")
+            self.esperar_seccion("seccion3", timeout=20)
 
-            # Espera adicional para asegurar que la página está lista
-            time.sleep(2)
+            # Valores que ya tiene el formulario (se omiten los que no cambian)
+            self.leer_valores_seccion()
 
             # 18. Tipo Denunciante (Columna M - segunda columna TIPO)
             columnas_tipo = [col for col in datos.index if 'TIPO' in str(col).upper()]
@@ -2606,61 +5048,83 @@ class BotDenunciasSUNAT:
                 # MÉTODO ROBUSTO
                 if not self.llenar_campo_con_espera_robusta("tipodoc", valor, "select", timeout=20):
                     self.log(f"    ⚠️ No se pudo seleccionar Tipo Denunciante")
-                time.sleep(0.5)
+                else:
+                    # El tipo de documento habilita (y ajusta) el campo Número
+                    self.esperar("campo habilitado: numdoc", self._cond_campo_habilitado("numdoc"), 3)
+
+            # Inputs contiguos (19-21) en un solo lote, en su lugar del formulario
+            lote = []
 
             # 19. Número (Columna N)
             if 'ruc denunciante' in datos and pd.notna(datos['ruc denunciante']):
                 valor = str(int(datos['ruc denunciante'])) if isinstance(datos['ruc denunciante'], float) else str(datos['ruc denunciante'])
                 self.log(f"  → RUC/DNI: {valor}")
-                # MÉTODO ROBUSTO
-                if not self.llenar_campo_con_espera_robusta("numdoc", valor.strip(), "input", timeout=15):
-                    self.log(f"    ⚠️ No se pudo llenar Número")
-                time.sleep(0.5)
+                lote.append(("numdoc", valor.strip(), "input"))
 
             # 20. Teléfono (Columna O)
             if 'teléfono' in datos and pd.notna(datos['teléfono']):
                 valor = str(int(datos['teléfono'])) if isinstance(datos['teléfono'], float) else str(datos['teléfono'])
                 self.log(f"  → Teléfono: {valor}")
-                # MÉTODO ROBUSTO
-                if not self.llenar_campo_con_espera_robusta("telefono", valor.strip(), "input", timeout=15):
-                    self.log(f"    ⚠️ No se pudo llenar Teléfono")
-                time.sleep(0.5)
+                lote.append(("telefono", valor.strip(), "input"))
 
             # 21. Correo (Columna P)
             if 'correo electrónico' in datos and pd.notna(datos['correo electrónico']):
                 valor = str(datos['correo electrónico']).strip()
                 self.log(f"  → Correo: {valor}")
-                # MÉTODO ROBUSTO
-                if not self.llenar_campo_con_espera_robusta("correo", valor, "input", timeout=15):
-                    self.log(f"    ⚠️ No se pudo llenar Correo")
-                time.sleep(0.5)
+                lote.append(("correo", valor, "input"))
+
+            for nombre_campo in self.llenar_lote_seccion(lote):
+                self.log(f"    ⚠️ No se pudo llenar '{nombre_campo}'")
+
+            valor_dpto = str(datos['Departamento']).strip() if 'Departamento' in datos and pd.notna(datos['Departamento']) else None
+            valor_prov = str(datos['Provincia']).strip() if 'Provincia' in datos and pd.notna(datos['Provincia']) else None
+            valor_dist = str(datos['Distrito']).strip() if 'Distrito' in datos and pd.notna(datos['Distrito']) else None
+            self._padres_opciones = {
+                "prov": (self._plegar_texto(valor_dpto or ""),),
+                "dist": (self._plegar_texto(valor_dpto or ""), self._plegar_texto(valor_prov or ""))
+            }
 
             # 22. Departamento (Columna Q)
-            if 'Departamento' in datos and pd.notna(datos['Departamento']):
-                valor = str(datos['Departamento']).strip()
-                self.log(f"  → Departamento: {valor}")
-                # MÉTODO ROBUSTO con espera extra (puede cargar dinámicamente)
-                if not self.llenar_campo_con_espera_robusta("dpto", valor, "select", timeout=15):
+            if valor_dpto and self._valor_ya_presente("dpto", valor_dpto, "select"):
+                # Mismo departamento: Provincia ya tiene su lista, no hay cascada que esperar
+                self.log(f"  ⏭️ Departamento sin cambios: {valor_dpto}")
+            elif valor_dpto:
+                self.log(f"  → Departamento: {valor_dpto}")
+                # Provincia y Distrito se recargan: su lectura previa ya no vale
+                self._olvidar_valor_formulario("prov")
+                self._olvidar_valor_formulario("dist")
+                firma_prov = self._firma_select("prov")
+                # MÉTODO ROBUSTO; luego se espera a que Provincia recargue sus opciones
+                self.armar_monitor_red()
+                if not self.llenar_campo_con_espera_robusta("dpto", valor_dpto, "select", timeout=15):
                     self.log(f"    ⚠️ No se pudo seleccionar Departamento")
-                time.sleep(1.5)  # Espera para carga de Provincia
+                elif valor_prov:
+                    self.esperar_red_inactiva(timeout=10)
+                    self.esperar_opciones_dependientes("prov", firma_prov, valor_prov,
+                                                       clave_ubigeo=self._padres_opciones["prov"])
 
             # 23. Provincia (Columna R)
-            if 'Provincia' in datos and pd.notna(datos['Provincia']):
-                valor = str(datos['Provincia']).strip()
-                self.log(f"  → Provincia: {valor}")
-                # MÉTODO ROBUSTO
-                if not self.llenar_campo_con_espera_robusta("prov", valor, "select", timeout=15):
+            if valor_prov and self._valor_ya_presente("prov", valor_prov, "select"):
+                self.log(f"  ⏭️ Provincia sin cambios: {valor_prov}")
+            elif valor_prov:
+                self.log(f"  → Provincia: {valor_prov}")
+                self._olvidar_valor_formulario("dist")
+                firma_dist = self._firma_select("dist")
+                # MÉTODO ROBUSTO; luego se espera a que Distrito recargue sus opciones
+                self.armar_monitor_red()
+                if not self.llenar_campo_con_espera_robusta("prov", valor_prov, "select", timeout=15):
                     self.log(f"    ⚠️ No se pudo seleccionar Provincia")
-                time.sleep(1.5)  # Espera para carga de Distrito
+                elif valor_dist:
+                    self.esperar_red_inactiva(timeout=10)
+                    self.esperar_opciones_dependientes("dist", firma_dist, valor_dist,
+                                                       clave_ubigeo=self._padres_opciones["dist"])
 
             # 24. Distrito (Columna S)
-            if 'Distrito' in datos and pd.notna(datos['Distrito']):
-                valor = str(datos['Distrito']).strip()
-                self.log(f"  → Distrito: {valor}")
+            if valor_dist:
+                self.log(f"  → Distrito: {valor_dist}")
                 # MÉTODO ROBUSTO
-                if not self.llenar_campo_con_espera_robusta("dist", valor, "select", timeout=15):
+                if not self.llenar_campo_con_espera_robusta("dist", valor_dist, "select", timeout=15):
                     self.log(f"    ⚠️ No se pudo seleccionar Distrito")
-                time.sleep(0.5)
 
             # 25. Vía (Columna T)
             if 'Via' in datos and pd.notna(datos['Via']):
@@ -2669,59 +5133,59 @@ class BotDenunciasSUNAT:
                 # MÉTODO ROBUSTO
                 if not self.llenar_campo_con_espera_robusta("tipvia", valor, "select", timeout=15):
                     self.log(f"    ⚠️ No se pudo seleccionar Vía")
-                time.sleep(0.5)
+                else:
+                    # La vía habilita el nombre de vía
+                    self.esperar("campo habilitado: nomvia", self._cond_campo_habilitado("nomvia"), 3)
+
+            # Inputs contiguos (26-28) en un solo lote
+            lote = []
 
             # 26. Nombre de Vía (Columna U)
             if 'Relleno de Via' in datos and pd.notna(datos['Relleno de Via']):
                 valor = str(datos['Relleno de Via']).strip()
                 self.log(f"  → Nombre Vía: {valor}")
-                # MÉTODO ROBUSTO
-                if not self.llenar_campo_con_espera_robusta("nomvia", valor, "input", timeout=15):
-                    self.log(f"    ⚠️ No se pudo llenar Nombre Vía")
-                time.sleep(0.5)
-            
+                lote.append(("nomvia", valor, "input"))
+
             # 27. N°/Mzn./Km. (Columna V)
             if 'N.°' in datos and pd.notna(datos['N.°']):
                 valor = str(datos['N.°']).strip()
                 if valor != "" and valor != "-":
                     self.log(f"  → N°/Mzn./Km.: {valor}")
-                    
-                    campo_numero = self.driver.find_element(By.NAME, "nro")
-                    campo_numero.clear()
-                    campo_numero.send_keys(valor)
-                    time.sleep(0.5)
-            
+                    lote.append(("nro", valor, "input"))
+
             # 28. Dpto/Int (Columna W)
             if 'Dpto' in datos and pd.notna(datos['Dpto']):
                 valor = str(datos['Dpto']).strip()
                 if valor != "" and valor != "-":
                     self.log(f"  → Dpto/Int: {valor}")
-                    
-                    campo_dpto = self.driver.find_element(By.NAME, "interior")
-                    campo_dpto.clear()
-                    campo_dpto.send_keys(valor)
-                    time.sleep(0.5)
-            
+                    lote.append(("interior", valor, "input"))
+
+            for nombre_campo in self.llenar_lote_seccion(lote):
+                self.log(f"    ⚠️ No se pudo llenar '{nombre_campo}'")
+
             # 29. Zona (Columna X)
             if 'Zona' in datos and pd.notna(datos['Zona']):
                 valor = str(datos['Zona']).strip()
                 if valor != "" and valor != "-":
                     self.log(f"  → Zona: {valor}")
                     
-                    try:
-                        select_zona = Select(self.driver.find_element(By.NAME, "tipzona"))
-                        select_zona.select_by_visible_text(valor)
-                    except:
-                        pass
-                    
-                    time.sleep(0.5)
+                    if not self.llenar_campo_con_espera_robusta("tipzona", valor, "select"):
+                        self.log(f"    ⚠️ No se pudo seleccionar Zona")
             
             # 30. GRABAR
             self.log("  → Haciendo clic en 'Grabar'...")
+            previo = self.estado_previo("grabar")
+            self.armar_monitor_red()
+            self._cambiar_a_contexto(self.PATH_FORMULARIO)
             boton_grabar = self.driver.find_element(By.XPATH, 
                 "//input[@onclick='clickbtn_validar()' and @name='btnsubmit']")
             boton_grabar.click()
-            time.sleep(3)
+            self.esperar_red_inactiva(timeout=15)
+            if not self.esperar_resultado("grabar", previo, timeout=15):
+                # Sin confirmación no se cuenta como grabada: la fila queda fallida para revisarla
+                raise Exception("No se vio la confirmación de grabado (revisar en SUNAT si se registró)")
+            # Que termine de cargar la respuesta antes de cerrar la ventana
+            self.esperar_seccion("grabada", timeout=10)
             
             self.log("✅ Sección 3 completada - DENUNCIA GRABADA")
             return True
@@ -2734,18 +5198,6 @@ class BotDenunciasSUNAT:
     # FUNCIONES AUXILIARES
     # ============================================
     
-    def obtener_selector_submodalidad(self, valor_modalidad):
-        mapeo = {
-            "03000": "codigosubtrib1",
-            "04000": "codigosubtrib2",
-            "05000": "codigosubtrib3",
-            "06000": "codigosubtrib4",
-            "07000": "codigosubtrib5",
-            "11000": "codigosubtrib6",
-            "12000": "codigosubtrib7",
-        }
-        return mapeo.get(valor_modalidad, None)
-    
     def convertir_fecha_excel(self, fecha):
         try:
             if isinstance(fecha, (int, float)):
@@ -2800,6 +5252,7 @@ class BotDenunciasSUNAT:
         Returns:
             str: Ruta de la carpeta donde se guardó el diagnóstico
         """
+        self._frame_desconocido()
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             carpeta_diagnostico = f"diagnostico_{timestamp}"
@@ -3085,6 +5538,8 @@ class BotDenunciasSUNAT:
             self.log(f"\n{'='*50}")
             self.log(f"📋 PROCESANDO DENUNCIA #{numero_fila}")
             self.log(f"{'='*50}")
+            self._alertas_pendientes = []
+            self.olvidar_ausencias()
             
             # Navegar al formulario
             if not self.navegar_a_formulario_registro():
@@ -3111,22 +5566,22 @@ class BotDenunciasSUNAT:
             
             # Sección 2
             if not self.llenar_seccion2_atencion_denuncias(datos_fila):
-                return False
+                raise Exception("Fallo en Sección 2 - Atención de denuncias")
             
             if not self.interfaz.proceso_activo:
                 return False
             
-            # Sección 3
+            # Sección 3 (sin confirmación de grabado la fila cuenta como fallida)
             if not self.llenar_seccion3_identificacion_denunciante(datos_fila):
-                return False
+                raise Exception("Fallo en Sección 3 - Identificación del denunciante")
             
             self.log(f"🎉 ¡DENUNCIA #{numero_fila} REGISTRADA EXITOSAMENTE!")
             self.denuncias_exitosas += 1
             
             # Cerrar ventana emergente
             self.driver.close()
-            self.driver.switch_to.window(self.driver.window_handles[0])
-            time.sleep(2)
+            self._cambiar_a_ventana(self.driver.window_handles[0])
+            self.esperar("documento cargado", self._cond_documento_listo(), 5)
             
             return True
             
@@ -3137,7 +5592,7 @@ class BotDenunciasSUNAT:
             try:
                 if len(self.driver.window_handles) > 1:
                     self.driver.close()
-                    self.driver.switch_to.window(self.driver.window_handles[0])
+                    self._cambiar_a_ventana(self.driver.window_handles[0])
             except:
                 pass
             
@@ -3163,6 +5618,15 @@ class BotDenunciasSUNAT:
             if not self.hacer_login():
                 self.cerrar_navegador()
                 return
+
+            # Localizadores de la Sección 1 antes de la primera fila
+            if self.modo_verificacion_previa and not self.verificar_formulario():
+                self.log("❌ Localizadores rotos en la Sección 1: proceso abortado")
+                self.guardar_estadisticas_localizadores()
+                self.cerrar_navegador()
+                messagebox.showerror("Verificación fallida",
+                                     "El formulario de SUNAT cambió: revise la consola antes de continuar.")
+                return
             
             # Procesar cada denuncia
             for index, fila in df.iterrows():
@@ -3172,7 +5636,6 @@ class BotDenunciasSUNAT:
                 
                 numero_fila = index + 2
                 self.procesar_una_denuncia(fila, numero_fila)
-                time.sleep(2)
             
             # Resumen
             self.log("\n" + "="*50)
@@ -3183,10 +5646,21 @@ class BotDenunciasSUNAT:
             if total > 0:
                 tasa = (self.denuncias_exitosas/total)*100
                 self.log(f"📈 Tasa de éxito: {tasa:.2f}%")
+            if self._busquedas_reordenadas:
+                self.log(f"🔀 Orden aprendido de localizadores: {self._ms_ahorrados_reordenamiento/1000:.1f} s "
+                         f"ahorrados en {self._busquedas_reordenadas} búsquedas")
+            if self._instalaciones_helpers:
+                self.log(f"🧰 Helpers JS instalados {self._instalaciones_helpers} veces (una por frame y carga)")
+            if self._cambios_frame_evitados:
+                self.log(f"📍 Cambios de frame evitados: {self._cambios_frame_evitados} comandos switch_to")
+            self.reportar_esperas()
             self.log("="*50)
+
+            self.guardar_estadisticas_localizadores()
+            self.guardar_mapeo_opciones()
+            self.guardar_calibracion_esperas()
             
             self.log("\nCerrando navegador...")
-            time.sleep(3)
             self.cerrar_navegador()
             
             self.log("\n🏁 ¡PROCESO COMPLETADO!")
@@ -3200,6 +5674,9 @@ class BotDenunciasSUNAT:
             
         except Exception as e:
             self.log(f"\n❌ ERROR CRÍTICO: {str(e)}")
+            self.guardar_estadisticas_localizadores()
+            self.guardar_mapeo_opciones()
+            self.guardar_calibracion_esperas()
             messagebox.showerror("Error", f"Error:\n{str(e)}")
             self.cerrar_navegador()
 
@@ -3223,6 +5700,7 @@ class InterfazBotMejorada:
         self.ruta_archivo = tk.StringVar()
         self.usuario = tk.StringVar()
         self.password = tk.StringVar()
+        self.estrategia_carga = tk.StringVar(value="normal")
         self.bot = None
         self.proceso_activo = False
         self.hilo_proceso = None
@@ -3342,6 +5820,25 @@ class InterfazBotMejorada:
         )
         entry_password.grid(row=1, column=1, sticky="ew", padx=5, pady=4)
 
+        # Estrategia de carga de páginas
+        tk.Label(
+            frame_campos_cred,
+            text="Carga:",
+            font=("Segoe UI", 8),
+            bg=self.COLOR_TARJETA,
+            fg="#374151"
+        ).grid(row=2, column=0, sticky="e", padx=5, pady=4)
+
+        combo_carga = ttk.Combobox(
+            frame_campos_cred,
+            textvariable=self.estrategia_carga,
+            values=BotDenunciasSUNAT.ESTRATEGIAS_CARGA,
+            font=("Segoe UI", 8),
+            width=23,
+            state="readonly"
+        )
+        combo_carga.grid(row=2, column=1, sticky="ew", padx=5, pady=4)
+
         # Configurar columna para que se expanda
         frame_campos_cred.columnconfigure(1, weight=1)
 
@@ -3494,6 +5991,22 @@ class InterfazBotMejorada:
         )
         self.btn_cancelar.pack(side=tk.LEFT, padx=5, expand=True, fill=tk.BOTH)
 
+        # Botón 3: VERIFICAR LOCALIZADORES (sin procesar el Excel)
+        self.btn_verificar = tk.Button(
+            frame_botones,
+            text="🩺 VERIFICAR\nLOCALIZADORES",
+            command=self.iniciar_verificacion,
+            font=("Segoe UI", 9, "bold"),
+            bg=self.COLOR_PRIMARIO,
+            fg="white",
+            cursor="hand2",
+            width=20,
+            height=2,
+            relief=tk.RAISED,
+            bd=2
+        )
+        self.btn_verificar.pack(side=tk.LEFT, padx=5, expand=True, fill=tk.BOTH)
+
         # ═══════════════════════════════════════
         # BARRA DE ESTADO (COMPACTA)
         # ═══════════════════════════════════════
@@ -3572,6 +6085,7 @@ class InterfazBotMejorada:
 
         self.limpiar_consola()
         self.btn_iniciar.config(state="disabled")
+        self.btn_verificar.config(state="disabled")
         self.btn_cancelar.config(state="normal")
         self.proceso_activo = True
         self.label_estado.config(text="●  Estado: Proceso automático en ejecución...", fg=self.COLOR_EXITO)
@@ -3580,6 +6094,45 @@ class InterfazBotMejorada:
         self.hilo_proceso = threading.Thread(target=self._ejecutar_bot_automatico, daemon=True)
         self.hilo_proceso.start()
 
+    def iniciar_verificacion(self):
+        """Login y verificación de localizadores de la Sección 1, sin Excel"""
+        if not self.validar_campos(requiere_excel=False):
+            return
+
+        self.limpiar_consola()
+        self.btn_iniciar.config(state="disabled")
+        self.btn_verificar.config(state="disabled")
+        self.btn_cancelar.config(state="normal")
+        self.proceso_activo = True
+        self.label_estado.config(text="●  Estado: Verificando localizadores...", fg=self.COLOR_PRIMARIO)
+
+        self.hilo_proceso = threading.Thread(target=self._ejecutar_verificacion, daemon=True)
+        self.hilo_proceso.start()
+
+    def _ejecutar_verificacion(self):
+        """Hilo de la verificación de localizadores"""
+        try:
+            self.bot = BotDenunciasSUNAT(
+                archivo_excel=self.ruta_archivo.get(),
+                usuario=self.usuario.get(),
+                password=self.password.get(),
+                interfaz=self,
+                estrategia_carga=self.estrategia_carga.get()
+            )
+            if self.bot.ejecutar_verificacion():
+                self.label_estado.config(text="●  Estado: Localizadores OK", fg=self.COLOR_EXITO)
+            else:
+                self.label_estado.config(text="●  Estado: Localizadores rotos (ver consola)",
+                                         fg=self.COLOR_PELIGRO)
+        except Exception as e:
+            self.escribir_consola(f"\n❌ ERROR EN VERIFICACIÓN: {str(e)}\n")
+            self.label_estado.config(text="●  Estado: Error en verificación", fg=self.COLOR_PELIGRO)
+        finally:
+            self.btn_iniciar.config(state="normal")
+            self.btn_verificar.config(state="normal")
+            self.btn_cancelar.config(state="disabled")
+            self.proceso_activo = False
+
     def cancelar_proceso(self):
         respuesta = messagebox.askyesno(
             "Confirmar Cancelación",
@@ -3599,6 +6152,7 @@ class InterfazBotMejorada:
                     pass
 
             self.btn_iniciar.config(state="normal")
+            self.btn_verificar.config(state="normal")
             self.btn_cancelar.config(state="disabled")
 
     def _ejecutar_bot_automatico(self):
@@ -3612,7 +6166,8 @@ class InterfazBotMejorada:
                 archivo_excel=self.ruta_archivo.get(),
                 usuario=self.usuario.get(),
                 password=self.password.get(),
-                interfaz=self
+                interfaz=self,
+                estrategia_carga=self.estrategia_carga.get()
             )
 
             # Ejecutar bot
@@ -3641,6 +6196,7 @@ class InterfazBotMejorada:
 
         finally:
             self.btn_iniciar.config(state="normal")
+            self.btn_verificar.config(state="normal")
             self.btn_cancelar.config(state="disabled")
             self.proceso_activo = False
 
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import BOTF  # noqa: E402
+
+
+class InterfazFalsa:
+    """Solo recibe lo que el bot escribe en la consola"""
+
+    def __init__(self):
+        self.lineas = []
+
+    def escribir_consola(self, texto):
+        self.lineas.append(texto)
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    """Bot sin navegador; los JSON de estadísticas, mapeo y calibración van a tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    return BOTF.BotDenunciasSUNAT("denuncias.xlsx", "usuario", "clave", InterfazFalsa())
@@ -0,0 +1,53 @@
+"""🚨 Alertas de SUNAT y resultado de Buscar / Siguiente / Grabar"""
+
+import pytest
+
+
+class DriverConAlertas:
+    """Devuelve los alert() interceptados una sola vez, como el interceptor en JS"""
+
+    def __init__(self, *textos):
+        self.pendientes = [["alert", texto] for texto in textos]
+
+    def execute_script(self, script, *args):
+        mensajes, self.pendientes = self.pendientes, []
+        return mensajes
+
+
+@pytest.fixture
+def sin_marcadores(bot, monkeypatch):
+    monkeypatch.setattr(bot, "_estado_formulario", lambda accion: {})
+    return bot
+
+
+@pytest.mark.parametrize("texto", [
+    "Seleccione el departamento",
+    "Ingrese el número de teléfono",
+    "El correo electrónico no tiene formato correcto",
+])
+def test_cualquier_alerta_tras_grabar_rechaza_la_fila(sin_marcadores, texto):
+    sin_marcadores.driver = DriverConAlertas(texto)
+    with pytest.raises(Exception, match=texto):
+        sin_marcadores.esperar_resultado("grabar", timeout=1)
+
+
+def test_alerta_de_grabado_cuenta_como_exito(sin_marcadores):
+    sin_marcadores.driver = DriverConAlertas("Se registró la denuncia N° 123")
+    assert sin_marcadores.esperar_resultado("grabar", timeout=1)
+
+
+def test_sin_confirmacion_no_se_asume_grabada(sin_marcadores):
+    sin_marcadores.driver = DriverConAlertas()
+    assert not sin_marcadores.esperar_resultado("grabar", timeout=0.3)
+
+
+def test_aviso_al_llenar_un_campo_solo_se_registra(bot):
+    bot.driver = DriverConAlertas("Ingrese el número de teléfono")
+    assert bot.verificar_alertas("llenar 'telefono'") is None
+    assert any("Aviso de SUNAT" in linea for linea in bot.interfaz.lineas)
+
+
+def test_error_al_llenar_un_campo_falla_la_fila(bot):
+    bot.driver = DriverConAlertas("El RUC no existe")
+    with pytest.raises(Exception, match="no existe"):
+        bot.verificar_alertas("llenar 'numdoc'")
@@ -0,0 +1,57 @@
+"""📐 Timeouts calibrados con las latencias observadas"""
+
+import json
+
+import pytest
+
+import BOTF
+
+
+def test_pocas_muestras_usa_el_valor_por_defecto(bot):
+    bot._calibracion_esperas = {"paso": {"muestras": [0.5] * 4, "vencida": False}}
+    assert bot.timeout_calibrado("paso", 10) == 10
+    assert bot.timeout_calibrado("otro paso", 10) == 10
+
+
+def test_espera_vencida_usa_el_valor_por_defecto(bot):
+    bot._calibracion_esperas = {"paso": {"muestras": [1.0] * 20, "vencida": True}}
+    assert bot.timeout_calibrado("paso", 10) == 10
+
+
+def test_percentil_95_con_factor_y_margen(bot):
+    muestras = [i / 10 for i in range(1, 21)]  # 0.1 ... 2.0; el p95 es 1.9
+    bot._calibracion_esperas = {"paso": {"muestras": muestras, "vencida": False}}
+    assert bot.timeout_calibrado("paso", 10) == round(1.9 * 1.5 + 1, 1)
+
+
+def test_piso_y_tope(bot):
+    bot._calibracion_esperas = {
+        "rapido": {"muestras": [0.01] * 10, "vencida": False},
+        "lento": {"muestras": [30.0] * 10, "vencida": False},
+    }
+    assert bot.timeout_calibrado("rapido", 20) == 20 * BOTF.BotDenunciasSUNAT.PISO_CALIBRACION
+    assert bot.timeout_calibrado("lento", 5) == 5 * BOTF.BotDenunciasSUNAT.TOPE_CALIBRACION
+
+
+def test_espera_fallida_no_aporta_muestra(bot):
+    bot._observar_latencia("paso", 0.2, True)
+    bot._observar_latencia("paso", 0.01, False)
+    assert bot._calibracion_esperas["paso"] == {"muestras": [0.2], "vencida": True}
+
+
+def test_calibracion_con_otra_forma_se_descarta(tmp_path, monkeypatch, bot):
+    (tmp_path / "calibracion_esperas.json").write_text(json.dumps({
+        "bueno": {"muestras": [0.5, 1], "vencida": "no"},
+        "texto": {"muestras": ["0.5"]},
+        "negativo": {"muestras": [-1]},
+        "lista": [1, 2],
+    }), encoding="utf-8")
+    assert bot._cargar_calibracion_esperas() == {"bueno": {"muestras": [0.5, 1], "vencida": False}}
+
+
+def test_reintento_espera_al_menos_la_pausa_minima(bot, monkeypatch):
+    dormido = []
+    monkeypatch.setattr(bot, "esperar", lambda nombre, condicion, timeout: True)
+    monkeypatch.setattr(BOTF.time, "sleep", dormido.append)
+    bot._pausa_reintento(2)
+    assert dormido and dormido[0] == pytest.approx(2 * bot.PAUSA_MINIMA_REINTENTO, abs=0.05)
@@ -0,0 +1,74 @@
+"""🖱️ hacer_clic_robusto con condiciones de efecto que cambian de frame"""
+
+import pytest
+
+
+class CambioDeFrame:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def default_content(self):
+        self.driver.frames = []
+
+    def frame(self, nombre):
+        self.driver.frames.append(nombre)
+
+    def parent_frame(self):
+        self.driver.frames.pop()
+
+
+class DriverFalso:
+    """Solo permite usar el elemento desde el frame donde vive"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.switch_to = CambioDeFrame(self)
+        self.clics = 0
+
+    def execute_script(self, script, *args):
+        if args and args[0].frames != self.frames:
+            raise Exception("stale element reference")
+        return "huella"
+
+
+class ElementoFalso:
+    def __init__(self, driver):
+        self.driver = driver
+        self.frames = list(driver.frames)
+
+    def click(self):
+        if self.driver.frames != self.frames:
+            raise Exception("stale element reference")
+        self.driver.clics += 1
+
+
+@pytest.fixture
+def formulario(bot):
+    bot.driver = DriverFalso(["iframeApplication", "det"])
+    bot._path_frame_actual = list(bot.PATH_FORMULARIO)
+    return bot
+
+
+def efecto_en_top(bot):
+    """Como _cond_red_activada: consulta window.top"""
+    def condicion(driver):
+        bot._cambiar_a_contexto([])
+        return driver.clics > 0
+    return condicion
+
+
+def test_clic_en_el_frame_del_elemento_aunque_el_efecto_vaya_a_top(formulario):
+    elemento = ElementoFalso(formulario.driver)
+
+    assert formulario.hacer_clic_robusto(elemento, "botón", efecto=efecto_en_top(formulario))
+    assert formulario.driver.clics == 1
+    assert formulario.driver.frames == ["iframeApplication", "det"]
+
+
+def test_efecto_ya_presente_no_hace_clic(formulario):
+    elemento = ElementoFalso(formulario.driver)
+    formulario.driver.clics = 1
+
+    assert formulario.hacer_clic_robusto(elemento, "botón", efecto=efecto_en_top(formulario))
+    assert formulario.driver.clics == 1
+    assert formulario.driver.frames == ["iframeApplication", "det"]
@@ -0,0 +1,48 @@
+"""🧪 Evaluación offline de localizadores sobre un snapshot de 'det'"""
+
+import pytest
+
+
+PAGINA_DET = """
+<html><body><form>
+<table>
+  <tr><td>Tipo de Documento</td><td><select name="tipodoc"><option>1 - DNI</option></select></td></tr>
+  <tr><td>Número</td><td><input type="text" name="numdoc"></td></tr>
+  <tr><td>Teléfono</td><td><input type="hidden" name="telef_h"><input type="text" name="telef"></td></tr>
+  <tr style="display: none"><td>Correo</td><td><input type="text" name="correo"></td></tr>
+</table>
+<label for="obs">Observación</label><textarea id="obs"></textarea>
+<input type="button" value="Grabar" onclick="clickbtn_validar()">
+</form></body></html>
+"""
+
+
+@pytest.fixture
+def arbol():
+    lxml_html = pytest.importorskip("lxml.html")
+    return lxml_html.document_fromstring(PAGINA_DET)
+
+
+def test_offline_por_name_id_y_xpath(bot, arbol):
+    assert bot._evaluar_candidato_offline(arbol, "NAME", "numdoc", "input").get("name") == "numdoc"
+    assert bot._evaluar_candidato_offline(arbol, "ID", "obs", "input").tag == "textarea"
+    assert bot._evaluar_candidato_offline(arbol, "XPATH", "//select[@name='tipodoc']", "select") is not None
+    assert bot._evaluar_candidato_offline(arbol, "XPATH", "//[", "input") is None
+
+
+def test_offline_descarta_controles_ocultos(bot, arbol):
+    assert bot._evaluar_candidato_offline(arbol, "NAME", "correo", "input") is None
+    assert bot._evaluar_candidato_offline(arbol, "NAME", "telef_h", "input") is None
+
+
+def test_offline_onclick_no_exige_visibilidad(bot, arbol):
+    nodo = bot._evaluar_candidato_offline(
+        arbol, "ONCLICK", "//input[@onclick='clickbtn_validar()']", "button")
+    assert nodo.get("value") == "Grabar"
+
+
+def test_offline_por_texto_de_etiqueta(bot, arbol):
+    assert bot._evaluar_candidato_offline(arbol, "TEXTO", "telefono", "input").get("name") == "telef"
+    assert bot._evaluar_candidato_offline(arbol, "TEXTO", "Tipo de Documento", "select").get("name") == "tipodoc"
+    assert bot._evaluar_candidato_offline(arbol, "TEXTO", "Observación", "input").get("id") == "obs"
+    assert bot._evaluar_candidato_offline(arbol, "TEXTO", "grabar", "button").get("value") == "Grabar"
@@ -0,0 +1,89 @@
+"""🔍 Búsqueda de valores del Excel en las opciones de un SELECT"""
+
+import json
+
+import pytest
+
+
+OPCIONES_TIPODOC = [
+    (0, "", "-- Seleccione --"),
+    (1, "01", "6 - RUC"),
+    (2, "02", "1 - DNI"),
+    (3, "03", "Carné de Extranjería"),
+    (4, "04", "PASAPORTE DIPLOMATICO"),
+]
+
+
+@pytest.fixture
+def indice(bot):
+    return bot._indice_opciones("tipodoc", OPCIONES_TIPODOC)
+
+
+@pytest.mark.parametrize("valor, esperado, estrategia", [
+    ("6 - RUC", 1, "exacto"),
+    ("carne de extranjeria", 3, "sin tildes ni mayúsculas"),
+    ("DIPLOMATICO PASAPORTE", 4, "mismas palabras"),
+    ("DNI", 2, "contenido"),
+    ("TIPO 6 - RUC EMPRESA", 1, "inverso"),
+    ("PASAPORTE COMUN", 4, "palabras clave, 1 coincidencias"),
+    ("CARPETA", 3, "prefijo 'CAR'"),
+])
+def test_niveles_de_coincidencia(bot, indice, valor, esperado, estrategia):
+    assert bot._buscar_en_indice_opciones(indice, valor) == (esperado, estrategia)
+
+
+def test_sin_coincidencia(bot, indice):
+    assert bot._buscar_en_indice_opciones(indice, "XY") == (None, None)
+    assert bot._buscar_en_indice_opciones(indice, "   ") == (None, None)
+
+
+def test_solo_se_confian_coincidencias_completas(bot):
+    assert bot._coincidencia_confiable("Carné de Extranjería", "CARNE DE EXTRANJERIA")
+    assert bot._coincidencia_confiable("PASAPORTE DIPLOMATICO", "diplomatico pasaporte")
+    assert not bot._coincidencia_confiable("1 - DNI", "DNI")
+    assert not bot._coincidencia_confiable("1 - DNI", "")
+
+
+def test_mapeo_de_listas_dependientes_por_padre(bot):
+    bot.seccion_actual = "seccion3"
+    bot._padres_opciones = {"dist": ("LIMA", "LIMA")}
+    assert bot._clave_mapeo_opciones("dist") == "seccion3:dist:LIMA/LIMA"
+    assert bot._clave_mapeo_opciones("dpto") == "seccion3:dpto"
+
+
+def test_opcion_aprendida_se_descarta_si_el_texto_ya_no_coincide(bot, indice):
+    bot.seccion_actual = "seccion1"
+    bot._mapeo_opciones = {"seccion1:tipodoc": {"RUC": "01", "DNI": "04"}}
+    assert bot._opcion_aprendida("tipodoc", indice, "RUC") is None
+    assert bot._opcion_aprendida("tipodoc", indice, "DNI") is None
+
+    bot._mapeo_opciones = {"seccion1:tipodoc": {"6 - RUC": "01"}}
+    assert bot._opcion_aprendida("tipodoc", indice, "6 - RUC") == 1
+
+
+def test_coincidencia_parcial_se_memoriza_en_la_sesion(bot, indice, monkeypatch):
+    bot.seccion_actual = "seccion1"
+    assert bot._coincidencia_en_opciones("tipodoc", indice, "DNI") == (2, "contenido")
+
+    monkeypatch.setattr(bot, "_buscar_en_indice_opciones", lambda *args: pytest.fail("recorrió la lista"))
+    assert bot._coincidencia_en_opciones("tipodoc", indice, "dni") == (2, "contenido")
+
+
+def test_memo_depende_de_la_lista_de_opciones(bot, indice):
+    bot.seccion_actual = "seccion1"
+    bot._coincidencia_en_opciones("tipodoc", indice, "DNI")
+
+    otra = bot._indice_opciones("tipodoc", [(0, "", "-- Seleccione --"), (1, "09", "DNI ELECTRONICO")])
+    assert bot._coincidencia_en_opciones("tipodoc", otra, "DNI") == (1, "contenido")
+
+
+def test_mapeo_con_otra_forma_se_descarta(tmp_path, bot):
+    (tmp_path / "mapeo_opciones.json").write_text(json.dumps({
+        "seccion1:tipodoc": {"DNI": "02", "RUC": 1},
+        "seccion1:elementos": ["01"],
+        "seccion3:dpto": "LIMA",
+    }), encoding="utf-8")
+    assert bot._cargar_mapeo_opciones() == {"seccion1:tipodoc": {"DNI": "02"}}
+
+    (tmp_path / "mapeo_opciones.json").write_text("[1, 2]", encoding="utf-8")
+    assert bot._cargar_mapeo_opciones() == {}
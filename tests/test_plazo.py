@@ -0,0 +1,18 @@
+"""⏳ Plazo compartido de una búsqueda de campo"""
+
+import pytest
+
+import BOTF
+
+
+def test_plazo_descuenta_del_mismo_presupuesto(monkeypatch):
+    reloj = [100.0]
+    monkeypatch.setattr(BOTF.time, "monotonic", lambda: reloj[0])
+    plazo = BOTF.PlazoBusqueda(2)
+
+    assert plazo.restante() == 2 and not plazo.agotado()
+    reloj[0] += 1.5
+    assert plazo.acotar(3) == pytest.approx(0.5)
+    assert plazo.acotar(0.2) == 0.2
+    reloj[0] += 1
+    assert plazo.restante() == 0 and plazo.agotado()